@@ -0,0 +1,90 @@
+"""
+In-process API for the PPTX/PDF to Video pipeline.
+
+For programs that embed the pipeline instead of running pptx_to_video.py:
+
+    from api import convert
+    result = convert("decks/intro.pptx", language="id", on_progress=print)
+    print(result.output, result.slides, result.seconds)
+
+    # asyncio
+    result = await convert_async("decks/intro.pptx", tts_engine="espeak")
+
+Failures raise errors.PipelineError subclasses instead of exiting. Progress
+events (see progress) go to `on_progress`, which is called from pipeline
+worker threads; asyncio callers should hand them to their loop with
+loop.call_soon_threadsafe. External tools are probed once per process and
+optional libraries (gTTS, pdfplumber, PyPDF2) are only imported when used.
+"""
+
+import asyncio
+import functools
+import threading
+from pathlib import Path
+
+from audio_cache import AudioCache
+from pptx_to_video import PipelineResult, PPTXToVideoConverter, discover_tools
+from progress import ProgressReporter
+from tts_engine import make_tts_backend
+
+__all__ = ["PipelineResult", "convert", "convert_async", "discover_tools"]
+
+# How often a run checks its cancel_event
+CANCEL_POLL_SECONDS = 0.2
+
+
+def convert(deck, output_dir="output", temp_dir="temp", language="en", script=None,
+            tts_engine=None, tts_voice=None, on_progress=None, cancel_event=None, **options):
+    """
+    Convert one deck (.pptx or .pdf) to output_dir/output.mp4 and return a PipelineResult.
+
+    script: narration file (default: script.txt next to the deck).
+    tts_engine / tts_voice: as --tts-engine / --tts-voice (or pass tts_backend=...).
+    on_progress: called with every progress event dict.
+    cancel_event: threading.Event; setting it stops the run with PipelineCancelled.
+    options: any other PPTXToVideoConverter keyword (jobs, pipeline, render_mode, ...).
+    The shared audio cache is used unless audio_cache=None is passed.
+    """
+    deck = Path(deck)
+    if tts_engine and "tts_backend" not in options:
+        options["tts_backend"] = make_tts_backend(tts_engine, tts_voice)
+    if "audio_cache" not in options:
+        options["audio_cache"] = AudioCache()
+    if on_progress and "progress" not in options:
+        options["progress"] = ProgressReporter(callback=on_progress)
+    converter = PPTXToVideoConverter(input_dir=deck.parent, output_dir=output_dir, temp_dir=temp_dir,
+                                     script_path=script, **options)
+    if cancel_event is None:
+        return converter.process(input_filename=deck.name, language=language)
+
+    finished = threading.Event()
+
+    def watch():
+        while not finished.wait(CANCEL_POLL_SECONDS):
+            if cancel_event.is_set():
+                converter.cancel()
+                return
+
+    if cancel_event.is_set():
+        converter.cancel()
+    watcher = threading.Thread(target=watch, daemon=True, name="pipeline-cancel")
+    watcher.start()
+    try:
+        return converter.process(input_filename=deck.name, language=language)
+    finally:
+        finished.set()
+        watcher.join()
+
+
+async def convert_async(deck, **kwargs):
+    """
+    convert() on a worker thread, so the event loop keeps running.
+    Cancelling the awaiting task cancels the pipeline run.
+    """
+    loop = asyncio.get_running_loop()
+    cancel_event = kwargs.setdefault("cancel_event", threading.Event())
+    try:
+        return await loop.run_in_executor(None, functools.partial(convert, deck, **kwargs))
+    except asyncio.CancelledError:
+        cancel_event.set()
+        raise
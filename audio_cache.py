@@ -0,0 +1,136 @@
+"""
+Persistent, content-addressed cache for synthesized TTS audio.
+
+Entries are keyed by a hash of (normalized text, language, TTS engine/voice),
+so the cache can be shared by every deck, run and language on the machine:
+only text that actually changed is sent to the TTS service again.
+
+Writes go to a temporary file in the same directory and are renamed into
+place, so concurrent runs never see half-written clips. The total size is
+kept under a budget by evicting the least recently used entries (file mtime
+is refreshed on every hit).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+
+
+def default_cache_dir():
+    """$PPTVO_CACHE_DIR, else $XDG_CACHE_HOME/pptvo/tts, else ~/.cache/pptvo/tts."""
+    if os.environ.get("PPTVO_CACHE_DIR"):
+        return Path(os.environ["PPTVO_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pptvo" / "tts"
+
+
+def normalize_text(text):
+    """Unicode-normalize and collapse whitespace so formatting-only edits still hit the cache."""
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def audio_key(text, language, engine):
+    """Stable content key for one clip: hash of (normalized text, language, engine)."""
+    payload = json.dumps(["v1", normalize_text(text), language, engine], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def link_or_copy(src, dest):
+    """Place `src` at `dest` atomically, hard-linking when possible."""
+    dest = Path(dest)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+    return dest
+
+
+class AudioCache:
+    """Content-addressed audio store with an LRU size budget."""
+
+    # Temp files older than this are leftovers from crashed writers
+    STALE_TMP_SECONDS = 3600
+
+    def __init__(self, root=None, max_bytes=1024 * 1024 * 1024):
+        self.root = Path(root) if root else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def key(self, text, language, engine):
+        """Stable cache key for one clip."""
+        return audio_key(text, language, engine)
+
+    def path_for(self, key, suffix=".mp3"):
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get(self, key, suffix=".mp3"):
+        """Return the cached file for `key` (marking it recently used) or None."""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, src_path, suffix=".mp3"):
+        """Store a copy of `src_path` under `key` and return the cached path."""
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as out, open(src_path, "rb") as src:
+                shutil.copyfileobj(src, out)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        return path
+
+    def entries(self):
+        """(path, size, mtime) for every cached clip."""
+        result = []
+        now = time.time()
+        for path in self.root.glob("*/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith(".tmp-"):
+                if now - st.st_mtime > self.STALE_TMP_SECONDS:
+                    self._unlink(path)
+                continue
+            result.append((path, st.st_size, st.st_mtime))
+        return result
+
+    def evict(self):
+        """Delete least recently used clips until the cache fits its budget. Returns bytes freed."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            if self._unlink(path):
+                total -= size
+                freed += size
+        return freed
+
+    @staticmethod
+    def _unlink(path):
+        # Another run may have evicted the same file already
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,137 @@
+"""
+Multi-deck batch mode for the PPTX/PDF to Video pipeline (--batch).
+
+Every deck found in a directory or glob gets its own workspace:
+
+    temp/<deck>/      (pdf/, slides/, audio/, slide_videos/, manifest.json)
+    output/<deck>/output.mp4
+
+and its narration from <deck>.script.txt next to the deck (falling back to the
+text extracted from the PDF). What is expensive to set up is shared by all
+decks: one LibreOffice (see office_convert), one TTS scheduler (so the rate
+limit and circuit breaker are global) and one FFmpeg encoder pool.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build_manifest import BuildManifest
+from errors import PipelineError
+from office_convert import OfficeConverter
+from tts_engine import GTTSBackend, TTSScheduler
+
+DECK_SUFFIXES = {".pdf", ".pptx", ".ppt", ".odp"}
+
+
+def find_decks(spec):
+    """Decks in directory `spec`, or matching glob `spec`, sorted by path."""
+    path = Path(spec)
+    if path.is_dir():
+        candidates = path.iterdir()
+    else:
+        candidates = (Path(p) for p in glob.glob(spec, recursive=True))
+    return sorted(p for p in candidates if p.is_file() and p.suffix.lower() in DECK_SUFFIXES)
+
+
+def deck_names(decks):
+    """Workspace name per deck: the file stem, plus the extension when two decks share a stem."""
+    stems = [d.stem for d in decks]
+    names = []
+    for deck in decks:
+        name = deck.stem if stems.count(deck.stem) == 1 else f"{deck.stem}-{deck.suffix[1:].lower()}"
+        while name in names:
+            name += "_"
+        names.append(name)
+    return names
+
+
+class BatchRunner:
+    """Runs PPTXToVideoConverter over many decks with shared LibreOffice, TTS and encoders."""
+
+    def __init__(self, decks, output_dir="output", temp_dir="temp", deck_jobs=1,
+                 office_mode="auto", options=None):
+        self.decks = list(decks)
+        self.names = deck_names(self.decks)
+        self.output_dir = Path(output_dir)
+        self.temp_dir = Path(temp_dir)
+        self.deck_jobs = max(1, deck_jobs)
+        self.office_mode = office_mode
+        # Keyword arguments for every PPTXToVideoConverter
+        self.options = dict(options or {})
+
+    def make_scheduler(self):
+        o = self.options
+        return TTSScheduler(
+            o.get("tts_backend") or GTTSBackend(), workers=o.get("tts_workers", 4),
+            rate=o.get("tts_rate", 2.0), burst=o.get("tts_burst", 2),
+            max_attempts=o.get("tts_max_attempts", 5)
+        )
+
+    def needs_conversion(self, deck, name):
+        """True if the deck is not a PDF and its PDF from a previous run is stale."""
+        if deck.suffix.lower() == ".pdf":
+            return False
+        manifest = BuildManifest(self.temp_dir / name / "manifest.json")
+        return not manifest.is_current("pdf", {"source": manifest.file_hash(deck)})
+
+    def run_deck(self, deck, name, language, shared):
+        from pptx_to_video import PPTXToVideoConverter
+
+        script = deck.with_name(f"{deck.stem}.script.txt")
+        options = dict(self.options)
+        if options.get("progress"):
+            # Same event stream, tagged with the deck
+            options["progress"] = options["progress"].child(deck=name)
+        converter = PPTXToVideoConverter(
+            input_dir=deck.parent, output_dir=self.output_dir / name,
+            temp_dir=self.temp_dir / name, script_path=script, **shared, **options
+        )
+        print(f"\n{'=' * 60}\n[{name}] {deck}\n{'=' * 60}")
+        start = time.monotonic()
+        try:
+            result = converter.process(input_filename=deck.name, language=language)
+        except PipelineError as e:
+            print(f"ERROR [{name}]: {e}")
+            return {"deck": name, "ok": False, "seconds": time.monotonic() - start, "output": None,
+                    "error": str(e)}
+        return {"deck": name, "ok": True, "seconds": time.monotonic() - start,
+                "output": result.output, "error": None}
+
+    def run(self, language="en"):
+        """Process every deck; returns one result dict per deck, in deck order."""
+        if not self.decks:
+            print("ERROR: No decks found for batch mode")
+            return []
+        print(f"Batch: {len(self.decks)} decks, {self.deck_jobs} at a time")
+
+        # Same encoder count as a single deck (see PPTXToVideoConverter.resolve_jobs)
+        jobs = self.options.get("jobs", 1)
+        pool_size = jobs if jobs and jobs > 0 else max(1, (os.cpu_count() or 1) // 4)
+        with OfficeConverter(mode=self.office_mode, profiler=self.options.get("profiler")) as office, \
+                ThreadPoolExecutor(max_workers=pool_size) as encode_pool:
+            to_convert = [d for d, n in zip(self.decks, self.names) if self.needs_conversion(d, n)]
+            office.prefetch(to_convert)
+            shared = {"office": office, "tts_scheduler": self.make_scheduler(),
+                      "encode_pool": encode_pool}
+
+            with ThreadPoolExecutor(max_workers=self.deck_jobs) as deck_pool:
+                futures = [deck_pool.submit(self.run_deck, deck, name, language, shared)
+                           for deck, name in zip(self.decks, self.names)]
+                results = [f.result() for f in futures]
+
+        self.print_summary(results)
+        return results
+
+    @staticmethod
+    def print_summary(results):
+        print("\n" + "=" * 60)
+        print("BATCH SUMMARY")
+        for r in results:
+            status = f"✓ {r['output']}" if r["ok"] else "✗ gagal"
+            print(f"  {r['deck']:<30} {r['seconds']:>7.1f}s  {status}")
+        failed = sum(1 for r in results if not r["ok"])
+        print(f"  {len(results) - failed} berhasil, {failed} gagal")
+        print("=" * 60)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark with synthetic decks and a fake TTS backend.
+
+For every deck size, generates a synthetic PDF/PPTX (see synthetic_deck.py),
+runs PPTXToVideoConverter.process on it with tts_engine.FakeTTSBackend
+(configurable latency and error rate, no network) and the profiler enabled,
+and reports per-stage throughput: pages per second and seconds of video per
+wall-clock second.
+
+Each run is appended to benchmarks/results/<commit>.json, so results can be
+compared between commits with compare.py.
+
+    python benchmarks/bench_pipeline.py --pages 10,50 --tts-latency 0.3 --repeat 3
+    python benchmarks/compare.py <old-commit> <new-commit>
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from errors import PipelineError
+from pptx_to_video import PPTXToVideoConverter
+from profiling import Profiler
+from synthetic_deck import make_deck
+from tts_engine import FakeTTSBackend
+
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def git_commit():
+    """Short hash of HEAD, with a -dirty suffix for uncommitted changes ("unknown" outside git)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                check=True, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=BENCH_DIR, check=True, capture_output=True, text=True).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def results_path(commit):
+    return RESULTS_DIR / f"{commit}.json"
+
+
+def run_case(case, work_dir, verbose=False):
+    """Generate the deck for `case`, run the pipeline once and return its measurements."""
+    in_dir = work_dir / "input"
+    in_dir.mkdir(parents=True)
+    deck, texts = make_deck(in_dir / f"bench.{case['format']}", case["pages"], case["words"],
+                            tuple(case["page_size"]), case["seed"])
+
+    profiler = Profiler(enabled=True)
+    tts = FakeTTSBackend(latency=case["tts_latency"], error_rate=case["tts_error_rate"],
+                         seed=case["seed"])
+    converter = PPTXToVideoConverter(
+        input_dir=in_dir, output_dir=work_dir / "output", temp_dir=work_dir / "temp",
+        jobs=case["jobs"], tts_backend=tts, tts_workers=case["tts_workers"],
+        tts_rate=case["tts_rate"], audio_cache=None, render_mode=case["render_mode"],
+        resolution=tuple(case["resolution"]), pipeline=case["pipeline"], profiler=profiler
+    )
+
+    log = sys.stdout if verbose else open(work_dir / "pipeline.log", "w")
+    start = time.perf_counter()
+    error = None
+    try:
+        with contextlib.redirect_stdout(log):
+            converter.process(input_filename=deck.name)
+    except PipelineError as e:
+        error = f"{e} (see {work_dir / 'pipeline.log'})"
+    finally:
+        if log is not sys.stdout:
+            log.close()
+    wall = time.perf_counter() - start
+
+    output = converter.output_dir / "output.mp4"
+    video_seconds = converter.probe_duration(output) if error is None else 0.0
+    pages = case["pages"]
+    stages = {}
+    for s in profiler.report()["stages"]:
+        stages[s["name"]] = {
+            "wall_s": s["wall_s"],
+            "pages_per_s": round(pages / s["wall_s"], 2) if s["wall_s"] else None,
+            "cpu_s": round((s["cpu_self_s"] or 0) + (s["cpu_children_s"] or 0), 3),
+            "peak_child_rss_mb": s["peak_child_rss_mb"],
+        }
+    return {
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(pages / wall, 2),
+        "video_s": round(video_seconds, 2),
+        "video_s_per_wall_s": round(video_seconds / wall, 2),
+        "tts_calls": tts.calls,
+        "stages": stages,
+        "error": error,
+    }
+
+
+def summarize(runs):
+    """Median of repeated runs (per stage as well)."""
+    ok = [r for r in runs if not r["error"]] or runs
+    summary = {k: round(statistics.median(r[k] for r in ok), 3)
+               for k in ("wall_s", "pages_per_s", "video_s", "video_s_per_wall_s")}
+    summary["stages"] = {}
+    for name in ok[0]["stages"]:
+        walls = [r["stages"][name]["wall_s"] for r in ok if name in r["stages"]]
+        rates = [r["stages"][name]["pages_per_s"] for r in ok
+                 if name in r["stages"] and r["stages"][name]["pages_per_s"]]
+        summary["stages"][name] = {
+            "wall_s": round(statistics.median(walls), 3),
+            "pages_per_s": round(statistics.median(rates), 2) if rates else None,
+        }
+    summary["failed_runs"] = len(runs) - len([r for r in runs if not r["error"]])
+    return summary
+
+
+def case_key(case):
+    """Stable identifier of a benchmark configuration, used to match runs across commits."""
+    return ",".join(f"{k}={case[k]}" for k in sorted(case))
+
+
+def save_results(commit, entries):
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = results_path(commit)
+    data = {"commit": commit, "runs": []}
+    if path.exists():
+        with open(path) as f:
+            data = json.load(f)
+    data["runs"].extend(entries)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def parse_size(value, name):
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise SystemExit(f"ERROR: {name} must look like 1920x1080, got {value!r}")
+    return [width, height]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--pages", default="10,50", help="Comma-separated deck sizes")
+    parser.add_argument("--words", type=int, default=60, help="Narration words per slide")
+    parser.add_argument("--format", choices=["pdf", "pptx"], default="pdf",
+                        help="pptx also measures the LibreOffice conversion (needs python-pptx)")
+    parser.add_argument("--page-size", default="960x540", help="Deck page size in points")
+    parser.add_argument("--resolution", default="1920x1080", help="Output resolution")
+    parser.add_argument("--pipeline", choices=["staged", "streaming"], default="staged")
+    parser.add_argument("--render-mode", choices=["segments", "single-pass"], default="segments")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="Fake TTS seconds per request")
+    parser.add_argument("--tts-error-rate", type=float, default=0.0,
+                        help="Probability that a fake TTS request fails (retried)")
+    parser.add_argument("--tts-workers", type=int, default=4)
+    parser.add_argument("--tts-rate", type=float, default=20.0, help="TTS requests per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per deck size (median is reported)")
+    parser.add_argument("--no-save", action="store_true", help="Do not write benchmarks/results")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directories")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline log")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    entries = []
+    for pages in (int(p) for p in args.pages.split(",")):
+        case = {
+            "pages": pages, "words": args.words, "format": args.format,
+            "page_size": parse_size(args.page_size, "--page-size"),
+            "resolution": parse_size(args.resolution, "--resolution"),
+            "pipeline": args.pipeline, "render_mode": args.render_mode, "jobs": args.jobs,
+            "tts_latency": args.tts_latency, "tts_error_rate": args.tts_error_rate,
+            "tts_workers": args.tts_workers, "tts_rate": args.tts_rate, "seed": args.seed,
+        }
+        runs = []
+        for i in range(args.repeat):
+            work_dir = Path(tempfile.mkdtemp(prefix="pptvo-bench-"))
+            try:
+                print(f"[{pages} pages] run {i + 1}/{args.repeat}...", flush=True)
+                runs.append(run_case(case, work_dir, args.verbose))
+            finally:
+                if not args.keep and not (runs and runs[-1]["error"]):
+                    shutil.rmtree(work_dir, ignore_errors=True)
+        entries.append({
+            "key": case_key(case), "case": case, "runs": runs, "summary": summarize(runs),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "host": platform.node(),
+            "python": platform.python_version(),
+        })
+
+    print(f"\ncommit {commit}, fake TTS {args.tts_latency:g}s/request, "
+          f"error rate {args.tts_error_rate:g}, pipeline {args.pipeline}/{args.render_mode}")
+    print(f"{'pages':>6} {'wall s':>8} {'pages/s':>8} {'video s/s':>10}  stages (pages/s)")
+    for entry in entries:
+        s = entry["summary"]
+        stages = ", ".join(f"{name} {v['pages_per_s']}" for name, v in s["stages"].items())
+        failed = f"  [{s['failed_runs']} failed]" if s["failed_runs"] else ""
+        print(f"{entry['case']['pages']:>6} {s['wall_s']:>8.2f} {s['pages_per_s']:>8.2f} "
+              f"{s['video_s_per_wall_s']:>10.2f}  {stages}{failed}")
+    if not args.no_save:
+        print(f"\nResults appended to {save_results(commit, entries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-slide segment encoding + concat vs single-pass rendering.
+
+Generates a synthetic deck (N slide images + N narration clips) with FFmpeg's
+lavfi sources, renders it with both render modes of PPTXToVideoConverter (for
+each --encode-profile given) and reports wall time, realtime factor,
+intermediate disk usage and output size.
+
+    python benchmarks/bench_render_modes.py --slides 60 --seconds 20 --jobs 4
+    python benchmarks/bench_render_modes.py --profiles default,still --seconds 90
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pptx_to_video import ENCODE_PROFILES, PPTXToVideoConverter
+
+
+def make_deck(work_dir, slides, seconds, size):
+    """Create slide-NN.png images and slide-NN.mp3 clips shaped like gTTS output."""
+    deck_dir = work_dir / "deck"
+    deck_dir.mkdir(parents=True)
+    digits = len(str(slides))
+    subprocess.run([
+        "ffmpeg", "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=1",
+        "-frames:v", str(slides), "-start_number", "1",
+        str(deck_dir / f"slide-%0{digits}d.png")
+    ], check=True, capture_output=True)
+    for i in range(1, slides + 1):
+        subprocess.run([
+            "ffmpeg", "-f", "lavfi", "-i", f"sine=frequency={200 + i * 10}:duration={seconds}",
+            "-ac", "1", "-ar", "24000", "-b:a", "32k",
+            str(deck_dir / f"slide-{i:0{digits}d}.mp3")
+        ], check=True, capture_output=True)
+    return sorted(deck_dir.glob("slide-*.png")), sorted(deck_dir.glob("slide-*.mp3"))
+
+
+def dir_size(path):
+    return sum(p.stat().st_size for p in Path(path).rglob("*") if p.is_file())
+
+
+def run_mode(mode, work_dir, png_files, audio_files, jobs, profile="default"):
+    run_dir = work_dir / f"{mode}-{profile}"
+    converter = PPTXToVideoConverter(
+        output_dir=run_dir / "output", temp_dir=run_dir / "temp",
+        jobs=jobs, render_mode=mode, encode_profile=profile
+    )
+    start = time.perf_counter()
+    if mode == "single-pass":
+        output = converter.render_single_pass(png_files, audio_files)
+    else:
+        videos = converter.encode_slide_videos(png_files, audio_files)
+        output = converter.concatenate_videos(videos)
+    wall = time.perf_counter() - start
+    duration = converter.probe_duration(output)
+    return {
+        "mode": mode,
+        "profile": profile,
+        "wall_seconds": round(wall, 3),
+        "video_seconds": round(duration, 3),
+        "realtime_factor": round(duration / wall, 2),
+        "intermediate_bytes": dir_size(converter.temp_dir),
+        "output_bytes": output.stat().st_size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare segments vs single-pass rendering")
+    parser.add_argument("--slides", type=int, default=60)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Narration length per slide")
+    parser.add_argument("--size", default="1920x1080", help="Slide image size WxH")
+    parser.add_argument("--jobs", type=int, default=1, help="Parallel encoders for segments mode")
+    parser.add_argument("--profiles", default="default",
+                        help=f"Comma-separated encode profiles ({', '.join(sorted(ENCODE_PROFILES))})")
+    parser.add_argument("--json", default=None, help="Also write results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory")
+    args = parser.parse_args()
+    profiles = args.profiles.split(",")
+    unknown = [p for p in profiles if p not in ENCODE_PROFILES]
+    if unknown:
+        parser.error(f"unknown encode profile(s): {', '.join(unknown)}")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="pptvo-bench-"))
+    try:
+        png_files, audio_files = make_deck(work_dir, args.slides, args.seconds, args.size)
+        results = [run_mode(mode, work_dir, png_files, audio_files, args.jobs, profile)
+                   for profile in profiles for mode in ("segments", "single-pass")]
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{args.slides} slides x {args.seconds:g}s at {args.size}, jobs={args.jobs}")
+    print(f"{'mode':<12} {'profile':<10} {'wall s':>8} {'x realtime':>11} {'temp MB':>9} {'output MB':>10}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['profile']:<10} {r['wall_seconds']:>8.2f} {r['realtime_factor']:>11.2f} "
+              f"{r['intermediate_bytes'] / 1e6:>9.1f} {r['output_bytes'] / 1e6:>10.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare bench_pipeline.py results between two commits.
+
+Runs are matched by benchmark configuration; for each match the median wall
+time of the whole pipeline and of every stage is shown with the relative
+change (negative = faster).
+
+    python benchmarks/compare.py 1a2b3c4 5d6e7f8
+    python benchmarks/compare.py benchmarks/results/1a2b3c4.json   # vs current commit
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+from bench_pipeline import git_commit, results_path
+
+
+def load(ref):
+    """Results of a commit id or a results JSON path, grouped by configuration key."""
+    path = Path(ref) if ref.endswith(".json") else results_path(ref)
+    if not path.exists():
+        raise SystemExit(f"ERROR: no benchmark results at {path}")
+    with open(path) as f:
+        data = json.load(f)
+    grouped = {}
+    for entry in data["runs"]:
+        group = grouped.setdefault(entry["key"], {"case": entry["case"], "runs": []})
+        group["runs"].extend(r for r in entry["runs"] if not r["error"])
+    return data["commit"], grouped
+
+
+def median_wall(runs, stage=None):
+    if stage is None:
+        values = [r["wall_s"] for r in runs]
+    else:
+        values = [r["stages"][stage]["wall_s"] for r in runs if stage in r["stages"]]
+    return statistics.median(values) if values else None
+
+
+def change(old, new):
+    if old is None or new is None:
+        return "-"
+    if old == 0:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results of two commits")
+    parser.add_argument("base", help="Commit id or results JSON")
+    parser.add_argument("head", nargs="?", default=None, help="Commit id or results JSON (default: HEAD)")
+    args = parser.parse_args()
+
+    base_commit, base = load(args.base)
+    head_commit, head = load(args.head or git_commit())
+
+    common = [key for key in base if key in head]
+    if not common:
+        print(f"No benchmark configuration was run on both {base_commit} and {head_commit}")
+        sys.exit(1)
+
+    for key in common:
+        case = base[key]["case"]
+        old_runs, new_runs = base[key]["runs"], head[key]["runs"]
+        if not old_runs or not new_runs:
+            continue
+        print(f"\n{case['pages']} pages, {case['words']} words/slide, {case['format']}, "
+              f"{case['pipeline']}/{case['render_mode']}, jobs={case['jobs']}, "
+              f"fake TTS {case['tts_latency']:g}s (runs: {len(old_runs)} vs {len(new_runs)})")
+        print(f"  {'stage':<12} {base_commit:>14} {head_commit:>14} {'change':>9}")
+        stages = list(dict.fromkeys(list(old_runs[0]["stages"]) + list(new_runs[0]["stages"])))
+        for stage in [None] + stages:
+            old, new = median_wall(old_runs, stage), median_wall(new_runs, stage)
+            fmt = lambda v: f"{v:.2f}s" if v is not None else "-"
+            print(f"  {stage or 'total':<12} {fmt(old):>14} {fmt(new):>14} {change(old, new):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Synthetic decks for benchmarks.
+
+Writes a PDF (no dependencies: the file is assembled by hand) or a PPTX
+(needs python-pptx) with a given number of pages, page size and amount of
+text per page, plus a matching script.txt. Content is generated from a seed,
+so the same arguments always produce the same deck.
+
+    python benchmarks/synthetic_deck.py --pages 50 --words 80 --out input/bench.pdf
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+WORDS = (
+    "pipeline video slide audio narration render frame encoder buffer stream "
+    "latency throughput cache worker queue segment image voice page deck "
+    "measure compare profile result quality speed memory process thread"
+).split()
+
+# 16:9 PowerPoint default (13.333 x 7.5 inch) in PDF points
+DEFAULT_PAGE_SIZE = (960, 540)
+
+
+def slide_words(rng, count):
+    return [rng.choice(WORDS) for _ in range(count)]
+
+
+def slide_texts(pages, words, seed=0):
+    """Narration per slide: `words` pseudo-random words, sentence-cased."""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(1, pages + 1):
+        body = slide_words(rng, words)
+        sentences = [" ".join(body[j:j + 12]) for j in range(0, len(body), 12)]
+        texts.append(" ".join(s.capitalize() + "." for s in sentences) or f"Slide {i}")
+    return texts
+
+
+def wrap(text, width):
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def page_stream(index, text, page_size):
+    """PDF content stream: a title, the slide text and a coloured bar."""
+    width, height = page_size
+    body_size = max(8, int(height / 24))
+    chars_per_line = int(width / (body_size * 0.5)) - 8
+    ops = [
+        "0.2 0.4 0.8 rg",
+        f"0 {height - height / 6:.1f} {width} {height / 6:.1f} re f",
+        "BT",
+        "1 1 1 rg",
+        f"/F1 {body_size * 2} Tf",
+        f"{width / 20:.1f} {height - height / 8:.1f} Td",
+        f"(Slide {index}) Tj",
+        "ET",
+        "BT",
+        "0 0 0 rg",
+        f"/F1 {body_size} Tf",
+        f"{body_size * 1.3:.1f} TL",
+        f"{width / 20:.1f} {height - height / 4:.1f} Td",
+    ]
+    for line in wrap(text, chars_per_line)[: int(height * 0.7 / (body_size * 1.3))]:
+        ops.append(f"({line}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_pdf(path, texts, page_size=DEFAULT_PAGE_SIZE):
+    """Write a minimal valid PDF with one page per text."""
+    objects = []  # object bodies; object n is objects[n - 1]
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for i, text in enumerate(texts, 1):
+        stream = page_stream(i, text, page_size)
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages, page_size[0], page_size[1], font, content)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+    objects[pages - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, xref)
+    Path(path).write_bytes(bytes(out))
+    return Path(path)
+
+
+def write_pptx(path, texts, page_size=DEFAULT_PAGE_SIZE):
+    """Write a PPTX with one title + text slide per text (requires python-pptx)."""
+    try:
+        from pptx import Presentation
+        from pptx.util import Pt
+    except ImportError:
+        raise SystemExit("ERROR: python-pptx is required for PPTX decks (pip install python-pptx)")
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Pt(page_size[0]), Pt(page_size[1])
+    layout = prs.slide_layouts[1]  # Title and Content
+    for i, text in enumerate(texts, 1):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {i}"
+        slide.placeholders[1].text = text
+    prs.save(str(path))
+    return Path(path)
+
+
+def write_script(path, texts):
+    """script.txt in the [SLIDE n] format read by PPTXToVideoConverter."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts, 1):
+            f.write(f"[SLIDE {i}]\n{text}\n\n")
+    return Path(path)
+
+
+def make_deck(out_path, pages, words=60, page_size=DEFAULT_PAGE_SIZE, seed=0, script=True):
+    """Write the deck (.pdf or .pptx by extension) and, optionally, script.txt next to it."""
+    out_path = Path(out_path)
+    texts = slide_texts(pages, words, seed)
+    if out_path.suffix.lower() == ".pptx":
+        write_pptx(out_path, texts, page_size)
+    else:
+        write_pdf(out_path, texts, page_size)
+    if script:
+        write_script(out_path.parent / "script.txt", texts)
+    return out_path, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark deck")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words", type=int, default=60, help="Narration words per slide")
+    parser.add_argument("--page-size", default="960x540", help="Page size in points WxH")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-script", action="store_true", help="Do not write script.txt")
+    parser.add_argument("--out", default="input/bench.pdf", help="Output .pdf or .pptx")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.page_size.lower().split("x"))
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    path, _ = make_deck(args.out, args.pages, args.words, (width, height), args.seed,
+                        script=not args.no_script)
+    print(f"Wrote {path} ({args.pages} pages)")
+
+
+if __name__ == "__main__":
+    main()
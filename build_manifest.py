@@ -0,0 +1,107 @@
+"""
+Incremental build manifest for the PPTX/PDF to Video pipeline.
+
+Stored as `manifest.json` in the temp directory. Every pipeline stage records
+the hashes of its inputs (source file, rendered PNG, audio, encoder settings)
+and the outputs it produced; on the next run a stage whose inputs hash the
+same and whose outputs still exist is skipped.
+
+File hashes are memoized by (size, mtime) so unchanged files are not re-read.
+All methods are thread-safe, so pipeline workers can share one manifest.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sha256_json(value):
+    """SHA-256 of a JSON-serializable value (key order independent)."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Per-stage input/output record used to skip work that is already done."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self.data = {"version": MANIFEST_VERSION, "stages": {}, "files": {}}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.data = data
+            except (OSError, ValueError):
+                # A corrupt manifest only means a full rebuild
+                pass
+
+    def file_hash(self, path):
+        """Content hash of `path`, reusing the stored hash while size and mtime are unchanged."""
+        path = Path(path)
+        st = path.stat()
+        key = str(path.absolute())
+        with self._lock:
+            entry = self.data["files"].get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+        digest = sha256_file(path)
+        with self._lock:
+            self.data["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def is_current(self, stage, inputs):
+        """True if `stage` last ran with exactly these inputs and all its output files still exist."""
+        with self._lock:
+            entry = self.data["stages"].get(stage)
+        if not entry or entry["inputs"] != inputs:
+            return False
+        for path in entry.get("files", []):
+            if not Path(path).exists():
+                return False
+        return True
+
+    def outputs(self, stage):
+        """Outputs recorded for `stage` (empty dict if it never ran)."""
+        with self._lock:
+            entry = self.data["stages"].get(stage)
+        return entry.get("outputs", {}) if entry else {}
+
+    def record(self, stage, inputs, outputs=None, files=()):
+        """Remember a completed stage. `files` are output paths that must exist for reuse."""
+        entry = {
+            "inputs": inputs,
+            "outputs": outputs or {},
+            "files": [str(p) for p in files],
+        }
+        with self._lock:
+            self.data["stages"][stage] = entry
+
+    def forget(self, prefix):
+        """Drop all stages whose name starts with `prefix`."""
+        with self._lock:
+            for stage in [s for s in self.data["stages"] if s.startswith(prefix)]:
+                del self.data["stages"][stage]
+
+    def save(self):
+        """Write the manifest atomically."""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
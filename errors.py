@@ -0,0 +1,57 @@
+"""
+Exceptions raised by the PPTX/PDF to Video pipeline.
+
+Every failure is a PipelineError subclass, so library callers can catch one
+type (or a specific one); the command line prints the message and exits 1.
+`stage` names the pipeline stage that failed when known (see progress).
+"""
+
+
+class PipelineError(Exception):
+    """Base class of all pipeline failures."""
+
+    def __init__(self, message, stage=None):
+        super().__init__(message)
+        self.stage = stage
+
+
+class InputError(PipelineError):
+    """The input deck or another given file does not exist or is unusable."""
+
+
+class DependencyError(PipelineError):
+    """A required external tool (FFmpeg, pdftoppm, LibreOffice) is missing."""
+
+
+class ConversionError(PipelineError):
+    """LibreOffice could not convert the deck to PDF."""
+
+
+class RasterError(PipelineError):
+    """pdftoppm could not render the PDF pages."""
+
+
+class TTSError(PipelineError):
+    """Narration could not be synthesized; `results` are the failed TTSResults."""
+
+    def __init__(self, message, results=(), stage="tts"):
+        super().__init__(message, stage)
+        self.results = list(results)
+
+
+class EncodeError(PipelineError):
+    """An FFmpeg/ffprobe run failed; `cmd`, `returncode` and `stderr` describe it."""
+
+    def __init__(self, message, cmd=None, returncode=None, stderr="", stage=None):
+        super().__init__(message, stage)
+        self.cmd = cmd
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class ShardError(PipelineError):
+    """Shard renders are missing, incomplete or incompatible (see shards)."""
+
+
+class PipelineCancelled(PipelineError):
+    """The run was stopped with PPTXToVideoConverter.cancel()."""
@@ -0,0 +1,126 @@
+"""
+Progressive HLS output: slides become playable while the deck is still rendering.
+
+Every finished slide video is remuxed (stream copy, no re-encode) to MPEG-TS
+segments in output/hls/ and appended to an EVENT playlist:
+
+    output/hls/index.m3u8
+    output/hls/slide-001-000.ts
+    output/hls/slide-001-001.ts
+    output/hls/slide-002-000.ts
+    ...
+
+#EXT-X-TARGETDURATION must not change while an EVENT playlist grows, but slide
+lengths follow the narration and are unknown until a slide is synthesized. So
+the target is fixed at SEGMENT_SECONDS and slides are cut into pieces of that
+length; the encoder forces a keyframe every SEGMENT_SECONDS (keyframe_args) so
+the stream-copy cuts land exactly on the grid.
+
+Slides finish out of order when encoders run in parallel; a slide is only added
+to the playlist once every slide before it is there, so the playlist is always
+a playable prefix of the deck. Each slide video starts at timestamp 0, so the
+slides are separated by #EXT-X-DISCONTINUITY. #EXT-X-ENDLIST is written when
+the run finishes, which turns the playlist into a complete VOD playlist.
+
+The playlist is rewritten atomically after every change, so a player (see
+hls_server) polling it never reads half a file.
+"""
+
+import csv
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from profiling import Profiler
+
+PLAYLIST_NAME = "index.m3u8"
+# Playlist target duration and the length slides are cut into
+SEGMENT_SECONDS = 6
+
+
+def keyframe_args(segment_seconds=SEGMENT_SECONDS):
+    """x264 options that put a keyframe on every segment boundary."""
+    return ["-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})"]
+
+
+class HLSWriter:
+    """Remuxes slide videos to TS segments and maintains the playlist for them."""
+
+    def __init__(self, directory, profiler=None, segment_seconds=SEGMENT_SECONDS):
+        self.directory = Path(directory)
+        self.profiler = profiler or Profiler()
+        self.playlist = self.directory / PLAYLIST_NAME
+        self.segment_seconds = segment_seconds
+        # slide index (0-based) -> (page number, [(segment file name, duration), ...])
+        self._segments = {}
+        self._published = 0
+        self._finished = False
+        self._lock = threading.Lock()
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True)
+        self._write()
+
+    def segment_command(self, video_path, segment_pattern, segment_list):
+        return ["ffmpeg", "-i", str(video_path), "-map", "0", "-c", "copy",
+                "-f", "segment", "-segment_time", str(self.segment_seconds),
+                "-segment_format", "mpegts", "-segment_list", str(segment_list),
+                "-segment_list_type", "csv", "-y", str(segment_pattern)]
+
+    def add(self, index, video_path, name=None, page=None):
+        """
+        Add slide `index` (0-based) from its finished video. `page` is its page
+        in the deck (default index + 1; differs with --pages and shards).
+        Raises CalledProcessError if the remux fails.
+        """
+        name = name or Path(video_path).stem
+        page = page or index + 1
+        segment_list = self.directory / f".{name}.csv"
+        self.profiler.run(self.segment_command(video_path, self.directory / f"{name}-%03d.ts",
+                                               segment_list), "hls", page)
+        # One "file,start,end" row per piece
+        with open(segment_list, newline="", encoding="utf-8") as f:
+            pieces = [(row[0], float(row[2]) - float(row[1])) for row in csv.reader(f) if row]
+        segment_list.unlink()
+        with self._lock:
+            self._segments[index] = (page, pieces)
+            published = self._published
+            while self._published in self._segments:
+                self._published += 1
+            if self._published > published:
+                self._write()
+
+    def finish(self):
+        """Mark the playlist complete (#EXT-X-ENDLIST)."""
+        with self._lock:
+            self._finished = True
+            self._write()
+        return self.playlist
+
+    @property
+    def published(self):
+        """Number of slides currently in the playlist."""
+        return self._published
+
+    def _write(self):
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            # Fixed for the whole run (RFC 8216 6.2.1); pieces never exceed it
+            f"#EXT-X-TARGETDURATION:{self.segment_seconds}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for i in range(self._published):
+            if i:
+                lines.append("#EXT-X-DISCONTINUITY")
+            page, pieces = self._segments[i]
+            for segment, duration in pieces:
+                lines.append(f"#EXTINF:{duration:.3f},Slide {page}")
+                lines.append(segment)
+        if self._finished:
+            lines.append("#EXT-X-ENDLIST")
+        tmp = self.playlist.with_suffix(".m3u8.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.playlist)
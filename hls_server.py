@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server for progressive HLS output (--hls).
+
+Serves a directory (default: output/) with the right MIME types and no caching
+for playlists, plus a small player page, so a render can be reviewed from slide
+1 while later slides are still being encoded:
+
+    python pptx_to_video.py --file presentation.pptx --hls &
+    python hls_server.py --dir output
+    # open http://localhost:8765/  (player for hls/index.m3u8)
+
+The player uses the browser's native HLS support (Safari) or hls.js, starts at
+the first slide and keeps polling the playlist until the render finishes.
+`/player.html?src=<playlist path>` plays any playlist below the served
+directory. With hls_only (the Streamlit app serving jobs/) nothing but
+playlists and segments inside hls/ directories is served, so uploaded decks,
+scripts and logs stay private.
+"""
+
+import argparse
+import functools
+import json
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+DEFAULT_PORT = 8765
+DEFAULT_PLAYLIST = "hls/index.m3u8"
+
+PLAYER_HTML = """<!doctype html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>ppt-auto-vo preview</title>
+<script src="https://cdn.jsdelivr.net/npm/hls.js@1"></script>
+<style>body {{ margin: 0; background: #111; }} video {{ width: 100%; max-height: 100vh; }}</style>
+</head>
+<body>
+<video id="video" controls autoplay muted></video>
+<script>
+const src = {src};
+const video = document.getElementById("video");
+if (video.canPlayType("application/vnd.apple.mpegurl")) {{
+  video.src = src;
+}} else if (window.Hls && Hls.isSupported()) {{
+  // EVENT playlists would otherwise start at the live edge (the newest slide)
+  const hls = new Hls({{startPosition: 0}});
+  hls.loadSource(src);
+  hls.attachMedia(video);
+}} else {{
+  document.body.insertAdjacentHTML("beforeend", "<p style='color:#eee'>HLS is not supported by this browser.</p>");
+}}
+</script>
+</body>
+</html>
+"""
+
+
+HLS_SUFFIXES = (".m3u8", ".ts")
+
+
+class HLSRequestHandler(SimpleHTTPRequestHandler):
+    # Only serve */hls/*.m3u8 and */hls/*.ts besides the player (HLSOnlyRequestHandler)
+    hls_only = False
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        ".m3u8": "application/vnd.apple.mpegurl",
+        ".ts": "video/mp2t",
+        ".mp4": "video/mp4",
+    }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path in ("/", "/player.html"):
+            src = parse_qs(url.query).get("src", [DEFAULT_PLAYLIST])[0]
+            src = json.dumps("/" + src.lstrip("/")).replace("</", "<\\/")
+            body = PLAYER_HTML.format(src=src).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.hls_only and not self.is_hls_path(url.path):
+            self.send_error(404)
+            return
+        super().do_GET()
+
+    def do_HEAD(self):
+        if self.hls_only and not self.is_hls_path(urlparse(self.path).path):
+            self.send_error(404)
+            return
+        super().do_HEAD()
+
+    @staticmethod
+    def is_hls_path(path):
+        parts = unquote(path).split("/")
+        return (len(parts) > 2 and parts[-2] == "hls" and ".." not in parts
+                and parts[-1].endswith(HLS_SUFFIXES))
+
+    def end_headers(self):
+        # The playlist changes while rendering; segments never do
+        if self.path.split("?")[0].endswith(".m3u8"):
+            self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HLSOnlyRequestHandler(HLSRequestHandler):
+    """The player plus playlists and segments in hls/ directories, nothing else."""
+    hls_only = True
+
+
+def make_server(directory="output", host="127.0.0.1", port=DEFAULT_PORT, hls_only=False):
+    """HTTP server for `directory` (not started yet)."""
+    handler_class = HLSOnlyRequestHandler if hls_only else HLSRequestHandler
+    handler = functools.partial(handler_class, directory=str(Path(directory).resolve()))
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_background(directory="output", host="127.0.0.1", port=DEFAULT_PORT, hls_only=False):
+    """Start the server on a daemon thread and return it. Raises OSError if the port is taken."""
+    server = make_server(directory, host, port, hls_only)
+    threading.Thread(target=server.serve_forever, daemon=True, name="hls-server").start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve progressive HLS output with a preview player")
+    parser.add_argument("--dir", "-d", default="output", help="Directory to serve (contains hls/)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", "-p", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    server = make_server(args.dir, args.host, args.port)
+    print(f"Serving {args.dir} on http://{args.host}:{args.port}/ (player for {DEFAULT_PLAYLIST})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+Background job queue for the Streamlit app.
+
+Each submitted render becomes a Job with its own workspace:
+
+    jobs/<id>/input/    copy of the deck and script.txt at submit time
+    jobs/<id>/temp/     pipeline intermediates
+    jobs/<id>/output/   output.mp4
+    jobs/<id>/log.txt   full pipeline log
+    jobs/<id>/job.json  status record (the history survives app restarts)
+
+A fixed number of worker threads run the jobs, so concurrent users never
+share input/temp/output and a long render does not block the UI, which only
+polls job status. By default each job runs `pptx_to_video.py` as a subprocess:
+progress (percent, stage, slide, ETA) comes from its JSON progress events on
+stderr and stdout is the human-readable log, kept as a bounded ring buffer.
+With `in_process=True` jobs call api.convert() in the worker thread instead
+(no interpreter start-up per job); the log then lists the progress events and
+the pipeline's own output goes to the app's console.
+
+Jobs can be cancelled while queued or running (a subprocess job's whole
+process group is terminated, FFmpeg included; an in-process job is stopped
+with PPTXToVideoConverter.cancel()).
+"""
+
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """One pipeline run and its status."""
+    id: str
+    filename: str
+    language: str
+    args: list
+    workspace: str
+    status: str = QUEUED
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    returncode: Optional[int] = None
+    percent: float = 0.0
+    eta: Optional[float] = None
+    stage: str = ""
+    message: str = ""
+
+    @property
+    def progress(self):
+        """Overall completion in [0, 1] (from the pipeline's progress events)."""
+        if self.status == DONE:
+            return 1.0
+        return min(100.0, self.percent) / 100
+
+    @property
+    def draft(self):
+        return "--draft" in self.args
+
+    @property
+    def output_dir(self):
+        # Draft renders write to output/draft and temp/draft
+        output_dir = Path(self.workspace) / "output"
+        return output_dir / "draft" if self.draft else output_dir
+
+    @property
+    def temp_dir(self):
+        temp_dir = Path(self.workspace) / "temp"
+        return temp_dir / "draft" if self.draft else temp_dir
+
+    @property
+    def output(self):
+        return self.output_dir / "output.mp4"
+
+    @property
+    def log_path(self):
+        return Path(self.workspace) / "log.txt"
+
+    @property
+    def elapsed(self):
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobQueue:
+    """Runs pipeline jobs on `workers` background threads."""
+
+    def __init__(self, root="jobs", workers=2, script=None, log_lines=1000, in_process=False,
+                 options=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.script = Path(script) if script else Path(__file__).parent / "pptx_to_video.py"
+        self.log_lines = log_lines
+        self.in_process = in_process
+        # In-process jobs: keyword arguments for api.convert() besides the job's own
+        self.options = dict(options or {})
+        self._cancel_events = {}
+        self._jobs = {}
+        self._logs = {}
+        self._procs = {}
+        self._queue = queue.Queue()
+        self._save_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._load_history()
+        self._threads = [threading.Thread(target=self._worker, daemon=True, name=f"job-worker-{i}")
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+    # --- public API -------------------------------------------------------
+
+    def submit(self, deck_path, language="en", script_path=None, args=()):
+        """Copy the deck (and script) into a fresh workspace and queue it. Returns the Job."""
+        deck_path = Path(deck_path)
+        job_id = uuid.uuid4().hex[:12]
+        workspace = self.root / job_id
+        (workspace / "input").mkdir(parents=True)
+        shutil.copy2(deck_path, workspace / "input" / deck_path.name)
+        if script_path and Path(script_path).exists():
+            shutil.copy2(script_path, workspace / "input" / "script.txt")
+
+        job = Job(id=job_id, filename=deck_path.name, language=language, args=list(args),
+                  workspace=str(workspace))
+        with self._lock:
+            self._jobs[job_id] = job
+            self._logs[job_id] = deque(maxlen=self.log_lines)
+        self._save(job)
+        self._queue.put(job_id)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """All jobs, newest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def log(self, job_id):
+        """Last `log_lines` lines of a job's log."""
+        with self._lock:
+            lines = self._logs.get(job_id)
+            if lines is not None:
+                return list(lines)
+        job = self.get(job_id)
+        if job and job.log_path.exists():
+            with open(job.log_path, encoding="utf-8", errors="replace") as f:
+                return [line.rstrip("\n") for line in deque(f, maxlen=self.log_lines)]
+        return []
+
+    def position(self, job_id):
+        """1-based place in the queue of a queued job (None otherwise)."""
+        with self._lock:
+            queued = [j for j in sorted(self._jobs.values(), key=lambda j: j.created)
+                      if j.status == QUEUED]
+        for n, job in enumerate(queued, 1):
+            if job.id == job_id:
+                return n
+        return None
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if it already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.status in FINISHED:
+                return False
+            proc = self._procs.get(job_id)
+            cancel_event = self._cancel_events.get(job_id)
+            job.status = CANCELLED
+            job.finished = time.time()
+            job.message = "Dibatalkan"
+        if cancel_event:
+            cancel_event.set()
+        if proc and proc.poll() is None:
+            self._terminate(proc)
+        self._save(job)
+        return True
+
+    def delete(self, job_id):
+        """Remove a finished job and its workspace from the history."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.status not in FINISHED:
+                return False
+            del self._jobs[job_id]
+            self._logs.pop(job_id, None)
+        shutil.rmtree(job.workspace, ignore_errors=True)
+        return True
+
+    def prune(self, keep=50):
+        """Delete the oldest finished jobs beyond the newest `keep`."""
+        finished = [j for j in self.jobs() if j.status in FINISHED]
+        for job in finished[keep:]:
+            self.delete(job.id)
+
+    # --- workers ----------------------------------------------------------
+
+    def command(self, job):
+        workspace = Path(job.workspace)
+        return [sys.executable, "-u", str(self.script),
+                "--input", str(workspace / "input"), "--temp", str(workspace / "temp"),
+                "--output", str(workspace / "output"), "--file", job.filename,
+                "--language", job.language, "--progress-json", "-"] + job.args
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                with self._lock:
+                    job = self._jobs[job_id]
+                    job.status = FAILED
+                    job.message = f"Worker error: {e}"
+                    job.finished = time.time()
+                self._save(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status != QUEUED:
+                # Cancelled while waiting
+                self._logs.pop(job_id, None)
+                return
+            if self.in_process:
+                # Registered before the job shows as running, so cancel() always finds it
+                cancel_event = self._cancel_events[job_id] = threading.Event()
+            job.status = RUNNING
+            job.started = time.time()
+        self._save(job)
+
+        if self.in_process:
+            self._run_in_process(job, cancel_event)
+            return
+        lines = self._logs[job_id]
+        with open(job.log_path, "w", encoding="utf-8") as log:
+            proc = subprocess.Popen(self.command(job), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, bufsize=1, cwd=str(self.script.parent),
+                                    start_new_session=(os.name == "posix"))
+            with self._lock:
+                self._procs[job_id] = proc
+                cancelled = job.status == CANCELLED
+            if cancelled:
+                self._terminate(proc)
+            log_lock = threading.Lock()
+            events = threading.Thread(target=self._read_events, args=(job, proc.stderr, log, log_lock),
+                                      daemon=True)
+            events.start()
+            for raw in proc.stdout:
+                with log_lock:
+                    log.write(raw)
+                    log.flush()
+                with self._lock:
+                    lines.append(raw.rstrip())
+            events.join()
+            proc.wait()
+
+        with self._lock:
+            self._procs.pop(job_id, None)
+            job.returncode = proc.returncode
+            if job.status != CANCELLED:
+                job.status = DONE if proc.returncode == 0 and job.output.exists() else FAILED
+                job.finished = time.time()
+                if job.status == DONE:
+                    job.message = "Selesai"
+                elif not job.message.startswith("ERROR"):
+                    job.message = f"ERROR: exit code {proc.returncode}" + (f" ({job.message})" if job.message else "")
+            # Keep memory bounded: finished logs are read back from log.txt
+            self._logs.pop(job_id, None)
+        self._save(job)
+
+    def _run_in_process(self, job, cancel_event):
+        """Run the job with api.convert() in this worker thread."""
+        from api import convert
+        from errors import PipelineCancelled, PipelineError
+        from pptx_to_video import parse_pages
+
+        workspace = Path(job.workspace)
+        options = dict(self.options)
+        # Same flags as the subprocess command line
+        args = list(job.args)
+        for flag, key in (("--tts-engine", "tts_engine"), ("--tts-voice", "tts_voice"), ("--pages", "pages")):
+            if flag in args:
+                options[key] = args[args.index(flag) + 1]
+        for flag, key in (("--hls", "hls"), ("--draft", "draft")):
+            if flag in args:
+                options[key] = True
+        with self._lock:
+            lines = self._logs[job.id]
+        error = None
+        with open(job.log_path, "w", encoding="utf-8") as log:
+            def on_event(event):
+                line = self._apply_event(job, event)
+                if line:
+                    log.write(line + "\n")
+                    log.flush()
+
+            try:
+                if "pages" in options:
+                    options["pages"] = parse_pages(options["pages"])
+                convert(workspace / "input" / job.filename, output_dir=workspace / "output",
+                        temp_dir=workspace / "temp", language=job.language,
+                        on_progress=on_event, cancel_event=cancel_event, **options)
+            except PipelineCancelled:
+                pass
+            except (PipelineError, ValueError) as e:
+                error = str(e)
+                log.write(f"ERROR: {error}\n")
+                with self._lock:
+                    lines.append(f"ERROR: {error}")
+
+        with self._lock:
+            self._cancel_events.pop(job.id, None)
+            if job.status != CANCELLED:
+                job.status = FAILED if error or not job.output.exists() else DONE
+                job.returncode = 1 if job.status == FAILED else 0
+                job.finished = time.time()
+                job.message = "Selesai" if job.status == DONE else f"ERROR: {error}"
+            self._logs.pop(job.id, None)
+        self._save(job)
+
+    def _apply_event(self, job, event):
+        """Update the job from one progress event; returns a log line for it (or None)."""
+        with self._lock:
+            lines = self._logs.get(job.id)
+            job.percent = event.get("percent", job.percent)
+            job.eta = event.get("eta")
+            job.stage = event.get("stage") or job.stage
+            line = None
+            if event["event"] == "error":
+                job.message = event.get("message", "")
+                line = f"ERROR [{job.stage}]: {job.message}"
+            elif event["event"] == "progress" and job.stage:
+                slide = f" slide {event['slide']}" if "slide" in event else ""
+                job.message = f"{job.stage}{slide} ({event.get('done')}/{event.get('total')})"
+                line = f"[{event['percent']:5.1f}%] {job.message}"
+            elif event["event"] == "stage_start":
+                job.message = job.stage
+                line = f"[{event['percent']:5.1f}%] {job.stage}..."
+            elif event["event"] == "done":
+                line = f"[100.0%] {event.get('output')}"
+            if line and lines is not None:
+                lines.append(line)
+            return line
+
+    def _read_events(self, job, stream, log, log_lock):
+        """Apply JSON progress events from stderr to the job; anything else (tracebacks) is logged."""
+        lines = self._logs[job.id]
+        for raw in stream:
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                event = None
+            if not isinstance(event, dict) or "event" not in event:
+                with log_lock:
+                    log.write(raw)
+                    log.flush()
+                with self._lock:
+                    lines.append(raw.rstrip())
+                continue
+            line = self._apply_event(job, event)
+            if line and line.startswith("ERROR"):
+                # The subprocess prints its own log; only errors are added to it
+                with log_lock:
+                    log.write(line + "\n")
+                    log.flush()
+
+    @staticmethod
+    def _terminate(proc):
+        """Stop the pipeline and every FFmpeg/pdftoppm it started."""
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+        except (ProcessLookupError, OSError):
+            pass
+
+    # --- persistence ------------------------------------------------------
+
+    def _save(self, job):
+        path = Path(job.workspace) / "job.json"
+        if not path.parent.exists():
+            return
+        # One writer at a time, so a later snapshot is never overwritten by an earlier one
+        with self._save_lock:
+            with self._lock:
+                data = asdict(job)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+                raise
+
+    def _load_history(self):
+        for path in self.root.glob("*/job.json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    job = Job(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                continue
+            if job.status not in FINISHED:
+                # The app restarted while this job was queued or running
+                job.status = FAILED
+                job.message = "Dihentikan (aplikasi di-restart)"
+                job.finished = job.finished or time.time()
+                self._save(job)
+            self._jobs[job.id] = job
@@ -0,0 +1,188 @@
+"""
+PPTX -> PDF conversion with LibreOffice, paying its cold start once per run.
+
+OfficeConverter uses one of two strategies:
+
+- listener: when `unoserver` / `unoconvert` are installed, one long-lived
+  LibreOffice process is started on first use and every deck is converted
+  through it with `unoconvert`.
+- soffice: otherwise `prefetch()` converts many decks with a single
+  `soffice --headless --convert-to pdf a.pptx b.pptx ...` run, and convert()
+  picks up the prefetched PDF (or runs soffice for a single deck).
+
+Failed conversions raise subprocess.CalledProcessError, like a plain soffice call.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from profiling import Profiler
+
+
+def listener_available():
+    return bool(shutil.which("unoserver") and shutil.which("unoconvert"))
+
+
+def free_ports(count):
+    """`count` distinct TCP ports on 127.0.0.1 that nothing listens on right now."""
+    socks = [socket.socket() for _ in range(count)]
+    try:
+        for sock in socks:
+            sock.bind(("127.0.0.1", 0))
+        return [sock.getsockname()[1] for sock in socks]
+    finally:
+        for sock in socks:
+            sock.close()
+
+
+class OfficeConverter:
+    """Converts office documents to PDF, reusing one LibreOffice where possible."""
+
+    # Seconds to wait for the listener to accept connections
+    START_TIMEOUT = 60
+
+    def __init__(self, mode="auto", port=None, profiler=None):
+        """`port=None` picks free ports when the listener starts, so runs never share one."""
+        if mode == "auto":
+            mode = "listener" if listener_available() else "soffice"
+        self.mode = mode
+        self.port = port
+        # LibreOffice's own UNO port behind unoserver (unoserver's default if None)
+        self.uno_port = None
+        self.profiler = profiler or Profiler()
+        self._server = None
+        self._prefetched = {}
+        self._staging = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- listener ---------------------------------------------------------
+
+    def _port_open(self):
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def start(self):
+        """Start the LibreOffice listener (listener mode only; no-op if already running)."""
+        with self._lock:
+            if self.mode != "listener" or self._server:
+                return
+            if self.port is None:
+                self.port, self.uno_port = free_ports(2)
+            elif self._port_open():
+                # Most likely another run's listener; converting through it would mix the runs up
+                print(f"   [!] Port {self.port} is already in use, falling back to soffice")
+                self.mode = "soffice"
+                return
+            print(f"   Starting LibreOffice listener (unoserver, port {self.port})...")
+            cmd = ["unoserver", "--interface", "127.0.0.1", "--port", str(self.port)]
+            if self.uno_port:
+                cmd += ["--uno-port", str(self.uno_port)]
+            self._server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            deadline = time.monotonic() + self.START_TIMEOUT
+            while not self._port_open():
+                if self._server.poll() is not None or time.monotonic() > deadline:
+                    print("   [!] LibreOffice listener did not start, falling back to soffice")
+                    self._stop_server()
+                    self.mode = "soffice"
+                    return
+                time.sleep(0.2)
+
+    def _stop_server(self):
+        if self._server and self._server.poll() is None:
+            self._server.terminate()
+            try:
+                self._server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._server.kill()
+        self._server = None
+
+    def close(self):
+        """Stop the listener and remove prefetched PDFs that were never used."""
+        self._stop_server()
+        if self._staging:
+            shutil.rmtree(self._staging, ignore_errors=True)
+            self._staging = None
+        self._prefetched.clear()
+
+    # --- soffice batch ----------------------------------------------------
+
+    @staticmethod
+    def _source_key(path):
+        path = Path(path).resolve()
+        return str(path), path.stat().st_mtime_ns
+
+    def prefetch(self, sources):
+        """
+        soffice mode: convert all `sources` now, in as few soffice runs as
+        possible (one per group of distinct file names).
+        """
+        if self.mode != "soffice" or not sources:
+            return
+        if self._staging is None:
+            self._staging = Path(tempfile.mkdtemp(prefix="pptvo-office-"))
+        groups = []
+        for source in sources:
+            # soffice names outputs after the input stem, so equal stems need separate runs
+            for group in groups:
+                if source.stem not in {s.stem for s in group}:
+                    group.append(source)
+                    break
+            else:
+                groups.append([source])
+
+        print(f"   Converting {len(sources)} decks to PDF with {len(groups)} LibreOffice run(s)...")
+        for n, group in enumerate(groups):
+            out_dir = self._staging / str(n)
+            out_dir.mkdir()
+            cmd = ["soffice", "--headless", "--convert-to", "pdf", "--outdir", str(out_dir)]
+            try:
+                self.profiler.run(cmd + [str(s) for s in group], "soffice")
+            except (subprocess.CalledProcessError, FileNotFoundError) as e:
+                # Convert these decks one by one later, so one bad file only fails itself
+                print(f"   [!] Batch conversion failed ({e}), converting decks separately")
+                continue
+            for source in group:
+                pdf = out_dir / f"{source.stem}.pdf"
+                if pdf.exists():
+                    self._prefetched[self._source_key(source)] = pdf
+
+    # --- conversion -------------------------------------------------------
+
+    def convert(self, source, pdf_path):
+        """Convert `source` to `pdf_path`. Raises CalledProcessError on failure."""
+        source = Path(source)
+        pdf_path = Path(pdf_path)
+        prefetched = self._prefetched.pop(self._source_key(source), None)
+        if prefetched and prefetched.exists():
+            shutil.move(str(prefetched), str(pdf_path))
+            return pdf_path
+
+        self.start()
+        if self.mode == "listener":
+            cmd = ["unoconvert", "--port", str(self.port), "--convert-to", "pdf",
+                   str(source), str(pdf_path)]
+            self.profiler.run(cmd, "unoconvert")
+            return pdf_path
+
+        cmd = ["soffice", "--headless", "--convert-to", "pdf",
+               "--outdir", str(pdf_path.parent), str(source)]
+        self.profiler.run(cmd, "soffice")
+        generated = pdf_path.parent / f"{source.stem}.pdf"
+        if generated.exists() and generated != pdf_path:
+            os.replace(generated, pdf_path)
+        return pdf_path
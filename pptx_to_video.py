@@ -4,37 +4,276 @@ PPTX/PDF to Video Pipeline
 Converts PowerPoint presentations or PDF files to MP4 video slideshows with voiceover.
 
 Pipeline: PPTX/PDF → PDF → RAW PNG (via pdftoppm) → Audio (TTS) → Individual Videos → Final MP4
+(and/or an HLS playlist that grows as slide videos finish, see hls_output)
 
 This ensures consistent RAW PNG extraction from PDF for all input types.
 """
 
+import math
 import os
 import sys
 import subprocess
 import shutil
-import time
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from gtts import gTTS
+from typing import Optional
+
+from audio_cache import AudioCache, audio_key, link_or_copy
+from batch import BatchRunner, find_decks
+from build_manifest import BuildManifest, sha256_json
+from errors import (
+    ConversionError, DependencyError, EncodeError, InputError, PipelineCancelled, PipelineError,
+    RasterError, TTSError,
+)
+from hls_output import SEGMENT_SECONDS, HLSWriter, keyframe_args
+from office_convert import OfficeConverter
+from profiling import Profiler
+from progress import ProgressReporter
+from shards import format_pages, write_shard
+from streaming_pipeline import StreamingPipeline
+from text_extract import TEXT_EXTRACTORS, make_text_extractor
+from tts_engine import (
+    TTS_BACKENDS, GTTSBackend, TTSRequest, TTSResult, TTSScheduler, audio_info,
+    format_report, make_tts_backend, split_text, stitch_clips,
+)
+
+
+# pdftoppm output options and file extension per intermediate image format.
+# pdftoppm has no PNG compression level switch; PPM skips compression entirely.
+RASTER_FORMATS = {
+    "png": (["-png"], "png"),
+    "ppm": ([], "ppm"),
+    "jpeg": (["-jpeg", "-jpegopt", "quality=95"], "jpg"),
+}
+
+# x264 settings per --encode-profile (None = FFmpeg's default).
+# "still" reads the looped slide image at `source_fps`, writes `fps` frames per
+# second and a keyframe every `gop_seconds`, so encoding a slide costs a few
+# frames per second of narration instead of 25 full-resolution ones.
+ENCODE_PROFILES = {
+    "default": {"source_fps": None, "fps": None, "preset": None, "crf": None, "gop_seconds": None},
+    "still": {"source_fps": 1, "fps": 5, "preset": "veryfast", "crf": 23, "gop_seconds": 10},
+}
+# Output frame rate when the profile leaves it to FFmpeg (the -loop 1 image input default)
+DEFAULT_FPS = 25
+
+# --draft: small frames and the fastest x264 settings, for reviewing narration
+DRAFT_RESOLUTION = (640, 360)
+DRAFT_CRF = 32
+
+# MP4 audio stream language tags are ISO 639-2; TTS languages are mostly 639-1
+ISO639_2 = {
+    "ar": "ara", "de": "deu", "en": "eng", "es": "spa", "fr": "fra", "hi": "hin", "id": "ind",
+    "it": "ita", "ja": "jpn", "jv": "jav", "ko": "kor", "ms": "msa", "nl": "nld", "pt": "por",
+    "ru": "rus", "su": "sun", "th": "tha", "tr": "tur", "vi": "vie", "zh": "zho",
+}
+# Audio tracks of a multi-language render (--languages): "tracks" = one MP4 with an
+# audio stream per language, "separate" = output.<lang>.mp4 each, same video stream
+LANGUAGE_OUTPUTS = ("tracks", "separate")
+# Narration tracks are re-encoded once per language (every slide is padded to the
+# longest language's clip); this bitrate applies unless --audio-bitrate is given
+TRACK_AUDIO_BITRATE = "128k"
+
+
+def parse_pages(spec):
+    """Page selection like "1,3,5-7" -> sorted page numbers. Raises ValueError."""
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        try:
+            first, last = int(first), int(last if dash else first)
+        except ValueError:
+            raise ValueError(f"invalid page range {part!r}")
+        if first < 1 or last < first:
+            raise ValueError(f"invalid page range {part!r}")
+        pages.update(range(first, last + 1))
+    if not pages:
+        raise ValueError(f"no pages in {spec!r}")
+    return sorted(pages)
+
+
+def slide_videos(temp_dir):
+    """
+    (page number, video) for every slide of the last render in `temp_dir`, in
+    page order. Repeated slides have no encode of their own and map to the
+    video they share.
+    """
+    manifest = BuildManifest(Path(temp_dir) / "manifest.json")
+    videos = {}
+    for stage, entry in manifest.data["stages"].items():
+        kind, _, stem = stage.partition(":")
+        if kind in ("segment", "shared") and entry["files"]:
+            videos[int(stem.split("-")[-1])] = Path(entry["files"][0])
+    return [(page, videos[page]) for page in sorted(videos) if videos[page].exists()]
+
+
+_tool_versions = {}
+_tool_versions_lock = threading.Lock()
+
+
+def tool_version(*cmd):
+    """
+    First line of the version output of `cmd` (e.g. "ffmpeg", "-version"), or
+    None if it does not run. Successful probes are cached for the process; a
+    tool that is missing now is probed again next time (it may be installed meanwhile).
+    """
+    with _tool_versions_lock:
+        if cmd in _tool_versions:
+            return _tool_versions[cmd]
+    try:
+        result = subprocess.run(list(cmd), capture_output=True, text=True, errors="replace", check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    lines = (result.stdout or result.stderr).strip().splitlines()
+    version = lines[0] if lines else cmd[0]
+    with _tool_versions_lock:
+        _tool_versions[cmd] = version
+    return version
+
+
+def discover_tools():
+    """External tools and their versions (None = not installed), probed once per process."""
+    return {
+        "ffmpeg": tool_version("ffmpeg", "-version"),
+        "pdftoppm": tool_version("pdftoppm", "-v"),
+        "pdftotext": tool_version("pdftotext", "-v"),
+        # Path only: starting LibreOffice just for its version takes seconds
+        "soffice": shutil.which("soffice"),
+    }
 
-try:
-    from PyPDF2 import PdfReader
-    HAS_PYPDF2 = True
-except ImportError:
-    HAS_PYPDF2 = False
+
+@dataclass
+class PipelineResult:
+    """What a successful PPTXToVideoConverter.process() run produced."""
+    output: Path
+    slides: int
+    pdf: Path
+    seconds: float = 0.0
+    # HLS playlist (--hls); `output` is the playlist itself when no MP4 was written
+    playlist: Optional[Path] = None
+    # Multi-language runs (--languages): language -> MP4 with its audio
+    outputs: Optional[dict] = None
 
 
 class PPTXToVideoConverter:
     """Main converter class for PPTX/PDF to MP4 pipeline."""
     
-    def __init__(self, input_dir="input", output_dir="output", temp_dir="temp", background_path=None):
+    def __init__(self, input_dir="input", output_dir="output", temp_dir="temp", background_path=None,
+                 jobs=1, tts_backend=None, tts_workers=4, tts_rate=2.0, tts_burst=2,
+                 tts_max_attempts=5, audio_cache=None, render_mode="segments",
+                 resolution=(1920, 1080), dpi=None, raster_format="png", raster_jobs=0,
+                 pipeline="staged", max_pending=4, tts_chunk_chars=300, tts_chunk_gap=0.25,
+                 profiler=None, office=None, tts_scheduler=None, encode_pool=None, script_path=None,
+                 progress=None, encode_profile="default", x264_preset=None, crf=None, fps=None,
+                 audio_bitrate=None, text_extractor="auto", pipe_images=False, hls=False, mp4=True,
+                 languages=None, language_output="tracks", draft=False, pages=None, shard_dir=None):
         """
         Initialize the converter.
+
+        jobs: number of slide videos encoded concurrently (0 = pick from CPU count).
+        tts_backend: tts_engine.TTSBackend instance; defaults to gTTS.
+        tts_workers / tts_rate / tts_burst / tts_max_attempts: TTS concurrency,
+        requests per second, burst size and retry cap (see tts_engine.TTSScheduler).
+        audio_cache: AudioCache shared across runs, or None to always synthesize.
+        render_mode: "segments" (one MP4 per slide + concat) or "single-pass"
+        (one FFmpeg run straight to output/output.mp4).
+        resolution: (width, height) box the slides are rasterized to fit in.
+        dpi: rasterize at a fixed DPI instead (the old behaviour used 300).
+        raster_format: intermediate image format, one of RASTER_FORMATS.
+        raster_jobs: parallel pdftoppm processes (0 = one per CPU).
+        pipeline: "staged" (all PNGs, then all audio, then all videos) or
+        "streaming" (stages overlap per slide, see streaming_pipeline).
+        max_pending: streaming back-pressure, slides rasterized but not yet encoded.
+        tts_chunk_chars: narration longer than this is synthesized in sentence
+        chunks (0 = never split); tts_chunk_gap: silence between chunks in seconds.
+        profiler: profiling.Profiler that records stages and external processes.
+        office: office_convert.OfficeConverter for PPTX -> PDF (shared in batch mode).
+        tts_scheduler / encode_pool: TTSScheduler and ThreadPoolExecutor shared
+        between decks in batch mode, so rate limits and encoder count are global.
+        script_path: narration script (default: <input_dir>/script.txt).
+        progress: progress.ProgressReporter receiving stage/slide progress events.
+        encode_profile: one of ENCODE_PROFILES; x264_preset / crf / fps override it.
+        audio_bitrate: encode the narration to AAC at this fixed bitrate (e.g. "128k").
+        text_extractor: text_extract backend used without a script ("auto" = first available).
+        pipe_images: stream each page from pdftoppm to FFmpeg as PPM over a pipe
+        instead of writing slide images to temp/slides (streaming pipeline only).
+        hls: also write output/hls/index.m3u8, extended slide by slide as videos finish.
+        mp4: concatenate output/output.mp4 at the end (may only be False with hls).
+        languages: render several languages in one run (slide images and video
+        encoded once, narration per language from script.<lang>.txt); overrides
+        the `language` given to process(). language_output: one of LANGUAGE_OUTPUTS.
+        draft: quick preview render (DRAFT_RESOLUTION, ultrafast x264) into
+        <output_dir>/draft and <temp_dir>/draft, so the full render's files stay.
+        pages: render only these page numbers (e.g. parse_pages("1,3,5-7")).
+        shard_dir: write the slide videos and shard.json there instead of the
+        final MP4, to be merged with the other page ranges (see shards).
         """
+        if draft:
+            resolution, dpi, raster_format = DRAFT_RESOLUTION, None, "ppm"
+            encode_profile = "still"
+            x264_preset = x264_preset or "ultrafast"
+            crf = DRAFT_CRF if crf is None else crf
+            output_dir = Path(output_dir) / "draft"
+            temp_dir = Path(temp_dir) / "draft"
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.temp_dir = Path(temp_dir)
         self.background_path = Path(background_path) if background_path else None
+        self.jobs = jobs
+        self.tts_backend = tts_backend or GTTSBackend()
+        self.tts_workers = tts_workers
+        self.tts_rate = tts_rate
+        self.tts_burst = tts_burst
+        self.tts_max_attempts = tts_max_attempts
+        self.audio_cache = audio_cache
+        self.render_mode = render_mode
+        self.resolution = tuple(resolution)
+        self.dpi = dpi
+        self.raster_format = raster_format
+        self.raster_jobs = raster_jobs
+        self.pipeline = pipeline
+        self.max_pending = max_pending
+        self.tts_chunk_chars = tts_chunk_chars
+        self.tts_chunk_gap = tts_chunk_gap
+        self.profiler = profiler or Profiler()
+        if getattr(self.tts_backend, "profiler", False) is None:
+            # Engine processes (espeak-ng, piper) are profiled like FFmpeg and pdftoppm
+            self.tts_backend.profiler = self.profiler
+        self.office = office
+        self.tts_scheduler = tts_scheduler
+        self.encode_pool = encode_pool
+        self.script_path = Path(script_path) if script_path else self.input_dir / "script.txt"
+        self.progress = progress or ProgressReporter()
+        self.encode_profile = encode_profile
+        self.x264_preset = x264_preset
+        self.crf = crf
+        self.fps = fps
+        self.audio_bitrate = audio_bitrate
+        self.text_extractor = text_extractor
+        self.pipe_images = pipe_images
+        self.hls = hls
+        self.mp4 = mp4 or not hls
+        self._hls_writer = None
+        self.languages = list(languages or [])
+        self.language_output = language_output
+        self.draft = draft
+        self.pages = sorted(pages) if pages else None
+        self.shard_dir = Path(shard_dir) if shard_dir else None
+        self._current_stage = None
+        self._cancel = threading.Event()
+        self._streaming = None
+
+        # Running encoder processes, so a failing worker can stop the others
+        self._active_procs = set()
+        self._procs_lock = threading.Lock()
         
         # Create subdirectories
         self.pdf_dir = self.temp_dir / "pdf"
@@ -48,88 +287,181 @@ class PPTXToVideoConverter:
             directory.mkdir(parents=True, exist_ok=True)
     
     def check_dependencies(self):
-        """Check if required external tools are available."""
+        """Check if required external tools are available (see discover_tools)."""
+        tools = discover_tools()
+        self.profiler.meta["tools"] = tools
         # Check for FFmpeg
-        try:
-            subprocess.run(["ffmpeg", "-version"], 
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL, 
-                         check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print("ERROR: FFmpeg is not installed or not in PATH")
-            sys.exit(1)
+        if not tools["ffmpeg"]:
+            raise DependencyError("FFmpeg is not installed or not in PATH")
         
         # Check for pdftoppm
-        try:
-            subprocess.run(["pdftoppm", "-v"], 
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL, 
-                         check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print("ERROR: pdftoppm is not installed.")
-            sys.exit(1)
+        if not tools["pdftoppm"]:
+            raise DependencyError("pdftoppm is not installed.")
         
-        # Check for LibreOffice
-        try:
-            subprocess.run(["soffice", "--version"], 
-                         stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.DEVNULL, 
-                         check=True)
-            self.has_libreoffice = True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            self.has_libreoffice = False
-            # Warning only, as user might input PDF directly
+        # Check for LibreOffice without starting it (a cold start takes seconds)
+        # Warning only, as user might input PDF directly
+        self.has_libreoffice = tools["soffice"] is not None
     
     def convert_pptx_to_pdf(self, pptx_path):
         """Convert PPTX to PDF using LibreOffice."""
         print("Converting PPTX to PDF using LibreOffice...")
         
         pdf_path = self.pdf_dir / "input.pdf"
-        
-        cmd = [
-            "soffice", "--headless", "--convert-to", "pdf",
-            "--outdir", str(self.pdf_dir), str(pptx_path)
-        ]
+        office = self.office or OfficeConverter(mode="soffice", profiler=self.profiler)
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            office.convert(pptx_path, pdf_path)
+        except FileNotFoundError as e:
+            raise DependencyError(f"LibreOffice is not installed or not in PATH: {e}", "pdf")
         except subprocess.CalledProcessError as e:
-            print(f"ERROR: LibreOffice conversion failed: {e}")
-            sys.exit(1)
-        
-        generated_pdf = self.pdf_dir / f"{pptx_path.stem}.pdf"
-        if generated_pdf.exists() and generated_pdf != pdf_path:
-            generated_pdf.rename(pdf_path)
+            raise ConversionError(f"LibreOffice conversion failed: {e}", "pdf")
         
         if not pdf_path.exists():
-            print(f"ERROR: PDF was not created at {pdf_path}")
-            sys.exit(1)
+            raise ConversionError(f"PDF was not created at {pdf_path}", "pdf")
         
         print(f"  Created: {pdf_path}")
         return pdf_path
     
+    def raster_settings(self):
+        """Settings that decide how slides are rendered (recorded in the build manifest)."""
+        return {
+            "resolution": None if self.dpi else list(self.resolution),
+            "dpi": self.dpi,
+            "format": self.raster_format,
+        }
+
+    def pdf_info(self, pdf_path):
+        """
+        Return (page_count, (width, height) of page 1 in points) using pdfinfo,
+        or None if pdfinfo is unavailable.
+        """
+        try:
+            result = self.profiler.run(["pdfinfo", str(pdf_path)], "pdfinfo", text=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+        pages = re.search(r"^Pages:\s+(\d+)", result.stdout, re.M)
+        size = re.search(r"^Page size:\s+([\d.]+) x ([\d.]+)", result.stdout, re.M)
+        if not pages:
+            return None
+        page_size = (float(size.group(1)), float(size.group(2))) if size else None
+        return int(pages.group(1)), page_size
+
+    def raster_args(self, page_size=None, raster_format=None):
+        """pdftoppm options for the configured (or given) format and resolution."""
+        format_args, _ = RASTER_FORMATS[raster_format or self.raster_format]
+        if self.dpi:
+            return format_args + ["-r", str(self.dpi)]
+        width, height = self.resolution
+        if page_size is None:
+            # Unknown aspect ratio: scale the long side only
+            return format_args + ["-scale-to", str(max(width, height))]
+        # Fit the page inside the target box, keeping its aspect ratio
+        if page_size[0] / page_size[1] >= width / height:
+            return format_args + ["-scale-to-x", str(width), "-scale-to-y", "-1"]
+        return format_args + ["-scale-to-x", "-1", "-scale-to-y", str(height)]
+
+    def page_ranges(self, page_count):
+        """Split pages 1..page_count into contiguous (first, last) ranges, one per worker."""
+        jobs = self.raster_jobs if self.raster_jobs and self.raster_jobs > 0 else (os.cpu_count() or 1)
+        jobs = max(1, min(jobs, page_count))
+        size, extra = divmod(page_count, jobs)
+        ranges = []
+        first = 1
+        for i in range(jobs):
+            last = first + size - 1 + (1 if i < extra else 0)
+            ranges.append((first, last))
+            first = last + 1
+        return ranges
+
+    def selected_ranges(self, page_count=None):
+        """The --pages selection as contiguous (first, last) runs, up to page_count."""
+        ranges = []
+        for page in self.pages:
+            if page_count and page > page_count:
+                break
+            if ranges and ranges[-1][1] == page - 1:
+                ranges[-1] = (ranges[-1][0], page)
+            else:
+                ranges.append((page, page))
+        return ranges
+
+    def raster_extension(self):
+        return RASTER_FORMATS[self.raster_format][1]
+
+    def clear_slide_images(self):
+        """Remove pages from a previous (possibly longer) deck."""
+        for old_image in self.slides_dir.glob("slide-*.*"):
+            old_image.unlink()
+
     def convert_pdf_to_png(self, pdf_path):
-        """Convert PDF pages to RAW PNG images using pdftoppm."""
-        print("Converting PDF to RAW PNG images using pdftoppm...")
+        """
+        Rasterize PDF pages with pdftoppm at the target output resolution.
+        Page ranges are split across parallel pdftoppm processes (-f/-l).
+        """
+        ext = self.raster_extension()
+        print(f"Converting PDF to {ext.upper()} images using pdftoppm...")
+        self.clear_slide_images()
         
-        try:
-            cmd = [
-                "pdftoppm", "-png", "-r", "300",
-                str(pdf_path), str(self.slides_dir / "slide")
+        info = self.pdf_info(pdf_path)
+        output_root = str(self.slides_dir / "slide")
+        if self.pages:
+            page_count, page_size = info if info else (None, None)
+            ranges = self.selected_ranges(page_count)
+            if not ranges:
+                raise InputError(f"--pages {format_pages(self.pages)} selects no page of this PDF "
+                                 f"(valid: 1-{page_count})", "rasterize")
+            skipped = [page for page in self.pages if page_count and page > page_count]
+            if skipped:
+                print(f"   [!] Pages {format_pages(skipped)} are beyond the last page ({page_count}), skipped")
+            args = self.raster_args(page_size)
+            commands = [
+                (["pdftoppm", "-f", str(first), "-l", str(last)] + args + [str(pdf_path), output_root],
+                 f"{first}-{last}")
+                for first, last in ranges
             ]
-            subprocess.run(cmd, check=True, capture_output=True)
-            
-            png_files = sorted(self.slides_dir.glob("slide-*.png"))
-            
-            if not png_files:
-                print("ERROR: No PNG files were generated")
-                sys.exit(1)
-            
-            print(f"  Converted {len(png_files)} pages to PNG")
-            return png_files
+            self.progress.set_total("rasterize", sum(last - first + 1 for first, last in ranges))
+        elif info:
+            page_count, page_size = info
+            args = self.raster_args(page_size)
+            commands = [
+                (["pdftoppm", "-f", str(first), "-l", str(last)] + args + [str(pdf_path), output_root],
+                 f"{first}-{last}")
+                for first, last in self.page_ranges(page_count)
+            ]
+            self.progress.set_total("rasterize", page_count)
+        else:
+            commands = [(["pdftoppm"] + self.raster_args() + [str(pdf_path), output_root], None)]
+        def rasterize(cmd, pages):
+            # Tracked like the encoders, so cancel() also kills a running pdftoppm
+            if self.cancelled:
+                raise PipelineCancelled("Cancelled", "rasterize")
+            self.run_encoder(cmd, pages, "pdftoppm")
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+                futures = {executor.submit(rasterize, cmd, pages): pages for cmd, pages in commands}
+                for future in as_completed(futures):
+                    future.result()
+                    pages = futures[future]
+                    if pages:
+                        first, last = (int(p) for p in pages.split("-"))
+                        self.progress.advance("rasterize", units=last - first + 1,
+                                              message=f"pages {pages}")
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"ERROR: Failed to convert PDF to PNG: {e}")
-            sys.exit(1)
+            if self.cancelled:
+                raise PipelineCancelled("Cancelled", "rasterize")
+            raise RasterError(f"Failed to convert PDF to {ext.upper()}: {e}", "rasterize")
+        
+        # Sort by page number (shards may not agree on zero padding)
+        png_files = sorted(self.slides_dir.glob(f"slide-*.{ext}"),
+                           key=lambda p: int(p.stem.split('-')[-1]))
+        
+        if not png_files:
+            raise RasterError("No image files were generated", "rasterize")
+        
+        workers = f" with {len(commands)} workers" if len(commands) > 1 else ""
+        print(f"  Converted {len(png_files)} pages to {ext.upper()}{workers}")
+        return png_files
     
     def parse_script_file(self, script_path):
         """
@@ -140,7 +472,7 @@ class PPTXToVideoConverter:
             print(f"   [!] Script file not found: {script_path}")
             return None
         
-        print(f"   [Metode] Menggunakan script.txt untuk voiceover...")
+        print(f"   [Metode] Menggunakan {script_path.name} untuk voiceover...")
         
         with open(script_path, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -172,53 +504,32 @@ class PPTXToVideoConverter:
         
         return result
     
-    def extract_text_from_pdf(self, pdf_path):
+    def extract_text_from_pdf(self, pdf_path, manifest=None):
         """
-        Extract text from PDF pages using pdfplumber (recommended) or PyPDF2.
+        Extract one text per page with the configured text_extract backend,
+        split into the same page ranges as rasterization. Cached in the build
+        manifest by PDF hash and extractor.
         """
-        texts = []
-        
-        # OPSI 1: Coba pakai pdfplumber (Lebih Akurat)
-        try:
-            import pdfplumber
-            print("   [Metode] Menggunakan pdfplumber untuk ekstraksi teks...")
-            
-            with pdfplumber.open(str(pdf_path)) as pdf:
-                for i, page in enumerate(pdf.pages):
-                    # Extract text
-                    text = page.extract_text() or ""
-                    
-                    # Bersihkan text dari spasi berlebih
-                    text = text.strip()
-                    
-                    # Debug print untuk melihat apakah teks terbaca
-                    preview = text[:50].replace('\n', ' ') + "..." if len(text) > 50 else text
-                    print(f"    - Slide {i+1}: {len(text)} karakter ditemukan. ('{preview}')")
-                    
-                    texts.append(text)
-            return texts
-
-        except ImportError:
-            print("   [!] Library 'pdfplumber' tidak ditemukan.")
-            print("       Saran: Install dengan 'pip install pdfplumber' untuk hasil lebih baik.")
-            print("   [Metode] Fallback ke PyPDF2...")
-
-        # OPSI 2: Fallback ke PyPDF2 (Bawaan)
-        if not HAS_PYPDF2:
-            print("Warning: PyPDF2 not installed. Cannot extract text.")
+        extractor = make_text_extractor(self.text_extractor, self.profiler)
+        if extractor is None:
+            print("Warning: No text extractor available (pdftotext, pdfplumber or PyPDF2). Cannot extract text.")
             return []
         
-        try:
-            reader = PdfReader(str(pdf_path))
-            for i, page in enumerate(reader.pages):
-                text = page.extract_text() or ""
-                text = text.strip()
-                print(f"    - Slide {i+1} (PyPDF2): {len(text)} chars found.")
-                texts.append(text)
-            return texts
-        except Exception as e:
-            print(f"Error extracting text: {e}")
-            return []
+        inputs = None
+        if manifest:
+            inputs = {"pdf": manifest.file_hash(pdf_path), "extractor": extractor.name}
+            if manifest.is_current("text", inputs):
+                texts = manifest.outputs("text")["texts"]
+                print(f"   PDF unchanged, reusing text of {len(texts)} pages ({extractor.name})")
+                return texts
+        
+        info = self.pdf_info(pdf_path)
+        start = time.monotonic()
+        texts = extractor.extract(pdf_path, self.page_ranges(info[0]) if info else None)
+        self.profiler.span("extract-text", start, time.monotonic(), extractor=extractor.name)
+        if manifest and texts:
+            manifest.record("text", inputs, outputs={"texts": texts})
+        return texts
         
     def create_silent_audio(self, audio_path, duration=2.0):
         """Create a silent audio file using FFmpeg."""
@@ -228,14 +539,607 @@ class PPTXToVideoConverter:
             "-y", str(audio_path)
         ]
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            self.profiler.run(cmd, "silence")
             return audio_path
         except subprocess.CalledProcessError:
             return None
     
-    def concatenate_videos(self, video_paths):
-        """Concatenate all slide videos into final output using FFmpeg concat."""
+    def tts_engine_id(self):
+        """Identifier of the TTS engine/voice, part of every audio key."""
+        return getattr(self.tts_backend, "cache_id", self.tts_backend.name)
+
+    def slide_audio_key(self, text, language):
+        """
+        Audio key of a whole slide. Chunked slides are stitched with a gap, so the
+        chunking settings are part of their key.
+        """
+        engine_id = self.tts_engine_id()
+        if self.tts_chunk_chars and len(text.strip()) > self.tts_chunk_chars:
+            engine_id += f"|chunks={self.tts_chunk_chars}:gap={self.tts_chunk_gap}"
+        return audio_key(text, language, engine_id)
+
+    def make_tts_scheduler(self):
+        if self.tts_scheduler:
+            return self.tts_scheduler
+        return TTSScheduler(
+            self.tts_backend, workers=self.tts_workers, rate=self.tts_rate,
+            burst=self.tts_burst, max_attempts=self.tts_max_attempts
+        )
+
+    def run_tts(self, scheduler, requests, on_slide=None):
+        """
+        Synthesize slide-level requests and return one TTSResult per request, in order.
+        
+        Texts longer than tts_chunk_chars are split into sentence/clause chunks.
+        Chunks are synthesized in parallel, cached and retried on their own, then
+        stitched into the slide clip with tts_chunk_gap seconds between them, so
+        a failure only redoes the failed chunk.
+        on_slide(result) is called as soon as each slide's clip is finished.
+        """
+        engine_id = self.tts_engine_id()
+        ext = self.tts_backend.extension
+        chunk_dir = self.audio_dir / "chunks"
+        to_run = []
+        plans = []
+        chunk_requests = {}
+        for r in requests:
+            chunks = split_text(r.text, self.tts_chunk_chars) if self.tts_chunk_chars else [r.text]
+            if len(chunks) <= 1:
+                to_run.append(r)
+                plans.append((r, None))
+                continue
+            chunk_dir.mkdir(exist_ok=True)
+            paths = []
+            for text in chunks:
+                key = audio_key(text, r.language, engine_id)
+                path = chunk_dir / f"{key}{ext}"
+                paths.append(path)
+                if key in chunk_requests or path.exists():
+                    continue
+                cached = self.audio_cache.get(key, ext) if self.audio_cache else None
+                if cached:
+                    link_or_copy(cached, path)
+                else:
+                    chunk_requests[key] = TTSRequest(r.index, text, r.language, path)
+            plans.append((r, paths))
+        
+        slide_paths = {r.path for r in to_run}
+        
+        def finished(res):
+            if on_slide and res.path in slide_paths:
+                on_slide(res)
+        
+        results = scheduler.run(to_run + list(chunk_requests.values()), on_result=finished,
+                                cancel_event=self._cancel)
+        by_path = {res.path: res for res in results}
+        if self.audio_cache:
+            for key, cr in chunk_requests.items():
+                if by_path[cr.path].ok:
+                    self.audio_cache.put(key, cr.path, ext)
+        
+        slide_results = []
+        for r, paths in plans:
+            if paths is None:
+                slide_results.append(by_path[r.path])
+                continue
+            ran = [by_path[p] for p in dict.fromkeys(paths) if p in by_path]
+            errors = [res.error for res in ran if not res.ok]
+            res = TTSResult(index=r.index, path=r.path, chunks=len(paths),
+                            attempts=sum(x.attempts for x in ran) + len(paths) - len(ran),
+                            latency=max((x.latency for x in ran), default=0.0),
+                            error=errors[0] if errors else None)
+            if res.ok:
+                try:
+                    res.info = stitch_clips(paths, r.path, self.tts_chunk_gap, self.profiler, r.index)
+                except (subprocess.CalledProcessError, OSError) as e:
+                    res.error = e
+            res.started = min((x.started for x in ran), default=0.0)
+            if on_slide:
+                on_slide(res)
+            slide_results.append(res)
+        
+        for res in slide_results:
+            if res.started:
+                self.profiler.span("tts", res.started, res.started + res.latency, slide=res.index,
+                                   attempts=res.attempts, chunks=res.chunks, ok=res.ok)
+        return slide_results
+
+    def audio_path_for(self, slide_name, track=None):
+        """
+        Temp audio file of one slide, with the extension the TTS backend writes.
+        `track` (a language of a multi-language run) selects temp/audio/<track>/.
+        """
+        audio_dir = self.audio_dir / track if track else self.audio_dir
+        return audio_dir / f"{slide_name}{self.tts_backend.extension}"
+
+    def narration_text(self, idx, text):
+        if not text or text.strip() == "":
+            return f"Slide {idx}" # Minimal text to avoid gTTS error
+        return text
+
+    def reuse_audio(self, idx, slide_name, key, audio_path, manifest=None):
+        """
+        Make already-synthesized audio for `key` available at `audio_path`,
+        from the temp dir (via the manifest) or the audio cache.
+        Returns False if the slide still needs TTS.
+        """
+        if manifest and manifest.is_current(f"audio:{slide_name}", {"key": key}):
+            print(f"   [i] Slide {idx}: audio tidak berubah, dipakai ulang")
+            return True
+        
+        suffix = self.tts_backend.extension
+        cached = self.audio_cache.get(key, suffix) if self.audio_cache else None
+        if cached:
+            link_or_copy(cached, audio_path)
+            print(f"   [i] Slide {idx}: audio dari cache ({key[:12]})")
+            return True
+        return False
+
+    def generate_audio(self, png_files, slide_texts, language, manifest=None, track=None):
+        """
+        Generate one audio file per slide with the TTS scheduler.
+        Clips already built for the same (text, language, engine) in the temp dir
+        or the audio cache are reused, and slides with the same narration share
+        one synthesized clip; any slide that still fails after the retry cap
+        aborts the pipeline. `track` keeps the clips (and their manifest entries)
+        of one language of a multi-language run apart.
+        """
+        if track:
+            (self.audio_dir / track).mkdir(exist_ok=True)
+        audio_files = []
+        requests = []
+        cache_keys = {}
+        # key -> audio path being synthesized, and (source, copy) pairs for repeated narration
+        pending = {}
+        copies = []
+        for png_path, text in zip(png_files, slide_texts):
+            png_name = png_path.stem
+            slide_suffix = png_name.split('-')[-1]
+            # Page number, also with a --pages selection
+            idx = int(slide_suffix)
+            audio_path = self.audio_path_for(f"slide-{slide_suffix}", track)
+            stage_name = f"{track}:{png_name}" if track else png_name
+            
+            text = self.narration_text(idx, text)
+            key = self.slide_audio_key(text, language)
+            cache_keys[idx] = key
+            audio_files.append(audio_path)
+            
+            if self.reuse_audio(idx, stage_name, key, audio_path, manifest):
+                self.progress.advance("tts", slide=idx, message="reused")
+            elif key in pending:
+                copies.append((pending[key], audio_path, idx))
+            else:
+                pending[key] = audio_path
+                requests.append(TTSRequest(idx, text, language, audio_path))
+        
+        if requests:
+            self.synthesize(requests, cache_keys)
+        if copies:
+            print(f"   {len(copies)} slides repeat earlier narration, sharing its audio")
+            for source, audio_path, idx in copies:
+                link_or_copy(source, audio_path)
+                self.progress.advance("tts", slide=idx, message="duplicate")
+        
+        if manifest:
+            for png_path, audio_path in zip(png_files, audio_files):
+                idx = int(png_path.stem.split('-')[-1])
+                stage_name = f"{track}:{png_path.stem}" if track else png_path.stem
+                manifest.record(f"audio:{stage_name}", {"key": cache_keys[idx]},
+                                files=[audio_path])
+        return audio_files
+
+    def generate_language_audio(self, png_files, texts_by_language, manifest=None):
+        """
+        Step 4 of a multi-language run: every language synthesized at the same
+        time into temp/audio/<lang>/, sharing one TTS scheduler (and rate limit).
+        Returns {language: audio files}.
+        """
+        self.tts_scheduler = self.make_tts_scheduler()
+        with ThreadPoolExecutor(max_workers=len(texts_by_language),
+                                thread_name_prefix="tts-language") as executor:
+            futures = {language: executor.submit(self.generate_audio, png_files, texts, language,
+                                                 manifest, language)
+                       for language, texts in texts_by_language.items()}
+            return {language: future.result() for language, future in futures.items()}
+
+    def synthesize(self, requests, cache_keys):
+        """Run TTS for `requests`, store results in the audio cache, exit if any slide failed."""
+        if self.tts_backend.supports_batch:
+            print(f"   Synthesizing {len(requests)} slides with {self.tts_backend.name} (one batch)...")
+        else:
+            print(f"   Synthesizing {len(requests)} slides with {self.tts_backend.name} "
+                  f"({self.tts_workers} workers, {self.tts_rate:g} req/s)...")
+        def on_slide(result):
+            if result.ok:
+                self.progress.advance("tts", slide=result.index)
+        
+        results = self.run_tts(self.make_tts_scheduler(), requests, on_slide)
+        if self.cancelled:
+            raise PipelineCancelled("Cancelled", "tts")
+        for line in format_report(results):
+            print(line)
+        
+        if self.audio_cache:
+            for r in results:
+                if r.ok:
+                    self.audio_cache.put(cache_keys[r.index], r.path, self.tts_backend.extension)
+            self.audio_cache.evict()
+        
+        failed = [r for r in results if not r.ok]
+        if failed:
+            for r in failed:
+                print(f"   Audio for slide {r.index} failed after {r.attempts} attempts: {r.error}")
+                self.progress.error(f"Audio failed after {r.attempts} attempts: {r.error}",
+                                    stage="tts", slide=r.index)
+            raise TTSError(f"Audio failed for slide(s) {', '.join(str(r.index) for r in failed)}",
+                           failed)
+
+    def resolve_jobs(self, slide_count):
+        """
+        Return (jobs, threads): how many encoders run at once and how many
+        threads each ffmpeg gets, so the pool never oversubscribes the CPU.
+        """
+        cpu_count = os.cpu_count() or 1
+        jobs = self.jobs if self.jobs and self.jobs > 0 else max(1, cpu_count // 4)
+        jobs = max(1, min(jobs, slide_count))
+        if jobs == 1:
+            # Single encoder: let x264 pick its own thread count (old behaviour)
+            return 1, 0
+        return jobs, max(1, cpu_count // jobs)
+
+    def encode_settings(self):
+        """The encode profile with the explicit preset/CRF/fps overrides applied."""
+        settings = dict(ENCODE_PROFILES[self.encode_profile])
+        for key, value in (("preset", self.x264_preset), ("crf", self.crf), ("fps", self.fps)):
+            if value is not None:
+                settings[key] = value
+        # HLS cuts slides into SEGMENT_SECONDS pieces at keyframes
+        settings["hls_segment"] = SEGMENT_SECONDS if self.hls else None
+        return settings
+
+    def x264_args(self, settings):
+        """Preset and CRF flags (empty when left to x264's defaults)."""
+        args = []
+        if settings["preset"]:
+            args += ["-preset", settings["preset"]]
+        if settings["crf"] is not None:
+            args += ["-crf", str(settings["crf"])]
+        return args
+
+    def gop_args(self, settings):
+        fps = settings["fps"] or DEFAULT_FPS
+        args = keyframe_args(settings["hls_segment"]) if settings.get("hls_segment") else []
+        if not settings["gop_seconds"]:
+            return args
+        return ["-g", str(max(1, round(fps * settings["gop_seconds"])))] + args
+
+    def audio_codec_args(self):
+        """Fixed-bitrate AAC when --audio-bitrate is set (concat then copies it as is)."""
+        if not self.audio_bitrate:
+            return []
+        return ["-c:a", "aac", "-b:a", str(self.audio_bitrate)]
+
+    def build_encode_command(self, png_path, audio_path, video_path, threads=0, duration=None):
+        """
+        Build the FFmpeg command that turns one slide image + audio into a video.
+        png_path "-" reads a single PPM frame from stdin (see pipe_images).
+        audio_path None encodes a silent video of `duration` seconds (multi-language
+        runs add the narration tracks afterwards).
+        """
+        settings = self.encode_settings()
+        framerate = ["-framerate", str(settings["source_fps"])] if settings["source_fps"] else []
+        if str(png_path) == "-":
+            # image2pipe cannot -loop; repeat the one decoded frame with the loop filter
+            cmd = ["ffmpeg", "-f", "image2pipe", "-c:v", "ppm"] + framerate
+            video_filter = "loop=loop=-1:size=1,pad=ceil(iw/2)*2:ceil(ih/2)*2"
+        else:
+            cmd = ["ffmpeg", "-loop", "1"] + framerate
+            video_filter = "pad=ceil(iw/2)*2:ceil(ih/2)*2" # Memastikan lebar/tinggi genap
+        cmd += ["-i", str(png_path)]
+        if audio_path is not None:
+            cmd += ["-i", str(audio_path)]
+        cmd += [
+            "-c:v", "libx264",
+        ] + self.x264_args(settings) + [
+            "-vf", video_filter,
+            "-tune", "stillimage",
+        ]
+        if settings["fps"]:
+            cmd += ["-r", str(settings["fps"])]
+        cmd += self.gop_args(settings)
+        if audio_path is None:
+            cmd += ["-t", f"{duration:.3f}", "-an"]
+        else:
+            cmd += self.audio_codec_args() + ["-shortest"]
+        cmd += ["-pix_fmt", "yuv420p"]
+        if threads:
+            cmd += ["-threads", str(threads)]
+        cmd += ["-y", str(video_path)]
+        return cmd
+
+    def encoder_signature(self):
+        """Hash of the encode command template (paths and thread count excluded)."""
+        image = "-" if self.pipe_images else "{image}"
+        return sha256_json(self.build_encode_command(image, "{audio}", "{video}"))
+
+    def segment_inputs(self, png_path, audio_path, manifest, encoder, image_hash=None):
+        """
+        Everything a slide video depends on, as recorded in the build manifest.
+        image_hash replaces the PNG file hash for images that only exist in memory.
+        """
+        return {
+            "png": image_hash or manifest.file_hash(png_path),
+            "audio": manifest.file_hash(audio_path),
+            "encoder": encoder,
+        }
+
+    def build_segments(self, png_files, audio_files, manifest):
+        """
+        Encode only the slide videos whose PNG, audio or encoder settings changed
+        since the last run; everything else is reused from temp/slide_videos.
+        Slides with the same image and audio (repeated dividers, blank pages)
+        are encoded once and share one video in the concat list.
+        """
+        encoder = self.encoder_signature()
+        video_files = [None] * len(png_files)
+        segment_inputs = []
+        manifest.forget("shared:")
+        todo = []
+        # segment hash -> first slide with it; repeated slide -> that slide
+        owners = {}
+        duplicates = {}
+        for idx, (png_path, audio_path) in enumerate(zip(png_files, audio_files)):
+            inputs = self.segment_inputs(png_path, audio_path, manifest, encoder)
+            segment_inputs.append(inputs)
+            digest = sha256_json(inputs)
+            if digest in owners:
+                duplicates[idx] = owners[digest]
+                continue
+            owners[digest] = idx
+            video_path = self.videos_dir / f"{png_path.stem}.mp4"
+            if manifest.is_current(f"segment:{png_path.stem}", inputs):
+                video_files[idx] = video_path
+            else:
+                todo.append(idx)
+        
+        def publish(idx):
+            # Repeats of a slide enter the HLS playlist along with it
+            for i in [idx] + [d for d, owner in duplicates.items() if owner == idx]:
+                self.publish_segment(i, video_files[idx], png_files[i].stem,
+                                     int(png_files[i].stem.split("-")[-1]))
+
+        def on_video(j, video_path):
+            video_files[todo[j]] = video_path
+            publish(todo[j])
+
+        reused = len(owners) - len(todo)
+        if reused:
+            print(f"   Reusing {reused} unchanged slide videos")
+            self.progress.advance("encode", units=reused, message="reused")
+            for idx in owners.values():
+                if video_files[idx]:
+                    publish(idx)
+        if duplicates:
+            print(f"   {len(duplicates)} slides repeat an earlier slide, sharing its video")
+            self.progress.advance("encode", units=len(duplicates), message="duplicate")
+        if todo:
+            self.encode_slide_videos([png_files[i] for i in todo], [audio_files[i] for i in todo],
+                                     on_video)
+        for idx, owner in duplicates.items():
+            video_files[idx] = video_files[owner]
+        
+        for idx, (png_path, inputs, video_path) in enumerate(zip(png_files, segment_inputs, video_files)):
+            # Repeats are found again on every run; their video belongs to another
+            # slide, so they are only noted for the per-slide previews
+            stage = "shared" if idx in duplicates else "segment"
+            manifest.record(f"{stage}:{png_path.stem}", inputs, files=[video_path])
+        return video_files
+
+    def run_encoder(self, cmd, slide=None, label="encode", input=None):
+        """
+        Run one FFmpeg encode (or pdftoppm batch), tracking the process so it
+        can be terminated if another worker fails or the run is cancelled. `input` is written to its stdin.
+        Raises CalledProcessError on failure.
+        """
+        started = []
+        
+        def track(proc):
+            started.append(proc)
+            with self._procs_lock:
+                self._active_procs.add(proc)
+        
+        try:
+            self.profiler.run(cmd, label, slide, input=input, on_start=track)
+        finally:
+            with self._procs_lock:
+                self._active_procs.difference_update(started)
+
+    def terminate_encoders(self):
+        """Kill every encoder process that is still running."""
+        with self._procs_lock:
+            procs = list(self._active_procs)
+        for proc in procs:
+            try:
+                proc.terminate()
+            except OSError:
+                pass
+
+    def report_encoder_failure(self, png_name, error, cmd, stage="encode"):
+        """
+        Print the FFmpeg stderr/stdout dump for a failed slide encode and return
+        the exception to raise (PipelineCancelled if cancel() killed it).
+        """
+        if self.cancelled:
+            return PipelineCancelled("Cancelled", stage)
+        print(f"  Failed to create video for {png_name}. Return code: {error.returncode}")
+        self.progress.error(f"FFmpeg failed for {png_name} (exit code {error.returncode})", stage=stage)
+        stderr = error.stderr.decode('utf-8', errors='replace') if error.stderr else ''
+        stdout = error.stdout.decode('utf-8', errors='replace') if error.stdout else ''
+        if stderr:
+            print("  ---- FFmpeg stderr ----")
+            print(stderr)
+        if stdout:
+            print("  ---- FFmpeg stdout ----")
+            print(stdout)
+        print(f"  Command: {' '.join(cmd)}")
+        return EncodeError(f"FFmpeg failed for {png_name} (exit code {error.returncode})",
+                           cmd, error.returncode, stderr, stage)
+
+    def encode_slide_videos(self, png_files, audio_files, on_video=None, durations=None):
+        """
+        Encode one video per slide on a bounded worker pool.
+        The returned list is always in slide order, whatever order workers finish in;
+        on_video(idx, video_path) is called as each one finishes.
+        With `durations` (seconds per slide) and no audio files, silent videos
+        slide-N.video.mp4 are encoded instead.
+        """
+        jobs, threads = self.resolve_jobs(len(png_files))
+        if jobs > 1:
+            print(f"   Using {jobs} parallel encoders ({threads} threads each)")
+
+        video_files = [None] * len(png_files)
+        executor = self.encode_pool or ThreadPoolExecutor(max_workers=jobs)
+        futures = {}
+        audio_files = audio_files or [None] * len(png_files)
+        for idx, (png_path, audio_path) in enumerate(zip(png_files, audio_files)):
+            png_name = png_path.stem
+            slide_suffix = png_name.split('-')[-1]
+            if durations:
+                video_path = self.videos_dir / f"slide-{slide_suffix}.video.mp4"
+                cmd = self.build_encode_command(png_path, None, video_path, threads, durations[idx])
+            else:
+                video_path = self.videos_dir / f"slide-{slide_suffix}.mp4"
+                cmd = self.build_encode_command(png_path, audio_path, video_path, threads)
+            future = executor.submit(self.run_encoder, cmd, int(slide_suffix))
+            futures[future] = (idx, png_name, video_path, cmd)
+
+        try:
+            for future in as_completed(futures):
+                idx, png_name, video_path, cmd = futures[future]
+                try:
+                    future.result()
+                except subprocess.CalledProcessError as e:
+                    # Fail fast: drop queued slides and stop running encoders
+                    for pending in futures:
+                        pending.cancel()
+                    self.terminate_encoders()
+                    raise self.report_encoder_failure(png_name, e, cmd)
+                print(f"   Created video for {png_name}")
+                self.progress.advance("encode", slide=int(png_name.split('-')[-1]))
+                video_files[idx] = video_path
+                if on_video:
+                    on_video(idx, video_path)
+        finally:
+            if executor is self.encode_pool:
+                # Shared pool: only wait for this deck's encodes
+                wait(futures)
+            else:
+                # shutdown(cancel_futures=) needs Python 3.9
+                for pending in futures:
+                    pending.cancel()
+                executor.shutdown(wait=True)
+
+        return video_files
+
+    def publish_segment(self, index, video_path, name, page=None):
+        """
+        Append slide `index` (0-based), page `page` of the deck, to the HLS
+        playlist once its video exists (no-op without hls). Raises EncodeError if the remux fails.
+        """
+        if not self._hls_writer:
+            return
+        try:
+            self._hls_writer.add(index, video_path, name, page)
+        except subprocess.CalledProcessError as e:
+            raise self.report_encoder_failure(f"{name} (HLS)", e, e.cmd, self._current_stage)
+
+    def audio_duration(self, audio_path):
+        """Duration of a TTS clip from its headers, falling back to ffprobe for unknown formats."""
+        info = audio_info(audio_path)
+        return info.duration if info else self.probe_duration(audio_path)
+
+    def probe_duration(self, media_path):
+        """Duration of an audio/video file in seconds (via ffprobe)."""
+        cmd = [
+            "ffprobe", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", str(media_path)
+        ]
+        try:
+            result = self.profiler.run(cmd, "ffprobe", text=True)
+            return float(result.stdout.strip())
+        except (subprocess.CalledProcessError, FileNotFoundError, ValueError) as e:
+            raise EncodeError(f"Could not read duration of {media_path}: {e}", cmd)
+
+    def build_single_pass_command(self, image_list, audio_list, output_path):
+        """FFmpeg command that renders the whole deck from two concat lists in one run."""
+        settings = self.encode_settings()
+        fps = settings["fps"] or DEFAULT_FPS
+        return [
+            "ffmpeg",
+            "-f", "concat", "-safe", "0", "-i", str(image_list),
+            "-f", "concat", "-safe", "0", "-i", str(audio_list),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "libx264",
+        ] + self.x264_args(settings) + [
+            "-vf", f"fps={fps},pad=ceil(iw/2)*2:ceil(ih/2)*2", # Memastikan lebar/tinggi genap
+            "-tune", "stillimage",
+        ] + self.gop_args(settings) + [
+            "-pix_fmt", "yuv420p",
+        ] + (self.audio_codec_args() or ["-c:a", "aac"]) + [
+            "-shortest",
+            "-y", str(output_path)
+        ]
+
+    def render_single_pass(self, png_files, audio_files, manifest=None):
+        """
+        Render output/output.mp4 with a single FFmpeg invocation: the slide images
+        go through the concat demuxer with per-image durations taken from the
+        audio, and the audio clips are concatenated alongside.
+        """
         output_path = self.output_dir / "output.mp4"
+        image_list = self.temp_dir / "images_list.txt"
+        audio_list = self.temp_dir / "audio_list.txt"
+        cmd = self.build_single_pass_command(image_list, audio_list, output_path)
+        
+        inputs = None
+        if manifest:
+            inputs = {
+                "pages": [manifest.file_hash(p) for p in png_files],
+                "audio": [manifest.file_hash(a) for a in audio_files],
+                "encoder": sha256_json(self.build_single_pass_command("{images}", "{audio}", "{video}")),
+            }
+            if manifest.is_current("single-pass", inputs):
+                print("   Nothing changed, keeping existing output video")
+                return output_path
+        
+        durations = [self.audio_duration(a) for a in audio_files]
+        with open(image_list, "w") as f:
+            f.write("ffconcat version 1.0\n")
+            for png_path, duration in zip(png_files, durations):
+                f.write(f"file '{png_path.absolute()}'\n")
+                f.write(f"duration {duration:.6f}\n")
+            # The concat demuxer ignores the duration of the last entry unless it is repeated
+            f.write(f"file '{png_files[-1].absolute()}'\n")
+        with open(audio_list, "w") as f:
+            f.write("ffconcat version 1.0\n")
+            for audio_path in audio_files:
+                f.write(f"file '{audio_path.absolute()}'\n")
+        
+        print(f"   Rendering {len(png_files)} slides ({sum(durations):.1f}s) in one pass...")
+        try:
+            self.run_encoder(cmd, label="single-pass")
+        except subprocess.CalledProcessError as e:
+            raise self.report_encoder_failure("single-pass render", e, cmd, "single-pass")
+        
+        if manifest:
+            manifest.record("single-pass", inputs, files=[output_path])
+        print(f"\n✓ Final video created: {output_path}")
+        return output_path
+
+    def concatenate_videos(self, video_paths, output_path=None):
+        """Concatenate all slide videos into final output using FFmpeg concat (repeats allowed)."""
+        output_path = output_path or self.output_dir / "output.mp4"
         concat_file = self.temp_dir / "slides_list.txt"
         
         with open(concat_file, "w") as f:
@@ -248,155 +1152,527 @@ class PPTXToVideoConverter:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            self.profiler.run(cmd, "concat")
             print(f"\n✓ Final video created: {output_path}")
             return output_path
         except subprocess.CalledProcessError as e:
-            print(f"ERROR: Failed to concatenate videos: {e}")
-            sys.exit(1)
-    
-    def process(self, input_filename="test.pdf", language='en'):
-        """Main processing pipeline."""
-        input_path = self.input_dir / input_filename
-        
-        if not input_path.exists():
-            print(f"ERROR: Input file not found: {input_path}")
-            sys.exit(1)
+            raise EncodeError(f"Failed to concatenate videos: {e}", cmd, e.returncode,
+                              e.stderr.decode("utf-8", errors="replace") if e.stderr else "", "concat")
+
+    def write_shard(self, input_path, pdf_path, language, pages, video_files, audio_files, manifest):
+        """Step 6 of a shard render: the slide videos plus shard.json in shard_dir."""
+        info = self.pdf_info(pdf_path)
+        # Without a script the narration comes from the PDF, which `source` covers
+        script = manifest.file_hash(self.script_path) if self.script_path.exists() else None
+        shard_info = {
+            "source": manifest.file_hash(input_path),
+            "page_count": info[0] if info else None,
+            "encoder": self.encoder_signature(),
+            # Segments only concatenate cleanly with identical video and audio streams,
+            # and only make one video when narrated in one language from one script
+            "settings": {"encode": self.encode_settings(), "raster": self.raster_settings(),
+                         "audio_bitrate": self.audio_bitrate, "tts_engine": self.tts_engine_id(),
+                         "language": language, "script": script},
+        }
+        segments = [(page, video_path, self.audio_duration(audio_path))
+                    for page, video_path, audio_path in zip(pages, video_files, audio_files)]
+        path = write_shard(self.shard_dir, shard_info, segments)
+        print(f"\n✓ Shard with {len(segments)} slides (pages {format_pages(pages)}): {path}")
+        return path
+
+    def slide_durations(self, audio_tracks):
+        """Multi-language: per slide, the longest narration of any language, in whole frames."""
+        fps = self.encode_settings()["fps"] or DEFAULT_FPS
+        return [math.ceil(max(self.audio_duration(a) for a in clips) * fps) / fps
+                for clips in zip(*audio_tracks.values())]
+
+    def build_video_segments(self, png_files, durations, manifest):
+        """
+        Step 5 of a multi-language run: one silent video per slide, as long as
+        its longest narration. Unchanged slides are reused like build_segments does.
+        """
+        encoder = sha256_json(self.build_encode_command("{image}", None, "{video}", duration=0))
+        video_files = [None] * len(png_files)
+        segment_inputs = []
+        todo = []
+        for idx, (png_path, duration) in enumerate(zip(png_files, durations)):
+            inputs = {"png": manifest.file_hash(png_path), "duration": duration, "encoder": encoder}
+            segment_inputs.append(inputs)
+            if manifest.is_current(f"video:{png_path.stem}", inputs):
+                video_files[idx] = self.videos_dir / f"{png_path.stem}.video.mp4"
+            else:
+                todo.append(idx)
         
-        is_pdf = input_path.suffix.lower() == '.pdf'
+        reused = len(png_files) - len(todo)
+        if reused:
+            print(f"   Reusing {reused} unchanged slide videos")
+            self.progress.advance("encode", units=reused, message="reused")
+        if todo:
+            built = self.encode_slide_videos([png_files[i] for i in todo], None,
+                                             durations=[durations[i] for i in todo])
+            for idx, video_path in zip(todo, built):
+                video_files[idx] = video_path
+        for png_path, inputs, video_path in zip(png_files, segment_inputs, video_files):
+            manifest.record(f"video:{png_path.stem}", inputs, files=[video_path])
+        return video_files
+
+    def build_audio_track_command(self, audio_files, durations, track_path):
+        """One narration track for the whole deck: each clip padded with silence to its slide's length."""
+        cmd = ["ffmpeg"]
+        for audio_path in audio_files:
+            cmd += ["-i", str(audio_path)]
+        # concat needs one sample format/rate/layout; TTS clips and silent fallbacks may differ
+        filters = [f"[{i}:a]aformat=sample_fmts=fltp:sample_rates=48000:channel_layouts=stereo,"
+                   f"apad,atrim=end={duration:.3f},asetpts=N/SR/TB[a{i}]"
+                   for i, duration in enumerate(durations)]
+        filters.append("".join(f"[a{i}]" for i in range(len(durations)))
+                       + f"concat=n={len(durations)}:v=0:a=1[out]")
+        cmd += ["-filter_complex", ";".join(filters), "-map", "[out]",
+                "-c:a", "aac", "-b:a", str(self.audio_bitrate or TRACK_AUDIO_BITRATE),
+                "-y", str(track_path)]
+        return cmd
+
+    def build_mux_command(self, video_path, tracks, output_path):
+        """Video stream copied once, plus one labeled audio stream per language in `tracks`."""
+        cmd = ["ffmpeg", "-i", str(video_path)]
+        for track_path in tracks.values():
+            cmd += ["-i", str(track_path)]
+        cmd += ["-map", "0:v"]
+        for i in range(len(tracks)):
+            cmd += ["-map", f"{i + 1}:a"]
+        cmd += ["-c", "copy"]
+        for i, language in enumerate(tracks):
+            base = language.split("-")[0].lower()
+            code = ISO639_2.get(base, base if len(base) == 3 else "und")
+            cmd += [f"-metadata:s:a:{i}", f"language={code}", f"-metadata:s:a:{i}", f"title={language}",
+                    f"-disposition:a:{i}", "default" if i == 0 else "0"]
+        cmd += ["-movflags", "+faststart", "-y", str(output_path)]
+        return cmd
+
+    def run_mux_step(self, cmd, label):
+        try:
+            self.profiler.run(cmd, label)
+        except subprocess.CalledProcessError as e:
+            raise EncodeError(f"FFmpeg {label} failed (exit code {e.returncode})", cmd, e.returncode,
+                              e.stderr.decode("utf-8", errors="replace") if e.stderr else "", "mux")
+
+    def mux_languages(self, video_files, audio_tracks, durations):
+        """
+        Step 6 of a multi-language run: concat the silent slide videos once,
+        build every language's narration track in parallel, then mux by stream
+        copy. Returns (main output, {language: output file}).
+        """
+        video_path = self.concatenate_videos(video_files, self.temp_dir / "video.mp4")
+        tracks_dir = self.temp_dir / "tracks"
+        tracks_dir.mkdir(exist_ok=True)
+        tracks = {language: tracks_dir / f"{language}.m4a" for language in audio_tracks}
+        with ThreadPoolExecutor(max_workers=len(tracks)) as executor:
+            futures = [executor.submit(self.run_mux_step,
+                                       self.build_audio_track_command(audio_files, durations, tracks[language]),
+                                       "audio-track")
+                       for language, audio_files in audio_tracks.items()]
+            for future in futures:
+                future.result()
         
-        print(f"Processing: {input_path}")
-        self.check_dependencies()
+        if self.language_output == "separate":
+            outputs = {language: self.output_dir / f"output.{language}.mp4" for language in tracks}
+            for language, output_path in outputs.items():
+                self.run_mux_step(self.build_mux_command(video_path, {language: tracks[language]},
+                                                         output_path), "mux")
+        else:
+            output_path = self.output_dir / "output.mp4"
+            self.run_mux_step(self.build_mux_command(video_path, tracks, output_path), "mux")
+            outputs = {language: output_path for language in tracks}
+        for language, output_path in outputs.items():
+            print(f"✓ {language}: {output_path}")
+        return outputs[self.languages[0]], outputs
+    
+    def prepare_pdf(self, input_path, manifest):
+        """Step 1: copy the input PDF or convert the PPTX, unless the source is unchanged."""
+        pdf_path = self.pdf_dir / "input.pdf"
+        inputs = {"source": manifest.file_hash(input_path)}
+        if manifest.is_current("pdf", inputs):
+            print("   Source unchanged, reusing existing PDF")
+            return pdf_path
         
-        # Step 1: Get or convert to PDF
-        if is_pdf:
-            print("\n1. Using input PDF file...")
-            pdf_path = self.pdf_dir / "input.pdf"
+        if input_path.suffix.lower() == '.pdf':
+            print("   Using input PDF file...")
             shutil.copy2(input_path, pdf_path)
         else:
-            print("\n1. Converting PPTX to PDF...")
+            print("   Converting PPTX to PDF...")
             pdf_path = self.convert_pptx_to_pdf(input_path)
+        manifest.forget("raster")
+        manifest.record("pdf", inputs, files=[pdf_path])
+        return pdf_path
+
+    def raster_inputs(self, pdf_path, manifest):
+        inputs = {"pdf": manifest.file_hash(pdf_path), "settings": self.raster_settings()}
+        if self.pages:
+            inputs["pages"] = self.pages
+        return inputs
+
+    def rasterize(self, pdf_path, manifest):
+        """Step 3: render PDF pages to PNG, unless the PDF and render settings are unchanged."""
+        inputs = self.raster_inputs(pdf_path, manifest)
+        if manifest.is_current("raster", inputs):
+            png_files = [Path(p) for p in manifest.outputs("raster")["pages"]]
+            print(f"   PDF unchanged, reusing {len(png_files)} existing PNG pages")
+            return png_files
         
-        # Step 2: Try to load script.txt first, then fallback to PDF extraction
-        print("\n2. Loading voiceover text...")
-        script_path = self.input_dir / "script.txt"
-        slide_texts = self.parse_script_file(script_path)
+        png_files = self.convert_pdf_to_png(pdf_path)
+        manifest.record("raster", inputs, outputs={"pages": [str(p) for p in png_files]},
+                        files=png_files)
+        return png_files
+
+    def load_slide_texts(self, pdf_path, manifest=None):
+        """Step 2: narration from script.txt, falling back to text extracted from the PDF."""
+        slide_texts = self.parse_script_file(self.script_path)
         
         # If script.txt not available or empty, extract from PDF
         if not slide_texts:
             print("   [Fallback] Extracting text from PDF...")
-            slide_texts = self.extract_text_from_pdf(pdf_path)
-        
-        # Step 3: Convert to PNG
-        print("\n3. Extracting RAW PNG images from PDF...")
-        png_files = self.convert_pdf_to_png(pdf_path)
-        
-        # Fallback text logic
-        if not slide_texts or len(slide_texts) != len(png_files):
+            slide_texts = self.extract_text_from_pdf(pdf_path, manifest)
+        return slide_texts
+
+    def start_slide_texts(self, pdf_path, manifest, script_path=None):
+        """
+        Step 2 without blocking: script.txt (or `script_path`) is read right away,
+        PDF text extraction runs in the background (next to rasterization).
+        Returns a future of the slide texts.
+        """
+        slide_texts = self.parse_script_file(script_path or self.script_path)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract-text")
+        if slide_texts:
+            future = executor.submit(lambda: slide_texts)
+        else:
+            print("   [Fallback] Extracting text from PDF (in parallel with rasterization)...")
+            future = executor.submit(self.extract_text_from_pdf, pdf_path, manifest)
+        executor.shutdown(wait=False)
+        return future
+
+    def script_for(self, language):
+        """Narration script of one language: script.<lang>.txt if it exists, else script.txt."""
+        path = self.script_path.with_name(f"{self.script_path.stem}.{language}{self.script_path.suffix}")
+        return path if path.exists() else self.script_path
+
+    def start_language_texts(self, pdf_path, manifest):
+        """start_slide_texts() per language; languages without their own script share one."""
+        by_script = {}
+        futures = {}
+        for language in self.languages:
+            script_path = self.script_for(language)
+            if script_path not in by_script:
+                by_script[script_path] = self.start_slide_texts(pdf_path, manifest, script_path)
+            futures[language] = by_script[script_path]
+        return futures
+
+    def deck_page_count(self, pdf_path, png_files):
+        """Pages of the whole deck (png_files only holds the --pages selection); None if unknown."""
+        if not self.pages:
+            return len(png_files)
+        info = self.pdf_info(pdf_path)
+        return info[0] if info else None
+
+    def slide_texts_for(self, slide_texts, png_files, page_count):
+        """
+        Narration per rendered page: align_slide_texts() over the whole deck,
+        picked by page number, so a --pages render (draft, shard) narrates every
+        page exactly like the full render does.
+        """
+        numbers = [int(p.stem.split('-')[-1]) for p in png_files]
+        if page_count is None:
+            # No pdfinfo: trust a script that covers every selected page
+            last = max(numbers)
+            page_count = len(slide_texts) if slide_texts and len(slide_texts) >= last else last
+        aligned = self.align_slide_texts(list(slide_texts or []), page_count)
+        return [aligned[n - 1] for n in numbers]
+
+    def align_slide_texts(self, slide_texts, page_count):
+        """Fallback text logic: make the narration list match the page count."""
+        if not slide_texts or len(slide_texts) != page_count:
             print("   Warning: Text mismatch or extraction failed. Using default narration.")
-            slide_texts = [f"Slide {i}" for i in range(1, len(png_files) + 1)]
-        elif len(slide_texts) < len(png_files):
-            print(f"   Warning: Script has {len(slide_texts)} slides but PDF has {len(png_files)} pages.")
+            slide_texts = [f"Slide {i}" for i in range(1, page_count + 1)]
+        elif len(slide_texts) < page_count:
+            print(f"   Warning: Script has {len(slide_texts)} slides but PDF has {page_count} pages.")
             print("   Padding with default text for remaining slides...")
-            for i in range(len(slide_texts) + 1, len(png_files) + 1):
+            for i in range(len(slide_texts) + 1, page_count + 1):
                 slide_texts.append(f"Slide {i}")
-        elif len(slide_texts) > len(png_files):
-            print(f"   Warning: Script has {len(slide_texts)} slides but PDF has {len(png_files)} pages.")
+        elif len(slide_texts) > page_count:
+            print(f"   Warning: Script has {len(slide_texts)} slides but PDF has {page_count} pages.")
             print("   Truncating script to match PDF page count...")
-            slide_texts = slide_texts[:len(png_files)]
+            slide_texts = slide_texts[:page_count]
+        return slide_texts
+
+    def dry_run(self, input_path, language, manifest):
+        """Print which stages and slides would be rebuilt, without running anything."""
+        print("\n[Dry run] Nothing will be written.")
+        pdf_path = self.pdf_dir / "input.pdf"
+        if manifest.is_current("pdf", {"source": manifest.file_hash(input_path)}):
+            print("   PDF:       reuse")
+            pdf_changed = not manifest.is_current("raster", self.raster_inputs(pdf_path, manifest))
+        else:
+            print("   PDF:       rebuild (source changed)")
+            pdf_changed = True
         
-        # Step 4: Generate audio for each slide (FORCE LOOP)
-        print("\n4. Generating TTS audio for each slide...")
-        audio_files = []
+        if pdf_changed:
+            print("   PNG pages: re-rasterize all pages; slide videos are rebuilt "
+                  "only where the rendered page changes")
+            return
+        
+        png_files = [Path(p) for p in manifest.outputs("raster")["pages"]]
+        print(f"   PNG pages: reuse {len(png_files)} pages")
+        slide_texts = self.load_slide_texts(pdf_path, manifest)
+        if not slide_texts or len(slide_texts) != len(png_files):
+            slide_texts = [f"Slide {i}" for i in range(1, len(png_files) + 1)]
         
+        encoder = self.encoder_signature()
+        rebuild = 0
         for idx, (png_path, text) in enumerate(zip(png_files, slide_texts), 1):
-            png_name = png_path.stem
-            slide_suffix = png_name.split('-')[-1]
-            audio_path = self.audio_dir / f"slide-{slide_suffix}.mp3"
-            
-            print(f"   Processing Slide {idx}...")
-            
-            if not text or text.strip() == "":
-                text = f"Slide {idx}" # Minimal text to avoid gTTS error
-            
-            # --- MODIFIED LOGIC: LOOP UNTIL SUCCESS ---
-            if not audio_path.exists():
-                retry_count = 0
-                while True: # Infinite loop until success
-                    try:
-                        # Jeda preventif (rate limiting)
-                        # Semakin banyak slide, semakin penting jeda ini
-                        time.sleep(1) 
-                        
-                        tts = gTTS(text=text, lang=language, slow=False)
-                        tts.save(str(audio_path))
-                        
-                        print(f"     ✓ Audio generated: {audio_path.name}")
-                        break # SUKSES -> Keluar dari while
-                        
-                    except Exception as e:
-                        retry_count += 1
-                        wait_time = 10 # Detik tunggu kalau gagal
-                        
-                        print(f"     [!] Gagal generate audio (Percobaan {retry_count}).")
-                        print(f"         Error: {e}")
-                        print(f"         Menunggu {wait_time} detik sebelum mencoba lagi...")
-                        
-                        # Tunggu sebelum mencoba lagi agar tidak diblokir
-                        time.sleep(wait_time)
+            key = self.slide_audio_key(self.narration_text(idx, text), language)
+            audio_path = self.audio_path_for(png_path.stem)
+            if manifest.is_current(f"audio:{png_path.stem}", {"key": key}):
+                audio_state = "reuse"
+                if self.render_mode == "single-pass":
+                    print(f"   Slide {idx}: audio reuse")
+                    continue
+                segment_inputs = self.segment_inputs(png_path, audio_path, manifest, encoder)
+                video_state = ("reuse" if manifest.is_current(f"segment:{png_path.stem}", segment_inputs)
+                               else "encode")
             else:
-                print(f"     [i] Using existing audio: {audio_path.name}")
-            
-            audio_files.append(audio_path)
+                cached = self.audio_cache and self.audio_cache.get(key, self.tts_backend.extension)
+                audio_state = "from cache" if cached else "synthesize"
+                video_state = "encode"
+            if video_state != "reuse":
+                rebuild += 1
+            print(f"   Slide {idx}: audio {audio_state}, video {video_state}")
+        if self.render_mode == "single-pass":
+            state = "re-render" if rebuild else "reuse (if output/output.mp4 is unchanged)"
+            print(f"   Single-pass output: {state}")
+        else:
+            print(f"   {rebuild} of {len(png_files)} slide videos would be rebuilt")
+
+    @contextmanager
+    def stage(self, name, total=1):
+        """Profile one pipeline stage and report its progress (`total` = units, e.g. slides)."""
+        if self.cancelled:
+            raise PipelineCancelled("Cancelled", name)
+        self._current_stage = name
+        self.progress.stage_start(name, total)
+        with self.profiler.stage(name):
+            yield
+        self.progress.stage_end(name)
+
+    def stage_plan(self, streaming):
+        if len(self.languages) > 1:
+            return ["pdf", "text", "rasterize", "tts", "encode", "mux"]
+        concat = ["shard"] if self.shard_dir else ["concat"] if self.mp4 else []
+        if streaming:
+            return ["pdf", "text", "streaming"] + concat
+        last = ["single-pass"] if self.render_mode == "single-pass" else ["encode"] + concat
+        return ["pdf", "text", "rasterize", "tts"] + last
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """
+        Stop a running process() from another thread: running pdftoppm and
+        encoder processes are killed, TTS requests stop before their next
+        attempt and process() raises errors.PipelineCancelled.
+        """
+        self._cancel.set()
+        if self._streaming:
+            self._streaming.fail(lambda: PipelineCancelled("Cancelled", "streaming"))
+        self.terminate_encoders()
+
+    def process(self, input_filename="test.pdf", language='en', dry_run=False):
+        """
+        Main processing pipeline; returns a PipelineResult (None for a dry run).
+        Each stage is recorded in temp/manifest.json and skipped on the next
+        run when its inputs are unchanged. Failures raise errors.PipelineError.
+        """
+        input_path = self.input_dir / input_filename
         
-        # Step 5: Create Individual Videos
-        print("\n5. Creating individual slide videos...")
-        video_files = []
-        for png_path, audio_path in zip(png_files, audio_files):
-            png_name = png_path.stem
-            slide_suffix = png_name.split('-')[-1]
-            video_path = self.videos_dir / f"slide-{slide_suffix}.mp4"
-            
-            print(f"   Creating video for {png_name}...")
-            
-            cmd = [
-                "ffmpeg", "-loop", "1", "-i", str(png_path),
-                "-i", str(audio_path), 
-                "-c:v", "libx264",
-                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", # Memastikan lebar/tinggi genap
-                "-tune", "stillimage",
-                "-shortest", 
-                "-pix_fmt", "yuv420p", 
-                "-y", str(video_path)
-            ]
-            
-            try:
-                subprocess.run(cmd, check=True, capture_output=True)
-                video_files.append(video_path)
-            except subprocess.CalledProcessError as e:
-                print(f"  ERROR: Failed to create video. Return code: {e.returncode}")
-                try:
-                    stderr = e.stderr.decode('utf-8', errors='replace') if e.stderr else ''
-                    stdout = e.stdout.decode('utf-8', errors='replace') if e.stdout else ''
-                    if stderr:
-                        print("  ---- FFmpeg stderr ----")
-                        print(stderr)
-                    if stdout:
-                        print("  ---- FFmpeg stdout ----")
-                        print(stdout)
-                except Exception:
-                    pass
-                print(f"  Command: {' '.join(cmd)}")
-                sys.exit(1)
+        if not input_path.exists():
+            raise InputError(f"Input file not found: {input_path}")
+        
+        print(f"Processing: {input_path}")
+        manifest = BuildManifest(self.temp_dir / "manifest.json")
+        if dry_run:
+            self.dry_run(input_path, language, manifest)
+            return None
         
-        # Step 6: Concatenate
-        print("\n6. Concatenating all slide videos...")
-        final_video = self.concatenate_videos(video_files)
+        start = time.monotonic()
+        try:
+            self.check_dependencies()
+            result = self.run_stages(input_path, language, manifest)
+        except PipelineError as e:
+            e.stage = e.stage or self._current_stage
+            self.progress.failed(e.stage)
+            raise
+        result.seconds = time.monotonic() - start
+        self.progress.done(result.output)
         
         print("\n" + "=" * 60)
         print("✓ PIPELINE COMPLETED SUCCESSFULLY!")
-        print(f"✓ Output video: {final_video}")
+        print(f"✓ Output video: {result.output}")
         print("=" * 60)
+        return result
+
+    def run_stages(self, input_path, language, manifest):
+        """Steps 1-6 of process(); returns a PipelineResult."""
+        prof = self.profiler
+        prof.meta.update(input=str(input_path), pipeline=self.pipeline, render_mode=self.render_mode,
+                         jobs=self.jobs, tts_engine=self.tts_engine_id(), raster=self.raster_settings(),
+                         pipe_images=self.pipe_images, hls=self.hls, languages=self.languages,
+                         draft=self.draft, pages=self.pages)
+        streaming = self.pipeline == "streaming" or self.pipe_images
+        multi = len(self.languages) > 1
+        if multi and (streaming or self.render_mode != "segments" or self.hls):
+            # Slide lengths depend on every language's audio before any video is encoded
+            print("\n   [!] --languages uses the staged pipeline with per-slide videos (no --hls)")
+            streaming = self.pipe_images = self.hls = False
+            self.render_mode = "segments"
+        if self.shard_dir and (multi or self.render_mode != "segments"):
+            print("\n   [!] --shard needs --render-mode segments and one language, writing the MP4")
+            self.shard_dir = None
+        if self.pages and streaming:
+            # The streaming pipeline walks every page of the PDF
+            print("\n   [!] --pages uses the staged pipeline")
+            streaming = self.pipe_images = False
+        if self.pipe_images and self.render_mode != "segments":
+            print("\n   [!] --pipe-images needs --render-mode segments, writing slide images to disk")
+            self.pipe_images = False
+            streaming = self.pipeline == "streaming"
+        if self.hls and self.render_mode != "segments":
+            print("\n   [!] --hls needs --render-mode segments, writing only the MP4")
+            self.hls = False
+            self.mp4 = True
+        self.progress.plan(self.stage_plan(streaming and self.render_mode == "segments"))
+        
+        # Step 1: Get or convert to PDF
+        print("\n1. Preparing PDF...")
+        with self.stage("pdf"):
+            pdf_path = self.prepare_pdf(input_path, manifest)
+        manifest.save()
+        
+        # Step 2: Try to load script.txt first, then fallback to PDF extraction
+        print("\n2. Loading voiceover text...")
+        with self.stage("text"):
+            if multi:
+                text_futures = self.start_language_texts(pdf_path, manifest)
+            else:
+                text_future = self.start_slide_texts(pdf_path, manifest)
+        
+        self._hls_writer = None
+        if self.hls:
+            self._hls_writer = HLSWriter(self.output_dir / "hls", prof)
+            print(f"   HLS playlist (grows as slides finish): {self._hls_writer.playlist}")
+        
+        info = None
+        if streaming:
+            if self.render_mode != "segments":
+                print("\n   [!] Streaming needs --render-mode segments, using the staged pipeline")
+            else:
+                info = self.pdf_info(pdf_path)
+                if not info:
+                    print("\n   [!] pdfinfo not available, using the staged pipeline")
+                    self.pipe_images = False
+                    self.progress.plan(self.stage_plan(False))
+        
+        if info:
+            # Steps 3-5 overlap: each slide is encoded as soon as its image and audio exist
+            page_count, page_size = info
+            slide_texts = self.align_slide_texts(text_future.result(), page_count)
+            piped = " (pages piped into FFmpeg, no slide images on disk)" if self.pipe_images else ""
+            print(f"\n3-5. Streaming rasterize -> TTS -> encode{piped}...")
+            prof.meta["slides"] = page_count
+            pipeline = StreamingPipeline(self, pdf_path, page_count, page_size,
+                                         slide_texts, language, manifest, self.max_pending)
+            self._streaming = pipeline
+            # Three units per slide: image, audio, video
+            with self.stage("streaming", page_count * 3):
+                try:
+                    video_files = pipeline.run()
+                finally:
+                    self._streaming = None
+            manifest.save()
+            slide_pages = list(range(1, page_count + 1))
+            audio_files = pipeline.audio
+        else:
+            # Step 3: Convert to PNG
+            print("\n3. Extracting RAW PNG images from PDF...")
+            with self.stage("rasterize"):
+                png_files = self.rasterize(pdf_path, manifest)
+            manifest.save()
+            prof.meta["slides"] = len(png_files)
+            
+            # Narration is aligned over the whole deck, also when only some pages are rendered
+            page_count = self.deck_page_count(pdf_path, png_files)
+            if multi:
+                texts = {language: self.slide_texts_for(future.result(), png_files, page_count)
+                         for language, future in text_futures.items()}
+                
+                # Step 4: Audio for every language at once
+                print(f"\n4. Generating TTS audio for {', '.join(self.languages)}...")
+                with self.stage("tts", len(png_files) * len(self.languages)):
+                    audio_tracks = self.generate_language_audio(png_files, texts, manifest)
+                manifest.save()
+                
+                # Step 5: Video once, each slide as long as its longest narration
+                print("\n5. Creating slide videos (once for all languages)...")
+                with self.stage("encode", len(png_files)):
+                    durations = self.slide_durations(audio_tracks)
+                    video_files = self.build_video_segments(png_files, durations, manifest)
+                manifest.save()
+                
+                # Step 6: One narration track per language, muxed with the same video stream
+                print("\n6. Muxing audio tracks...")
+                with self.stage("mux"):
+                    final_video, outputs = self.mux_languages(video_files, audio_tracks, durations)
+                return PipelineResult(output=final_video, slides=len(png_files), pdf=pdf_path,
+                                      outputs=outputs)
+            
+            slide_texts = self.slide_texts_for(text_future.result(), png_files, page_count)
+            
+            # Step 4: Generate audio for each slide
+            print("\n4. Generating TTS audio for each slide...")
+            with self.stage("tts", len(png_files)):
+                audio_files = self.generate_audio(png_files, slide_texts, language, manifest)
+            manifest.save()
+            
+            if self.render_mode == "single-pass":
+                # Step 5: One FFmpeg run for the whole deck (no per-slide segments)
+                print("\n5. Rendering final video in a single pass...")
+                with self.stage("single-pass"):
+                    final_video = self.render_single_pass(png_files, audio_files, manifest)
+                manifest.save()
+            else:
+                # Step 5: Create Individual Videos
+                print("\n5. Creating individual slide videos...")
+                with self.stage("encode", len(png_files)):
+                    video_files = self.build_segments(png_files, audio_files, manifest)
+                manifest.save()
+                slide_pages = [int(p.stem.split('-')[-1]) for p in png_files]
+        
+        playlist = None
+        if self._hls_writer:
+            playlist = final_video = self._hls_writer.finish()
+            print(f"\n✓ HLS playlist complete: {playlist}")
+        if self.shard_dir:
+            # Step 6: Segments + shard.json; the MP4 is made by `shards.py merge`
+            print("\n6. Writing shard...")
+            with self.stage("shard"):
+                final_video = self.write_shard(input_path, pdf_path, language, slide_pages,
+                                               video_files, audio_files, manifest)
+        elif self.render_mode != "single-pass" and self.mp4:
+            # Step 6: Concatenate (stream copy of the slide videos)
+            print("\n6. Concatenating all slide videos...")
+            with self.stage("concat"):
+                final_video = self.concatenate_videos(video_files)
+        return PipelineResult(output=final_video, slides=prof.meta["slides"], pdf=pdf_path,
+                              playlist=playlist)
 
 
 def main():
@@ -410,20 +1686,167 @@ def main():
     parser.add_argument("--language", "-l", default="en")
     parser.add_argument("--background", "-b", default=None)
     parser.add_argument("--clean", action="store_true")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of slide videos to encode in parallel (0 = auto)")
+    parser.add_argument("--tts-engine", choices=sorted(TTS_BACKENDS), default="gtts",
+                        help="TTS backend: gtts (online), espeak or piper (offline)")
+    parser.add_argument("--tts-voice", default=None,
+                        help="Voice for the TTS engine (espeak voice name, piper .onnx model)")
+    parser.add_argument("--tts-workers", type=int, default=4,
+                        help="Concurrent TTS requests")
+    parser.add_argument("--tts-rate", type=float, default=2.0,
+                        help="Max TTS requests per second (token bucket)")
+    parser.add_argument("--tts-burst", type=int, default=2,
+                        help="Token bucket size (back-to-back TTS requests allowed)")
+    parser.add_argument("--tts-max-attempts", type=int, default=5,
+                        help="Give up on a slide after this many failed TTS attempts")
+    parser.add_argument("--tts-chunk-chars", type=int, default=300,
+                        help="Split longer slide narration into sentence chunks synthesized in parallel (0 = off)")
+    parser.add_argument("--tts-chunk-gap", type=float, default=0.25,
+                        help="Seconds of silence between stitched chunks")
+    parser.add_argument("--audio-cache", default=None,
+                        help="Shared TTS audio cache directory (default: ~/.cache/pptvo/tts)")
+    parser.add_argument("--audio-cache-size", type=int, default=1024,
+                        help="Audio cache size budget in MB (least recently used clips are evicted)")
+    parser.add_argument("--render-mode", choices=["segments", "single-pass"], default="segments",
+                        help="segments: one video per slide + concat; single-pass: one FFmpeg run")
+    parser.add_argument("--resolution", default="1920x1080",
+                        help="Rasterize slides to fit this WIDTHxHEIGHT box")
+    parser.add_argument("--dpi", type=int, default=None,
+                        help="Rasterize at a fixed DPI instead of --resolution (e.g. 300)")
+    parser.add_argument("--raster-format", choices=sorted(RASTER_FORMATS), default="png",
+                        help="Intermediate slide image format (ppm = uncompressed, fastest)")
+    parser.add_argument("--raster-jobs", type=int, default=0,
+                        help="Parallel pdftoppm workers (0 = one per CPU)")
+    parser.add_argument("--pipeline", choices=["staged", "streaming"], default="staged",
+                        help="streaming: encode each slide as soon as its image and audio exist")
+    parser.add_argument("--max-pending", type=int, default=4,
+                        help="Streaming: max slides rasterized but not yet encoded")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Show which pages/slides would be rebuilt and exit")
+    parser.add_argument("--no-audio-cache", action="store_true",
+                        help="Always synthesize audio, never read or write the cache")
+    parser.add_argument("--profile", default=None, metavar="REPORT.json",
+                        help="Write per-stage/per-process wall time, CPU time and peak RSS as JSON")
+    parser.add_argument("--trace", default=None, metavar="TRACE.json",
+                        help="Write a Chrome trace timeline (chrome://tracing, Perfetto)")
+    parser.add_argument("--progress-json", default=None, metavar="FILE",
+                        help="Write progress events (stage, slide, percent, ETA, errors) as JSON lines; - = stderr")
+    parser.add_argument("--batch", default=None, metavar="DIR_OR_GLOB",
+                        help="Convert every deck in a directory or glob; output/<deck>/output.mp4")
+    parser.add_argument("--deck-jobs", type=int, default=1,
+                        help="Batch: decks processed at the same time")
+    parser.add_argument("--office", choices=["auto", "listener", "soffice"], default="auto",
+                        help="Batch PPTX conversion: persistent unoserver listener or batched soffice runs")
+    parser.add_argument("--encode-profile", choices=sorted(ENCODE_PROFILES), default="default",
+                        help="still: low frame rate and long GOPs, encode time follows slide count")
+    parser.add_argument("--x264-preset", default=None,
+                        help="x264 preset, e.g. ultrafast, veryfast, medium (overrides the profile)")
+    parser.add_argument("--crf", type=int, default=None,
+                        help="x264 CRF quality, lower = better/larger (overrides the profile)")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="Output frame rate (default: 25, or 5 with --encode-profile still)")
+    parser.add_argument("--audio-bitrate", default=None,
+                        help="Encode narration to AAC at this fixed bitrate, e.g. 128k")
+    parser.add_argument("--pipe-images", action="store_true",
+                        help="Pipe pages from pdftoppm into FFmpeg without writing slide images (uses streaming)")
+    parser.add_argument("--text-extractor", choices=["auto"] + sorted(TEXT_EXTRACTORS), default="auto",
+                        help="Text extraction without script.txt (auto: pdftotext, then pdfplumber, then PyPDF2)")
+    parser.add_argument("--hls", action="store_true",
+                        help="Also write output/hls/index.m3u8, playable while later slides are still rendering")
+    parser.add_argument("--no-mp4", action="store_true",
+                        help="With --hls: skip concatenating output/output.mp4")
+    parser.add_argument("--draft", action="store_true",
+                        help=f"Quick preview: {DRAFT_RESOLUTION[0]}x{DRAFT_RESOLUTION[1]}, ultrafast x264, "
+                             "written to <output>/draft and <temp>/draft")
+    parser.add_argument("--pages", default=None, metavar="1,3,5-7",
+                        help="Render only these pages/slides")
+    parser.add_argument("--shard", default=None, metavar="DIR",
+                        help="With --pages A-B: write the slide videos and shard.json to DIR for shards.py merge")
+    parser.add_argument("--script", default=None,
+                        help="Narration script (default: <input>/script.txt)")
+    parser.add_argument("--languages", default=None, metavar="LANG,LANG",
+                        help="Render several languages in one run (narration from script.<lang>.txt)")
+    parser.add_argument("--language-output", choices=LANGUAGE_OUTPUTS, default="tracks",
+                        help="--languages: one MP4 with an audio track per language, or output.<lang>.mp4 each")
     
     args = parser.parse_args()
     
     input_file = args.pptx if args.pptx else args.file
+    if args.no_mp4 and not args.hls:
+        parser.error("--no-mp4 needs --hls")
+    try:
+        pages = parse_pages(args.pages) if args.pages else None
+    except ValueError as e:
+        parser.error(f"--pages: {e}")
+    languages = [l.strip() for l in args.languages.split(",") if l.strip()] if args.languages else []
+    if len(languages) == 1:
+        args.language, languages = languages[0], []
+    if args.shard and (languages or args.batch or args.render_mode != "segments"):
+        parser.error("--shard needs --render-mode segments, one language and a single deck")
+    if args.batch and (args.dry_run or args.script):
+        parser.error("--batch has no --dry-run and reads each deck's narration from <deck>.script.txt, not --script")
+    
+    try:
+        width, height = (int(v) for v in args.resolution.lower().split("x"))
+    except ValueError:
+        parser.error(f"--resolution must look like 1920x1080, got {args.resolution!r}")
     
     if args.clean:
         if Path(args.temp).exists():
             shutil.rmtree(args.temp)
             
-    converter = PPTXToVideoConverter(
-        input_dir=args.input, output_dir=args.output,
-        temp_dir=args.temp, background_path=args.background
+    try:
+        tts_backend = make_tts_backend(args.tts_engine, args.tts_voice)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    audio_cache = None
+    if not args.no_audio_cache:
+        audio_cache = AudioCache(args.audio_cache, max_bytes=args.audio_cache_size * 1024 * 1024)
+    
+    profiler = Profiler(enabled=bool(args.profile or args.trace))
+    progress = ProgressReporter.to_path(args.progress_json) if args.progress_json else None
+    options = dict(
+        background_path=args.background,
+        jobs=args.jobs, tts_backend=tts_backend, tts_workers=args.tts_workers, tts_rate=args.tts_rate,
+        tts_burst=args.tts_burst, tts_max_attempts=args.tts_max_attempts,
+        audio_cache=audio_cache, render_mode=args.render_mode,
+        resolution=(width, height), dpi=args.dpi, raster_format=args.raster_format,
+        raster_jobs=args.raster_jobs, pipeline=args.pipeline, max_pending=args.max_pending,
+        tts_chunk_chars=args.tts_chunk_chars, tts_chunk_gap=args.tts_chunk_gap,
+        profiler=profiler, progress=progress, encode_profile=args.encode_profile,
+        x264_preset=args.x264_preset, crf=args.crf, fps=args.fps, audio_bitrate=args.audio_bitrate,
+        text_extractor=args.text_extractor, pipe_images=args.pipe_images, hls=args.hls,
+        mp4=not args.no_mp4, languages=languages, language_output=args.language_output,
+        draft=args.draft, pages=pages
     )
-    converter.process(input_filename=input_file, language=args.language)
+    
+    try:
+        if args.batch:
+            runner = BatchRunner(find_decks(args.batch), output_dir=args.output, temp_dir=args.temp,
+                                 deck_jobs=args.deck_jobs, office_mode=args.office, options=options)
+            results = runner.run(language=args.language)
+            if not results or not all(r["ok"] for r in results):
+                sys.exit(1)
+        else:
+            converter = PPTXToVideoConverter(input_dir=args.input, output_dir=args.output,
+                                             temp_dir=args.temp, script_path=args.script,
+                                             shard_dir=args.shard, **options)
+            converter.process(input_filename=input_file, language=args.language, dry_run=args.dry_run)
+    except PipelineError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        # Also written when a stage fails, to see where the time went
+        if args.profile:
+            profiler.write_report(args.profile)
+            print(f"Profile report: {args.profile}")
+        if args.trace:
+            profiler.write_trace(args.trace)
+            print(f"Trace timeline: {args.trace}")
+        if progress:
+            progress.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+Instrumentation for the PPTX/PDF to Video pipeline (--profile / --trace).
+
+Profiler records, for every pipeline stage, wall time, CPU time (this process
+plus its children) and peak RSS. It also records every external process
+(soffice, pdftoppm, ffmpeg, ...) with its own CPU time and peak RSS, taken
+from wait4(). Results are written as a JSON report and optionally as a
+Chrome trace (chrome://tracing, Perfetto, speedscope) timeline.
+
+A disabled Profiler still runs commands and stages, it just records nothing,
+so call sites never need to check whether profiling is on.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: wall time only
+    resource = None
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class Profiler:
+    """Collects stage and subprocess measurements."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.meta = {}
+        self.stages = []
+        self.processes = []
+        self.spans = []
+        self.origin = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _us(self, t):
+        return int((t - self.origin) * 1e6)
+
+    @contextmanager
+    def stage(self, name):
+        """Measure a pipeline stage."""
+        if not self.enabled:
+            yield
+            return
+        start = time.monotonic()
+        before = self._usage()
+        try:
+            yield
+        finally:
+            end = time.monotonic()
+            after = self._usage()
+            with self._lock:
+                child_peak = max((p["peak_rss_mb"] for p in self.processes
+                                  if start <= p["_start"] <= end), default=0.0)
+                self.stages.append({
+                    "name": name,
+                    "wall_s": round(end - start, 4),
+                    "cpu_self_s": round(after[0] - before[0], 4) if after else None,
+                    "cpu_children_s": round(after[1] - before[1], 4) if after else None,
+                    "peak_rss_mb": after[2] if after else None,
+                    "peak_child_rss_mb": child_peak,
+                    "_start": start,
+                    "_end": end,
+                })
+
+    @staticmethod
+    def _usage():
+        """(own CPU seconds, reaped children's CPU seconds, own peak RSS in MB), or None."""
+        if resource is None:
+            return None
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return (own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime,
+                round(own.ru_maxrss * RSS_UNIT / 2 ** 20, 1))
+
+    def span(self, name, start, end, slide=None, **args):
+        """Record an in-process span (e.g. one TTS request) with monotonic start/end times."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.spans.append({"name": name, "slide": slide, "_start": start, "_end": end,
+                               "tid": threading.get_ident(), "args": args})
+
+    def run(self, cmd, label=None, slide=None, check=True, input=None, text=False, on_start=None):
+        """
+        Run `cmd` like subprocess.run(..., capture_output=True) and record it.
+        on_start(proc) is called right after the process is spawned (e.g. to
+        register it for termination). Raises CalledProcessError if check fails.
+        """
+        start = time.monotonic()
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if input is not None else None,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if on_start:
+            on_start(proc)
+        usage = None
+        if not self.enabled or not hasattr(os, "wait4"):
+            stdout, stderr = proc.communicate(input)
+        else:
+            stdout, stderr, usage = self._communicate(proc, input)
+        end = time.monotonic()
+        if text:
+            stdout = stdout.decode("utf-8", errors="replace")
+            stderr = stderr.decode("utf-8", errors="replace")
+
+        if self.enabled:
+            record = {
+                "label": label or os.path.basename(cmd[0]),
+                "slide": slide,
+                "command": os.path.basename(cmd[0]),
+                "returncode": proc.returncode,
+                "wall_s": round(end - start, 4),
+                "cpu_user_s": round(usage.ru_utime, 4) if usage else None,
+                "cpu_sys_s": round(usage.ru_stime, 4) if usage else None,
+                "peak_rss_mb": round(usage.ru_maxrss * RSS_UNIT / 2 ** 20, 1) if usage else 0.0,
+                "_start": start,
+                "_end": end,
+                "tid": threading.get_ident(),
+            }
+            with self._lock:
+                self.processes.append(record)
+
+        if check and proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout, stderr=stderr)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+    @staticmethod
+    def _communicate(proc, input):
+        """communicate() that reaps the child with wait4 to get its resource usage."""
+        out, err = [], []
+        readers = [
+            threading.Thread(target=lambda: out.append(proc.stdout.read())),
+            threading.Thread(target=lambda: err.append(proc.stderr.read())),
+        ]
+        for t in readers:
+            t.start()
+        if input is not None:
+            try:
+                proc.stdin.write(input)
+            except BrokenPipeError:
+                pass
+            proc.stdin.close()
+        for t in readers:
+            t.join()
+        proc.stdout.close()
+        proc.stderr.close()
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = _exit_code(status)
+        except ChildProcessError:
+            # Already reaped by Popen (e.g. terminate() polls first)
+            proc.wait()
+            usage = None
+        return out[0], err[0], usage
+
+    # --- output ------------------------------------------------------------
+
+    @staticmethod
+    def _public(record):
+        return {k: v for k, v in record.items() if not k.startswith("_") and k != "tid"}
+
+    def report(self):
+        """Profile as a JSON-serializable dict."""
+        by_label = {}
+        for p in self.processes:
+            entry = by_label.setdefault(p["label"], {"count": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                     "peak_rss_mb": 0.0})
+            entry["count"] += 1
+            entry["wall_s"] = round(entry["wall_s"] + p["wall_s"], 4)
+            entry["cpu_s"] = round(entry["cpu_s"] + (p["cpu_user_s"] or 0) + (p["cpu_sys_s"] or 0), 4)
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"], p["peak_rss_mb"])
+        total = max((s["_end"] for s in self.stages), default=self.origin) - self.origin
+        return {
+            "meta": self.meta,
+            "total_wall_s": round(total, 4),
+            "stages": [self._public(s) for s in self.stages],
+            "subprocess_summary": by_label,
+            "subprocesses": [self._public(p) for p in self.processes],
+            "spans": [dict(self._public(s), wall_s=round(s["_end"] - s["_start"], 4))
+                      for s in self.spans],
+        }
+
+    def write_report(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_trace(self, path):
+        """Chrome trace event format: stages on one track, each worker thread on its own."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "pptx_to_video"}}]
+        for s in self.stages:
+            events.append({"name": s["name"], "cat": "stage", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": self._us(s["_start"]), "dur": self._us(s["_end"]) - self._us(s["_start"]),
+                           "args": self._public(s)})
+        for p in self.processes:
+            name = p["label"] if p["slide"] is None else f"{p['label']} #{p['slide']}"
+            events.append({"name": name, "cat": "subprocess", "ph": "X", "pid": pid, "tid": p["tid"],
+                           "ts": self._us(p["_start"]), "dur": self._us(p["_end"]) - self._us(p["_start"]),
+                           "args": self._public(p)})
+        for s in self.spans:
+            name = s["name"] if s["slide"] is None else f"{s['name']} #{s['slide']}"
+            events.append({"name": name, "cat": "span", "ph": "X", "pid": pid, "tid": s["tid"],
+                           "ts": self._us(s["_start"]), "dur": self._us(s["_end"]) - self._us(s["_start"]),
+                           "args": s["args"]})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,154 @@
+"""
+Machine-readable progress events for the PPTX/PDF to Video pipeline.
+
+ProgressReporter turns stage and per-slide updates into events and hands them
+to a callback and/or writes them as JSON lines (--progress-json FILE, or "-"
+for stderr, which keeps them apart from the human-readable log on stdout):
+
+    {"event": "progress", "stage": "encode", "slide": 3, "done": 3, "total": 12,
+     "percent": 61.4, "eta": 42.0, "elapsed": 66.9, "message": "..."}
+
+Events: "start" (stage plan), "stage_start", "progress", "stage_end", "error",
+"done" and "failed". `percent` is the progress of the whole run: every stage
+has a weight (TTS and encoding dominate) and counts in proportion to the
+slides it has finished. `eta` (seconds) is extrapolated from the elapsed time
+once a few percent are done.
+"""
+
+import json
+import sys
+import threading
+import time
+
+# Relative share of a typical run's wall time per stage
+STAGE_WEIGHTS = {
+    "pdf": 5,
+    "text": 2,
+    "rasterize": 8,
+    "tts": 35,
+    "encode": 40,
+    "single-pass": 40,
+    "streaming": 83,
+    "concat": 5,
+    "mux": 8,
+    "shard": 3,
+}
+
+# Don't extrapolate an ETA from the first few percent
+ETA_MIN_FRACTION = 0.03
+
+
+class ProgressReporter:
+    """Thread-safe progress tracker that emits events to a callback and/or a JSON lines stream."""
+
+    def __init__(self, callback=None, stream=None, context=None, clock=time.monotonic):
+        self.callback = callback
+        self.stream = stream
+        # Extra fields added to every event (e.g. {"deck": name} in batch mode)
+        self.context = dict(context or {})
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._plan = []
+        self._done = {}
+        self._totals = {}
+
+    @classmethod
+    def to_path(cls, path, callback=None):
+        """Reporter writing JSON lines to `path` ("-" = stderr)."""
+        stream = sys.stderr if path == "-" else open(path, "a", encoding="utf-8")
+        return cls(callback=callback, stream=stream)
+
+    def child(self, **context):
+        """New reporter for a sub-run (e.g. one batch deck) sharing this one's outputs."""
+        reporter = ProgressReporter(self.callback, self.stream, {**self.context, **context}, self._clock)
+        # Sub-runs may report concurrently into the same stream
+        reporter._write_lock = self._write_lock
+        return reporter
+
+    def close(self):
+        if self.stream and self.stream not in (sys.stderr, sys.stdout):
+            self.stream.close()
+
+    # --- bookkeeping ------------------------------------------------------
+
+    def fraction(self):
+        """Overall completion in [0, 1] over the planned stages."""
+        plan = self._plan or list(self._totals)
+        total_weight = sum(STAGE_WEIGHTS.get(s, 1) for s in plan) or 1
+        done = 0.0
+        for stage in plan:
+            total = self._totals.get(stage)
+            if not total:
+                continue
+            done += STAGE_WEIGHTS.get(stage, 1) * min(1.0, self._done.get(stage, 0) / total)
+        return done / total_weight
+
+    def _emit(self, event, **fields):
+        with self._lock:
+            fraction = self.fraction()
+            elapsed = self._clock() - self._start
+            payload = {"event": event, **self.context, **fields, "percent": round(fraction * 100, 1),
+                       "elapsed": round(elapsed, 2)}
+            if event == "done":
+                payload["percent"] = 100.0
+            elif fraction >= ETA_MIN_FRACTION:
+                payload["eta"] = round(elapsed * (1 - fraction) / fraction, 1)
+            if self.stream:
+                with self._write_lock:
+                    self.stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                    self.stream.flush()
+        if self.callback:
+            self.callback(payload)
+        return payload
+
+    # --- events -----------------------------------------------------------
+
+    def plan(self, stages):
+        """Declare the stages this run will go through (for the overall percentage)."""
+        with self._lock:
+            self._plan = list(stages)
+        self._emit("start", stages=list(stages))
+
+    def stage_start(self, stage, total=1):
+        with self._lock:
+            self._totals[stage] = max(1, total or 1)
+            self._done[stage] = 0
+        self._emit("stage_start", stage=stage, total=self._totals[stage])
+
+    def set_total(self, stage, total):
+        """Set the unit count of a stage once it is known (e.g. pages after rasterizing)."""
+        with self._lock:
+            self._totals[stage] = max(1, total)
+
+    def advance(self, stage, slide=None, message="", units=1):
+        """`units` more units of `stage` are finished."""
+        with self._lock:
+            self._done[stage] = self._done.get(stage, 0) + units
+            done, total = self._done[stage], self._totals.get(stage, 1)
+        fields = {"stage": stage, "done": done, "total": total}
+        if slide is not None:
+            fields["slide"] = slide
+        if message:
+            fields["message"] = message
+        self._emit("progress", **fields)
+
+    def stage_end(self, stage):
+        with self._lock:
+            self._done[stage] = self._totals.setdefault(stage, 1)
+        self._emit("stage_end", stage=stage)
+
+    def error(self, message, stage=None, slide=None):
+        fields = {"message": message}
+        if stage:
+            fields["stage"] = stage
+        if slide is not None:
+            fields["slide"] = slide
+        self._emit("error", **fields)
+
+    def done(self, output):
+        self._emit("done", output=str(output))
+
+    def failed(self, stage=None):
+        self._emit("failed", stage=stage)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Sharded rendering: split one deck into page ranges rendered by separate
+workers, then merge their segments into the final MP4.
+
+Each worker renders its range and writes a self-describing shard directory
+(`pptx_to_video.py --pages A-B --shard DIR`):
+
+    DIR/slide-0001.mp4 ...   one segment per page
+    DIR/shard.json           source hash, page count, encoder and raster
+                             settings, language and script hash, and per
+                             segment: page, file, duration, size and sha256
+
+shard.json is written last, so a shard found in a shared directory without it
+is still being rendered. `merge` checks that the shards come from the same
+source with the same settings, language and narration script and together
+cover every page exactly once,
+then concatenates all segments by stream copy:
+
+    python shards.py merge shards/* --output output/output.mp4
+
+`local` is a single-machine stand-in for a cluster: it prepares the PDF once,
+renders N page ranges as parallel pptx_to_video.py processes and merges them:
+
+    python shards.py local input/presentation.pptx --shards 4 -- --tts-engine espeak
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from audio_cache import link_or_copy
+from build_manifest import sha256_file
+from errors import InputError, PipelineError, ShardError
+from profiling import Profiler
+
+SHARD_MANIFEST = "shard.json"
+SHARD_VERSION = 1
+# shard.json fields that every shard of one render must agree on
+COMPATIBLE_FIELDS = ("source", "page_count", "encoder", "settings")
+
+
+def segment_name(page):
+    # Four digits regardless of the deck's length, so shards agree on names
+    return f"slide-{page:04d}.mp4"
+
+
+def write_shard(shard_dir, info, segments):
+    """
+    Write a shard: `segments` are (page, video_path, duration) tuples, `info`
+    holds the COMPATIBLE_FIELDS. Videos are hard-linked when possible.
+    Returns the path of shard.json.
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = shard_dir / SHARD_MANIFEST
+    if manifest_path.exists():
+        # Readers must never see a manifest next to half-replaced segments
+        manifest_path.unlink()
+    entries = []
+    for page, video_path, duration in segments:
+        dest = link_or_copy(video_path, shard_dir / segment_name(page))
+        entries.append({"page": page, "file": dest.name, "duration": round(duration, 3),
+                        "size": dest.stat().st_size, "sha256": sha256_file(dest)})
+    data = {"version": SHARD_VERSION, **{key: info.get(key) for key in COMPATIBLE_FIELDS},
+            "pages": [e["page"] for e in entries], "segments": entries, "created": time.time()}
+    tmp = manifest_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, manifest_path)
+    return manifest_path
+
+
+def load_shard(shard_dir):
+    manifest_path = Path(shard_dir) / SHARD_MANIFEST
+    if not manifest_path.exists():
+        raise ShardError(f"{shard_dir}: no {SHARD_MANIFEST} (shard missing or still rendering)")
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise ShardError(f"{manifest_path}: {e}")
+    if data.get("version") != SHARD_VERSION:
+        raise ShardError(f"{manifest_path}: unsupported shard version {data.get('version')!r}")
+    data["dir"] = Path(shard_dir)
+    return data
+
+
+def validate_shards(shards, verify=True):
+    """
+    Check that `shards` (from load_shard) can be merged and return their
+    segments as (page, path) in page order. Raises ShardError listing every problem.
+    """
+    if not shards:
+        raise ShardError("No shards to merge")
+    problems = []
+    first = shards[0]
+    for shard in shards[1:]:
+        for key in COMPATIBLE_FIELDS:
+            if shard.get(key) == first.get(key):
+                continue
+            if key == "settings" and isinstance(shard.get(key), dict) and isinstance(first.get(key), dict):
+                # Name the setting (e.g. language or script) that differs
+                names = sorted(k for k in set(shard[key]) | set(first[key])
+                               if shard[key].get(k) != first[key].get(k))
+                problems.extend(f"{shard['dir']}: {key}.{name} differs from {first['dir']}" for name in names)
+            else:
+                problems.append(f"{shard['dir']}: {key} differs from {first['dir']}")
+
+    owners = {}
+    segments = []
+    for shard in shards:
+        for entry in shard["segments"]:
+            page = entry["page"]
+            if page in owners:
+                problems.append(f"page {page} is in both {owners[page]} and {shard['dir']}")
+                continue
+            owners[page] = shard["dir"]
+            path = shard["dir"] / entry["file"]
+            if not path.exists():
+                problems.append(f"{path}: missing")
+            elif path.stat().st_size != entry["size"]:
+                problems.append(f"{path}: size {path.stat().st_size}, expected {entry['size']}")
+            elif verify and sha256_file(path) != entry["sha256"]:
+                problems.append(f"{path}: checksum mismatch")
+            segments.append((page, path))
+
+    # Without a known page count the shards must at least cover 1..last page
+    page_count = first.get("page_count") or max(owners, default=0)
+    missing = sorted(set(range(1, page_count + 1)) - set(owners))
+    if missing:
+        problems.append(f"pages not rendered by any shard: {format_pages(missing)}")
+    if problems:
+        raise ShardError("Shards cannot be merged:\n  " + "\n  ".join(problems), "merge")
+    return sorted(segments)
+
+
+def format_pages(pages):
+    """[1, 2, 3, 7] -> "1-3,7"."""
+    runs = []
+    for page in pages:
+        if runs and runs[-1][1] == page - 1:
+            runs[-1][1] = page
+        else:
+            runs.append([page, page])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in runs)
+
+
+def merge_shards(shard_dirs, output_path, profiler=None, verify=True):
+    """Validate the shards and concatenate their segments (stream copy) into `output_path`."""
+    profiler = profiler or Profiler()
+    shards = [load_shard(d) for d in shard_dirs]
+    segments = validate_shards(shards, verify)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    concat_file = output_path.with_name(f".{output_path.stem}.shards.txt")
+    with open(concat_file, "w") as f:
+        for _, path in segments:
+            f.write(f"file '{path.absolute()}'\n")
+    cmd = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(concat_file), "-c", "copy",
+           "-y", str(output_path)]
+    try:
+        profiler.run(cmd, "merge")
+    except subprocess.CalledProcessError as e:
+        raise ShardError(f"Failed to merge shards: {e}", "merge")
+    finally:
+        concat_file.unlink()
+    seconds = sum(entry["duration"] for shard in shards for entry in shard["segments"])
+    print(f"✓ Merged {len(shards)} shards, {len(segments)} slides ({seconds:.1f}s): {output_path}")
+    return output_path
+
+
+def split_pages(page_count, shard_count):
+    """Page ranges "A-B" for `shard_count` shards of (almost) equal size."""
+    shard_count = max(1, min(shard_count, page_count))
+    size, extra = divmod(page_count, shard_count)
+    ranges = []
+    first = 1
+    for i in range(shard_count):
+        last = first + size - 1 + (1 if i < extra else 0)
+        ranges.append(f"{first}-{last}")
+        first = last + 1
+    return ranges
+
+
+def render_local(deck, shard_count, workers=None, output="output", temp="temp", script=None,
+                 extra_args=()):
+    """
+    Render `deck` as `shard_count` parallel pptx_to_video.py processes
+    (temp/shards/NN/) and merge them into output/output.mp4.
+    """
+    from pptx_to_video import PPTXToVideoConverter
+    from build_manifest import BuildManifest
+
+    deck = Path(deck)
+    if not deck.exists():
+        raise InputError(f"Input file not found: {deck}")
+    temp = Path(temp)
+    script = Path(script) if script else deck.parent / "script.txt"
+    # Convert once; every shard renders from the same PDF
+    source_dir = temp / "shards" / "source"
+    converter = PPTXToVideoConverter(input_dir=deck.parent, output_dir=output, temp_dir=source_dir)
+    pdf_path = converter.prepare_pdf(deck, BuildManifest(source_dir / "manifest.json"))
+    info = converter.pdf_info(pdf_path)
+    if not info:
+        raise ShardError("pdfinfo is needed to split the deck into page ranges")
+    ranges = split_pages(info[0], shard_count)
+    print(f"{info[0]} pages in {len(ranges)} shards: {', '.join(ranges)}")
+
+    script_path = Path(__file__).parent / "pptx_to_video.py"
+
+    def render(i, pages):
+        work = temp / "shards" / f"{i:02d}"
+        cmd = [sys.executable, str(script_path), "--input", str(pdf_path.parent), "--file", pdf_path.name,
+               "--script", str(script), "--temp", str(work / "temp"), "--output", str(work / "output"),
+               "--pages", pages, "--shard", str(work / "shard")] + list(extra_args)
+        with open(work.with_suffix(".log"), "w", encoding="utf-8") as log:
+            returncode = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT).returncode
+        print(f"   shard {i:02d} (pages {pages}): {'ok' if returncode == 0 else f'exit code {returncode}'}")
+        if returncode:
+            raise ShardError(f"Shard {i:02d} (pages {pages}) failed, see {work.with_suffix('.log')}")
+        return work / "shard"
+
+    with ThreadPoolExecutor(max_workers=workers or len(ranges)) as executor:
+        futures = [executor.submit(render, i, pages) for i, pages in enumerate(ranges, 1)]
+        shard_dirs = [f.result() for f in futures]
+    return merge_shards(shard_dirs, Path(output) / "output.mp4")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge shard renders, or render a deck in local shards",
+                                     epilog="local: pptx_to_video.py options for every shard go after --")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    merge = sub.add_parser("merge", help="Validate shard directories and stream-copy them into one MP4")
+    merge.add_argument("shards", nargs="+", help="Shard directories (each with shard.json)")
+    merge.add_argument("--output", "-o", default="output/output.mp4")
+    merge.add_argument("--no-verify", action="store_true", help="Skip segment checksums (sizes are still checked)")
+
+    local = sub.add_parser("local", help="Render a deck as parallel local shards and merge them")
+    local.add_argument("deck")
+    local.add_argument("--shards", "-n", type=int, default=2)
+    local.add_argument("--workers", type=int, default=None, help="Shards rendered at once (default: all)")
+    local.add_argument("--output", "-o", default="output")
+    local.add_argument("--temp", "-t", default="temp")
+    local.add_argument("--script", default=None, help="Narration script (default: script.txt next to the deck)")
+
+    # Everything after -- is passed through to the shard renders
+    argv = sys.argv[1:]
+    extra = []
+    if "--" in argv:
+        argv, extra = argv[:argv.index("--")], argv[argv.index("--") + 1:]
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "merge":
+            merge_shards(args.shards, args.output, verify=not args.no_verify)
+        else:
+            render_local(args.deck, args.shards, args.workers, args.output, args.temp, args.script, extra)
+    except PipelineError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Streaming (stage-overlapping) pipeline for PPTXToVideoConverter.
+
+Instead of running rasterize -> TTS -> encode as strict phases, slides flow
+through a producer/consumer graph:
+
+    pdftoppm page workers --+
+                            +--> join (image + audio) --> encode queue --> FFmpeg workers
+    TTS workers ------------+
+
+Slide N is encoded as soon as both its image and its audio exist, while TTS is
+still working on later slides. Back-pressure is explicit:
+
+- at most `max_pending` pages may be rasterized but not yet encoded; page
+  workers wait for a free slot before rendering the next page,
+- the encode queue holds at most `max_pending` slides; producers block on it.
+
+With `pipe_images` pages never touch the disk: pdftoppm writes each page as PPM
+to stdout, the bytes are held in memory until the slide is encoded and then
+fed to FFmpeg's stdin, so memory stays at `max_pending` raw frames.
+
+With hls, every finished slide video is appended to the HLS playlist right
+away (hls_output keeps the playlist in slide order).
+
+TTS is not throttled by encoding (clips are small and network-bound); it is
+limited by the TTS scheduler's rate limiter as in the staged pipeline.
+
+Repeated work is shared: a slide whose narration matches an earlier slide
+waits for that slide's clip instead of synthesizing it again, and a slide
+whose image and audio match a segment that is already encoded (or being
+encoded) reuses that video.
+"""
+
+import hashlib
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from audio_cache import link_or_copy
+from build_manifest import sha256_json
+from errors import PipelineError, RasterError, TTSError
+from tts_engine import TTSRequest, format_report
+
+
+@dataclass
+class SlideTiming:
+    """Seconds since pipeline start at which each step of one slide finished."""
+    index: int
+    image: Optional[float] = None
+    audio: Optional[float] = None
+    encode_start: Optional[float] = None
+    done: Optional[float] = None
+
+    @property
+    def ready(self):
+        return max(self.image, self.audio)
+
+
+class StreamingPipeline:
+    """Runs steps 3-5 of PPTXToVideoConverter.process as overlapping stages."""
+
+    # How often blocked workers re-check for an abort
+    POLL_SECONDS = 0.2
+
+    def __init__(self, converter, pdf_path, page_count, page_size, slide_texts,
+                 language, manifest, max_pending=4):
+        self.converter = converter
+        self.pdf_path = pdf_path
+        self.page_count = page_count
+        self.page_size = page_size
+        self.slide_texts = slide_texts
+        self.language = language
+        self.manifest = manifest
+        self.max_pending = max(1, max_pending)
+
+        # pdftoppm pads page numbers to the digit count of the last page
+        digits = len(str(page_count))
+        self.names = [f"slide-{i:0{digits}d}" for i in range(1, page_count + 1)]
+        ext = converter.raster_extension()
+        self.images = [converter.slides_dir / f"{name}.{ext}" for name in self.names]
+        self.audio = [converter.audio_path_for(name) for name in self.names]
+        self.videos = [converter.videos_dir / f"{name}.mp4" for name in self.names]
+        # pipe_images: raw PPM bytes of pages rasterized but not yet encoded
+        self.frames = [None] * page_count
+
+        self.keys = [converter.slide_audio_key(converter.narration_text(i + 1, text), language)
+                     for i, text in enumerate(slide_texts)]
+        # First slide with the same narration (itself if none)
+        self.audio_owner = [self.keys.index(key) for key in self.keys]
+
+        self.timings = [SlideTiming(i) for i in range(1, page_count + 1)]
+        self.tts_results = []
+        self._image_ready = [False] * page_count
+        self._audio_ready = [False] * page_count
+        self._holds_slot = [False] * page_count
+        self._audio_events = [threading.Event() for _ in range(page_count)]
+        # segment hash -> (slide that encodes it, event set once its video exists)
+        self._segments = {}
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(self.max_pending)
+        self._encode_queue = queue.Queue(maxsize=self.max_pending)
+        self._abort = threading.Event()
+        self._done = threading.Condition()
+        self._remaining = page_count
+        self._failure = None
+
+    def now(self):
+        return time.monotonic() - self.start
+
+    # --- failure handling -------------------------------------------------
+
+    def fail(self, report):
+        """
+        Record the first failure and stop every stage. `report` is called once
+        the workers have stopped; it prints any details and returns the
+        errors.PipelineError that run() raises.
+        """
+        with self._lock:
+            if self._failure is None:
+                self._failure = report
+        self._abort.set()
+        self.converter.terminate_encoders()
+        with self._done:
+            self._done.notify_all()
+
+    def _blocking(self, attempt):
+        """Retry a non-blocking `attempt()` until it succeeds or the pipeline aborts."""
+        while not self._abort.is_set():
+            if attempt():
+                return True
+        return False
+
+    # --- producers --------------------------------------------------------
+
+    def raster_page(self, i):
+        """Render one page, waiting for a back-pressure slot first."""
+        if not self._blocking(lambda: self._slots.acquire(timeout=self.POLL_SECONDS)):
+            return
+        self._holds_slot[i] = True
+        c = self.converter
+        cmd = ["pdftoppm", "-f", str(i + 1), "-l", str(i + 1)]
+        if c.pipe_images:
+            # No output root: the page is written to stdout
+            cmd += c.raster_args(self.page_size, "ppm") + [str(self.pdf_path)]
+        else:
+            cmd += c.raster_args(self.page_size) + [str(self.pdf_path), str(c.slides_dir / "slide")]
+        try:
+            result = c.profiler.run(cmd, "pdftoppm", i + 1)
+            if c.pipe_images:
+                if not result.stdout:
+                    raise subprocess.CalledProcessError(1, cmd, stderr=b"no image data on stdout")
+                self.frames[i] = result.stdout
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            self.converter.progress.error(f"Failed to rasterize page {i + 1}: {e}",
+                                          stage="streaming", slide=i + 1)
+            self.fail(lambda e=e: RasterError(f"Failed to rasterize page {i + 1}: {e}", "streaming"))
+            return
+        self.mark_ready(i, "image")
+
+    def audio_task(self, i, scheduler):
+        """Reuse or synthesize the audio of one slide."""
+        if self._abort.is_set():
+            return
+        c = self.converter
+        text = c.narration_text(i + 1, self.slide_texts[i])
+        key = self.keys[i]
+        owner = self.audio_owner[i]
+        if c.reuse_audio(i + 1, self.names[i], key, self.audio[i], self.manifest):
+            pass
+        elif owner != i:
+            # Same narration as an earlier slide: wait for its clip
+            if not self._blocking(lambda: self._audio_events[owner].wait(self.POLL_SECONDS)):
+                return
+            link_or_copy(self.audio[owner], self.audio[i])
+            print(f"   [i] Slide {i + 1}: narasi sama dengan slide {owner + 1}, audio dipakai bersama")
+        else:
+            result = c.run_tts(scheduler, [TTSRequest(i + 1, text, self.language, self.audio[i])])[0]
+            with self._lock:
+                self.tts_results.append(result)
+            if not result.ok:
+                c.progress.error(f"Audio failed after {result.attempts} attempts: {result.error}",
+                                 stage="streaming", slide=result.index)
+                self.fail(lambda: TTSError(f"Audio for slide {result.index} failed after "
+                                           f"{result.attempts} attempts: {result.error}",
+                                           [result], "streaming"))
+                return
+            if c.audio_cache:
+                c.audio_cache.put(key, self.audio[i], c.tts_backend.extension)
+        self.manifest.record(f"audio:{self.names[i]}", {"key": key}, files=[self.audio[i]])
+        self.mark_ready(i, "audio")
+
+    def audio_batch_task(self, scheduler):
+        """Batch backends: reuse what exists, then synthesize every other slide in one batch."""
+        c = self.converter
+        keys = self.keys
+        requests = []
+        copies = []
+        for i in range(self.page_count):
+            text = c.narration_text(i + 1, self.slide_texts[i])
+            key = keys[i]
+            if c.reuse_audio(i + 1, self.names[i], key, self.audio[i], self.manifest):
+                self.manifest.record(f"audio:{self.names[i]}", {"key": key}, files=[self.audio[i]])
+                self.mark_ready(i, "audio")
+            elif self.audio_owner[i] != i:
+                copies.append(i)
+            else:
+                requests.append(TTSRequest(i + 1, text, self.language, self.audio[i]))
+        if self._abort.is_set():
+            return
+        results = c.run_tts(scheduler, requests) if requests else []
+        self.tts_results.extend(results)
+        for result in results:
+            i = result.index - 1
+            if not result.ok:
+                c.progress.error(f"Audio failed after {result.attempts} attempts: {result.error}",
+                                 stage="streaming", slide=result.index)
+                self.fail(lambda result=result: TTSError(
+                    f"Audio for slide {result.index} failed after "
+                    f"{result.attempts} attempts: {result.error}", [result], "streaming"))
+                return
+            if c.audio_cache:
+                c.audio_cache.put(keys[i], self.audio[i], c.tts_backend.extension)
+            self.manifest.record(f"audio:{self.names[i]}", {"key": keys[i]}, files=[self.audio[i]])
+            self.mark_ready(i, "audio")
+        for i in copies:
+            owner = self.audio_owner[i]
+            # The owner's clip is either reused or freshly synthesized by now
+            link_or_copy(self.audio[owner], self.audio[i])
+            self.manifest.record(f"audio:{self.names[i]}", {"key": keys[i]}, files=[self.audio[i]])
+            self.mark_ready(i, "audio")
+
+    def mark_ready(self, i, kind):
+        """Join point: once a slide has both image and audio, queue it for encoding."""
+        with self._lock:
+            if kind == "image":
+                self._image_ready[i] = True
+                self.timings[i].image = self.now()
+            else:
+                self._audio_ready[i] = True
+                self._audio_events[i].set()
+                self.timings[i].audio = self.now()
+            ready = self._image_ready[i] and self._audio_ready[i]
+        self.converter.progress.advance("streaming", slide=i + 1, message=kind)
+        if ready:
+            # Blocks the producing worker while the encode queue is full
+            self._blocking(lambda: self._put(i))
+
+    def _put(self, i):
+        try:
+            self._encode_queue.put(i, timeout=self.POLL_SECONDS)
+            return True
+        except queue.Full:
+            return False
+
+    # --- consumer ---------------------------------------------------------
+
+    def encode_worker(self, threads, encoder):
+        c = self.converter
+        while not self._abort.is_set():
+            try:
+                i = self._encode_queue.get(timeout=self.POLL_SECONDS)
+            except queue.Empty:
+                with self._done:
+                    if self._remaining == 0:
+                        return
+                continue
+            self.timings[i].encode_start = self.now()
+            frame = self.frames[i]
+            image_hash = hashlib.sha256(frame).hexdigest() if frame is not None else None
+            inputs = c.segment_inputs(self.images[i], self.audio[i], self.manifest, encoder, image_hash)
+            stage = f"segment:{self.names[i]}"
+            with self._lock:
+                owner, encoded = self._segments.setdefault(sha256_json(inputs), (i, threading.Event()))
+            if owner != i:
+                # Same image and audio as an earlier slide: share its video
+                if not self._blocking(lambda: encoded.wait(self.POLL_SECONDS)):
+                    return
+                self.videos[i] = self.videos[owner]
+            elif not self.manifest.is_current(stage, inputs):
+                image = "-" if frame is not None else self.images[i]
+                cmd = c.build_encode_command(image, self.audio[i], self.videos[i], threads)
+                try:
+                    c.run_encoder(cmd, i + 1, input=frame)
+                except subprocess.CalledProcessError as e:
+                    name = self.names[i]
+                    self.fail(lambda e=e: c.report_encoder_failure(name, e, cmd, "streaming"))
+                    return
+            encoded.set()
+            self.frames[i] = frame = None
+            if owner != i:
+                stage = f"shared:{self.names[i]}"
+            self.manifest.record(stage, inputs, files=[self.videos[i]])
+            try:
+                c.publish_segment(i, self.videos[i], self.names[i])
+            except PipelineError as e:
+                self.fail(lambda e=e: e)
+                return
+            self.timings[i].done = self.now()
+            if self._holds_slot[i]:
+                self._slots.release()
+            print(f"   Slide {i + 1}: video siap ({self.timings[i].done:.1f}s)")
+            c.progress.advance("streaming", slide=i + 1, message="video")
+            with self._done:
+                self._remaining -= 1
+                self._done.notify_all()
+
+    # --- driver -----------------------------------------------------------
+
+    def run(self):
+        """Run all stages; returns the slide videos in order, raises on the first failure."""
+        c = self.converter
+        m = self.manifest
+        self.start = time.monotonic()
+
+        raster_inputs = c.raster_inputs(self.pdf_path, m)
+        reuse_images = (not c.pipe_images and m.is_current("raster", raster_inputs)
+                        and all(p.exists() for p in self.images))
+        if reuse_images:
+            print(f"   PDF unchanged, reusing {self.page_count} existing page images")
+        else:
+            c.clear_slide_images()
+            if c.pipe_images:
+                m.forget("raster")
+
+        m.forget("shared:")
+        jobs, threads = c.resolve_jobs(self.page_count)
+        encoder = c.encoder_signature()
+        raster_jobs = len(c.page_ranges(self.page_count))
+        print(f"   {raster_jobs} raster workers, {c.tts_workers} TTS workers, "
+              f"{jobs} encoders, max {self.max_pending} slides pending")
+
+        scheduler = c.make_tts_scheduler()
+
+        encoders = [threading.Thread(target=self.encode_worker, args=(threads, encoder), daemon=True)
+                    for _ in range(jobs)]
+        for t in encoders:
+            t.start()
+        raster_pool = ThreadPoolExecutor(max_workers=raster_jobs)
+        tts_pool = ThreadPoolExecutor(max_workers=c.tts_workers)
+        tasks = []
+        try:
+            if c.tts_backend.supports_batch:
+                tasks.append(tts_pool.submit(self.audio_batch_task, scheduler))
+            else:
+                for i in range(self.page_count):
+                    tasks.append(tts_pool.submit(self.audio_task, i, scheduler))
+            for i in range(self.page_count):
+                if reuse_images:
+                    tasks.append(raster_pool.submit(self.mark_ready, i, "image"))
+                else:
+                    tasks.append(raster_pool.submit(self.raster_page, i))
+            with self._done:
+                while self._remaining and not self._abort.is_set():
+                    self._done.wait(self.POLL_SECONDS)
+        finally:
+            # Drop queued pages on abort (shutdown(cancel_futures=) needs Python 3.9)
+            for task in tasks:
+                task.cancel()
+            raster_pool.shutdown(wait=True)
+            tts_pool.shutdown(wait=True)
+            for t in encoders:
+                t.join()
+
+        if self.tts_results:
+            for line in format_report(sorted(self.tts_results, key=lambda r: r.index)):
+                print(line)
+        if self._failure:
+            raise self._failure()
+
+        if not reuse_images and not c.pipe_images:
+            m.record("raster", raster_inputs, outputs={"pages": [str(p) for p in self.images]},
+                     files=self.images)
+        if c.audio_cache:
+            c.audio_cache.evict()
+        self.print_latency()
+        return self.videos
+
+    def print_latency(self):
+        """Per-slide timeline: when inputs were ready, time waiting for an encoder, finish time."""
+        print("   Latency per slide (detik sejak mulai):")
+        for t in self.timings:
+            print(f"    - Slide {t.index}: gambar {t.image:.1f}s, audio {t.audio:.1f}s, "
+                  f"antri encoder {t.encode_start - t.ready:.1f}s, "
+                  f"encode {t.done - t.encode_start:.1f}s, selesai {t.done:.1f}s")
+        total = max(t.done for t in self.timings)
+        print(f"    Total streaming: {total:.1f}s untuk {len(self.timings)} slide")
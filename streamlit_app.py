@@ -1,10 +1,15 @@
 import os
 import shutil
-import subprocess
+import time
+from datetime import datetime
 from pathlib import Path
 
 import streamlit as st
-import sys
+import streamlit.components.v1 as components
+
+from hls_server import serve_in_background
+from pptx_to_video import parse_pages, slide_videos
+from job_queue import CANCELLED, DONE, FAILED, FINISHED, QUEUED, RUNNING, JobQueue
 
 # Use wide layout to reduce side margins
 st.set_page_config(page_title="ppt-auto-vo", layout="wide")
@@ -14,6 +19,25 @@ ROOT = Path(__file__).parent
 INPUT_DIR = ROOT / "input"
 OUTPUT_DIR = ROOT / "output"
 TEMP_DIR = ROOT / "temp"
+JOBS_DIR = ROOT / "jobs"
+# Renders running at the same time (shared by every user of this app instance)
+JOB_WORKERS = int(os.environ.get("PPTVO_JOB_WORKERS", "2"))
+# Finished jobs kept in the history (older workspaces are deleted)
+JOB_HISTORY = int(os.environ.get("PPTVO_JOB_HISTORY", "50"))
+# "thread": run jobs in this process via api.convert(); "process": one pptx_to_video.py
+# subprocess per job (isolated, full pipeline log in the UI)
+JOB_ISOLATION = os.environ.get("PPTVO_JOB_ISOLATION", "thread")
+# Log lines shown in the UI (the full log stays in jobs/<id>/log.txt)
+LOG_VIEW_LINES = 200
+# Job status polling interval while renders are active
+REFRESH_SECONDS = 2
+# Draft jobs: slide videos shown side by side
+PREVIEW_COLUMNS = 3
+# Preview server for the jobs' HLS output (--hls); PPTVO_HLS_URL is how browsers reach it
+HLS_HOST = os.environ.get("PPTVO_HLS_HOST", "127.0.0.1")
+HLS_PORT = int(os.environ.get("PPTVO_HLS_PORT", "8765"))
+HLS_URL = os.environ.get("PPTVO_HLS_URL", f"http://localhost:{HLS_PORT}")
+STATUS_ICONS = {QUEUED: "⏳", RUNNING: "▶️", DONE: "✅", FAILED: "❌", CANCELLED: "⛔"}
 
 
 def ensure_dirs():
@@ -32,16 +56,126 @@ def save_uploaded(uploaded_file):
     return dest.name
 
 
-def run_pipeline(filename: str, language: str, clean: bool):
-    cmd = [sys.executable, "-u", str(ROOT / "pptx_to_video.py"), "--file", filename, "--output", "output", "--language", language]
-    if clean:
-        cmd.append("--clean")
+def pipeline_args(tts_engine: str = "gtts", tts_voice: str = "", hls: bool = False,
+                  draft: bool = False, pages: str = ""):
+    args = ["--tts-engine", tts_engine]
+    if tts_voice:
+        args += ["--tts-voice", tts_voice]
+    if hls:
+        args.append("--hls")
+    if draft:
+        args.append("--draft")
+    if pages:
+        args += ["--pages", pages]
+    return args
+
+
+@st.cache_resource
+def get_job_queue():
+    """One queue per app process, shared by all sessions."""
+    return JobQueue(JOBS_DIR, workers=JOB_WORKERS, script=ROOT / "pptx_to_video.py",
+                    in_process=JOB_ISOLATION != "process")
+
+
+@st.cache_resource
+def get_hls_server():
+    """Serves the jobs' hls/ directories for the preview player; None if the port is already taken."""
+    try:
+        return serve_in_background(JOBS_DIR, HLS_HOST, HLS_PORT, hls_only=True)
+    except OSError:
+        return None
+
+
+def rerun():
+    (getattr(st, "rerun", None) or st.experimental_rerun)()
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def render_job(job_queue, job):
+    """Status, progress, log and result of one job."""
+    icon = STATUS_ICONS.get(job.status, "")
+    st.markdown(f"**{icon} {job.filename}** — job `{job.id}` — {job.status}")
+    if job.status == QUEUED:
+        st.info(f"Menunggu di antrian (posisi {job_queue.position(job.id)}).")
+    elif job.status == RUNNING:
+        st.progress(int(job.progress * 100))
+        eta = f" · sisa ~{format_seconds(job.eta)}" if job.eta is not None else ""
+        st.caption(f"{job.percent:.0f}% · {job.message} · {format_seconds(job.elapsed)}{eta}")
+
+    if job.status not in FINISHED:
+        if st.button("Cancel job", key=f"cancel_{job.id}"):
+            job_queue.cancel(job.id)
+            rerun()
+
+    with st.expander("Log", expanded=job.status in (RUNNING, FAILED)):
+        st.code("\n".join(job_queue.log(job.id)[-LOG_VIEW_LINES:]) or "(belum ada output)")
+
+    playlist = job.output_dir / "hls" / "index.m3u8"
+    if job.status == RUNNING and playlist.exists() and get_hls_server():
+        # Finished slides play while the rest of the deck is still rendering
+        # (path on the preview server, which serves the hls/ folders below jobs/)
+        served = f"{job.id}/{playlist.relative_to(job.workspace).as_posix()}"
+        st.caption("Preview: slide yang sudah selesai bisa langsung diputar.")
+        components.iframe(f"{HLS_URL}/player.html?src={served}", height=420)
 
-    # Run process and capture output (non-streaming fallback)
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    out = proc.stdout or ""
-    err = proc.stderr or ""
-    return proc.returncode, out, err
+    if job.status == DONE and job.output.exists():
+        st.success(f"Selesai dalam {format_seconds(job.elapsed)}.")
+        st.video(str(job.output))
+        with open(job.output, "rb") as f:
+            st.download_button(label="Download final video", data=f,
+                               file_name=f"{Path(job.filename).stem}.mp4", key=f"download_{job.id}")
+    elif job.status == FAILED:
+        st.error(f"Pipeline gagal: {job.message}")
+
+    if job.status == DONE and job.draft:
+        render_slide_previews(job)
+
+
+def render_slide_previews(job):
+    """Draft jobs: every rendered slide on its own, to check the narration slide by slide."""
+    videos = slide_videos(job.temp_dir)
+    if not videos:
+        return
+    st.markdown("**Preview per slide**")
+    columns = st.columns(PREVIEW_COLUMNS)
+    for i, (page, video) in enumerate(videos):
+        with columns[i % PREVIEW_COLUMNS]:
+            st.caption(f"Slide {page}")
+            st.video(str(video))
+
+
+def render_jobs(job_queue):
+    """Job list (this session, or everyone's history) and the selected job's details."""
+    st.subheader("Jobs")
+    show_all = st.checkbox("Show all jobs (history)", value=False)
+    mine = st.session_state.get("my_jobs", [])
+    jobs = job_queue.jobs()
+    if not show_all:
+        jobs = [j for j in jobs if j.id in mine]
+    if not jobs:
+        st.info("Belum ada job. Klik Run Pipeline untuk memulai.")
+        return []
+
+    st.table([{
+        "job": j.id,
+        "file": j.filename,
+        "status": f"{STATUS_ICONS.get(j.status, '')} {j.status}",
+        "progress": f"{int(j.progress * 100)}%",
+        "waktu": format_seconds(j.elapsed),
+        "dibuat": datetime.fromtimestamp(j.created).strftime("%Y-%m-%d %H:%M"),
+    } for j in jobs])
+
+    ids = [j.id for j in jobs]
+    default = ids.index(st.session_state["selected_job"]) if st.session_state.get("selected_job") in ids else 0
+    selected = st.selectbox("Job details", ids, index=default,
+                            format_func=lambda i: f"{i} — {job_queue.get(i).filename}")
+    st.session_state["selected_job"] = selected
+    render_job(job_queue, job_queue.get(selected))
+    return jobs
 
 
 def main():
@@ -76,55 +210,41 @@ def main():
     selected = st.selectbox("Choose input file", files)
 
     language = st.text_input("TTS language code (e.g. en, id)", value="id")
-    clean = st.checkbox("Clean temp before run", value=True)
+    tts_engine = st.selectbox("TTS engine", ["gtts", "espeak", "piper"],
+                              help="gtts = Google TTS (online). espeak / piper run offline on this machine.")
+    tts_voice = ""
+    if tts_engine != "gtts":
+        tts_voice = st.text_input("TTS voice (espeak voice name or path to piper .onnx model)", value="")
 
-    # Run pipeline button (main area)
+    hls = st.checkbox("Preview while rendering (HLS)", value=True,
+                      help="Slides can be played as soon as they are encoded; the MP4 is still written at the end.")
+
+    draft = st.checkbox("Draft preview (fast, low resolution)", value=False,
+                        help="640x360 and the fastest encoder settings; unchanged narration comes from the "
+                             "audio cache. Use it to check script edits, then run the final render once.")
+    pages = st.text_input("Slides to render (e.g. 1,3,5-7; empty = all)", value="")
+
+    job_queue = get_job_queue()
+
+    # Run pipeline button (main area): the render runs in its own workspace on a background worker
+    pages_error = None
+    if pages.strip():
+        try:
+            parse_pages(pages)
+        except ValueError as e:
+            pages_error = f"Slides: {e}"
     if st.button("Run Pipeline", key="run_pipeline_btn"):
-        st.info(f"Running pipeline on {selected} (lang={language})")
-        log_box = st.empty()
-        progress = st.empty()
-        with st.spinner("Processing... this may take a while"):
-            # Stream subprocess output live
-            cmd = [sys.executable, "-u", str(ROOT / "pptx_to_video.py"), "--file", selected, "--output", "output", "--language", language]
-            if clean:
-                cmd.append("--clean")
-
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-            lines = []
-            try:
-                for raw in proc.stdout:
-                    line = raw.rstrip()
-                    lines.append(line)
-                    # Keep last N lines to avoid huge UI
-                    last = "\n".join(lines[-1000:])
-                    log_box.code(last)
-            except Exception as e:
-                lines.append(f"[streaming error] {e}")
-                log_box.code("\n".join(lines[-1000:]))
-            proc.wait()
-            code = proc.returncode
-            out = "\n".join(lines)
-            err = ""
-
-        st.subheader("Process Output")
-        if out:
-            st.code(out)
-        if err:
-            st.error("Errors:")
-            st.code(err)
-
-        if code == 0:
-            st.success("Pipeline finished successfully.")
+        if pages_error:
+            st.error(pages_error)
         else:
-            st.error(f"Pipeline exited with code {code}")
+            job = job_queue.submit(INPUT_DIR / selected, language, script_path=INPUT_DIR / "script.txt",
+                                   args=pipeline_args(tts_engine, tts_voice, hls, draft, pages.strip()))
+            job_queue.prune(keep=JOB_HISTORY)
+            st.session_state.setdefault("my_jobs", []).append(job.id)
+            st.session_state["selected_job"] = job.id
+            st.success(f"Job {job.id} ditambahkan ke antrian ({selected}, lang={language})")
 
-        final_video = OUTPUT_DIR / "output.mp4"
-        if final_video.exists():
-            st.video(str(final_video))
-            with open(final_video, "rb") as f:
-                btn = st.download_button(label="Download final video", data=f, file_name=final_video.name)
-        else:
-            st.info("Final video not found in `output/output.mp4`. Check logs above.")
+    jobs = render_jobs(job_queue)
 
     # --- Script input UI (adaptive, centered) ---
     st.subheader("Voiceover Script (optional)")
@@ -162,5 +282,11 @@ def main():
         except Exception as e:
             st.error(f"Failed to save script: {e}")
 
+    # Poll while any listed job is still queued or running
+    if any(j.status in (QUEUED, RUNNING) for j in jobs):
+        if st.checkbox("Auto-refresh job status", value=True, key="auto_refresh"):
+            time.sleep(REFRESH_SECONDS)
+            rerun()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,37 @@
+"""HLS playlist written while slides are added."""
+
+from hls_output import HLSWriter
+
+
+class FakeSegmenter:
+    """Stands in for the FFmpeg segment muxer: two pieces per slide."""
+
+    def run(self, cmd, label, slide=None, **kwargs):
+        pattern, segment_list = cmd[-1], cmd[cmd.index("-segment_list") + 1]
+        rows = []
+        for n, (start, end) in enumerate([(0.0, 6.0), (6.0, 7.5)]):
+            name = pattern.replace("%03d", f"{n:03d}")
+            open(name, "wb").close()
+            rows.append(f"{name.rsplit('/', 1)[-1]},{start},{end}")
+        with open(segment_list, "w", encoding="utf-8") as f:
+            f.write("\n".join(rows) + "\n")
+
+
+def extinf(writer):
+    return [line for line in writer.playlist.read_text().splitlines() if line.startswith("#EXTINF")]
+
+
+def test_titles_use_the_page_number(tmp_path):
+    writer = HLSWriter(tmp_path / "hls", profiler=FakeSegmenter())
+    writer.add(1, tmp_path / "slide-07.mp4", page=7)
+    assert extinf(writer) == []
+    writer.add(0, tmp_path / "slide-03.mp4", page=3)
+    writer.finish()
+    assert extinf(writer) == ["#EXTINF:6.000,Slide 3", "#EXTINF:1.500,Slide 3",
+                              "#EXTINF:6.000,Slide 7", "#EXTINF:1.500,Slide 7"]
+
+
+def test_titles_default_to_the_position(tmp_path):
+    writer = HLSWriter(tmp_path / "hls", profiler=FakeSegmenter())
+    writer.add(0, tmp_path / "slide-1.mp4")
+    assert extinf(writer) == ["#EXTINF:6.000,Slide 1", "#EXTINF:1.500,Slide 1"]
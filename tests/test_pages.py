@@ -0,0 +1,59 @@
+"""--pages parsing and the page runs rendered for it."""
+
+from pathlib import Path
+
+import pytest
+
+from pptx_to_video import PPTXToVideoConverter, parse_pages
+
+
+@pytest.mark.parametrize("spec, pages", [
+    ("3", [3]),
+    ("1,3,5-7", [1, 3, 5, 6, 7]),
+    (" 2 , 4-5 ", [2, 4, 5]),
+    ("1,1,2-3,3", [1, 2, 3]),
+    ("7-9,1-2", [1, 2, 7, 8, 9]),
+    ("4-4", [4]),
+    ("1,,2,", [1, 2]),
+])
+def test_parse_pages(spec, pages):
+    assert parse_pages(spec) == pages
+
+
+@pytest.mark.parametrize("spec", ["5-3", "0", "0-2", "", " , ", "abc", "1-x", "-3", "2-", "1.5", "1;2"])
+def test_parse_pages_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_pages(spec)
+
+
+def test_selected_ranges_are_clipped_to_page_count(tmp_path):
+    converter = PPTXToVideoConverter(tmp_path, tmp_path / "output", tmp_path / "temp",
+                                     tts_backend=object(), pages=parse_pages("1-3,5,9-12"))
+    assert converter.selected_ranges() == [(1, 3), (5, 5), (9, 12)]
+    assert converter.selected_ranges(10) == [(1, 3), (5, 5), (9, 10)]
+    assert converter.selected_ranges(2) == [(1, 2)]
+
+
+def rendered(pages):
+    return [Path(f"slide-{page:02d}.png") for page in pages]
+
+
+@pytest.mark.parametrize("script", [
+    ["one", "two", "three", "four"],
+    ["one", "two", "three"],
+    ["one", "two", "three", "four", "five", "six"],
+    [],
+])
+def test_page_selection_narrates_like_full_render(tmp_path, script):
+    full = PPTXToVideoConverter(tmp_path, tmp_path / "output", tmp_path / "temp", tts_backend=object())
+    expected = full.slide_texts_for(list(script), rendered(range(1, 5)), 4)
+    selected = PPTXToVideoConverter(tmp_path, tmp_path / "output", tmp_path / "temp",
+                                    tts_backend=object(), pages=[2, 4])
+    assert selected.slide_texts_for(list(script), rendered([2, 4]), 4) == [expected[1], expected[3]]
+
+
+def test_mismatched_script_uses_default_narration_for_selection(tmp_path):
+    converter = PPTXToVideoConverter(tmp_path, tmp_path / "output", tmp_path / "temp",
+                                     tts_backend=object(), pages=[2, 3])
+    texts = converter.slide_texts_for(["one", "two", "three"], rendered([2, 3]), 4)
+    assert texts == ["Slide 2", "Slide 3"]
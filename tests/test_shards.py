@@ -0,0 +1,130 @@
+"""Shard manifests and the checks made before merging them."""
+
+from pathlib import Path
+
+import pytest
+
+from errors import ShardError
+from shards import (
+    SHARD_MANIFEST, format_pages, load_shard, segment_name, split_pages, validate_shards, write_shard,
+)
+
+INFO = {
+    "source": "deck-sha256",
+    "page_count": 6,
+    "encoder": "encoder-sha256",
+    "settings": {"encode": {"fps": 5}, "raster": {"format": "png"}, "audio_bitrate": None,
+                 "tts_engine": "gtts:id", "language": "id", "script": "script-sha256"},
+}
+
+
+def make_shard(tmp_path, name, pages, info=INFO):
+    videos = tmp_path / f"{name}-videos"
+    videos.mkdir()
+    segments = []
+    for page in pages:
+        video = videos / f"slide-{page}.mp4"
+        video.write_bytes(f"video of page {page}".encode())
+        segments.append((page, video, 1.5))
+    write_shard(tmp_path / name, info, segments)
+    return load_shard(tmp_path / name)
+
+
+def with_settings(**changes):
+    return {**INFO, "settings": {**INFO["settings"], **changes}}
+
+
+def test_write_and_load_shard(tmp_path):
+    shard = make_shard(tmp_path, "a", [1, 2])
+    assert shard["pages"] == [1, 2]
+    assert [s["file"] for s in shard["segments"]] == [segment_name(1), segment_name(2)]
+    assert (tmp_path / "a" / SHARD_MANIFEST).exists()
+    assert not list((tmp_path / "a").glob("*.tmp"))
+
+
+def test_validate_returns_segments_in_page_order(tmp_path):
+    shards = [make_shard(tmp_path, "b", [4, 5, 6]), make_shard(tmp_path, "a", [1, 2, 3])]
+    segments = validate_shards(shards)
+    assert [page for page, _ in segments] == [1, 2, 3, 4, 5, 6]
+    assert segments[0][1] == tmp_path / "a" / segment_name(1)
+
+
+@pytest.mark.parametrize("info, problem", [
+    ({**INFO, "source": "other-deck"}, "source differs"),
+    ({**INFO, "page_count": 7}, "page_count differs"),
+    ({**INFO, "encoder": "other-encoder"}, "encoder differs"),
+    (with_settings(language="en"), "settings.language differs"),
+    (with_settings(script="edited-script"), "settings.script differs"),
+    (with_settings(encode={"fps": 25}), "settings.encode differs"),
+])
+def test_validate_rejects_mismatched_shards(tmp_path, info, problem):
+    shards = [make_shard(tmp_path, "a", [1, 2, 3]), make_shard(tmp_path, "b", [4, 5, 6], info)]
+    with pytest.raises(ShardError, match=problem):
+        validate_shards(shards)
+
+
+def test_validate_rejects_overlapping_shards(tmp_path):
+    shards = [make_shard(tmp_path, "a", [1, 2, 3, 4]), make_shard(tmp_path, "b", [4, 5, 6])]
+    with pytest.raises(ShardError, match="page 4 is in both"):
+        validate_shards(shards)
+
+
+def test_validate_rejects_missing_pages(tmp_path):
+    shards = [make_shard(tmp_path, "a", [1, 2]), make_shard(tmp_path, "c", [6])]
+    with pytest.raises(ShardError, match="pages not rendered by any shard: 3-5"):
+        validate_shards(shards)
+
+
+def test_validate_rejects_damaged_segments(tmp_path):
+    shards = [make_shard(tmp_path, "a", [1, 2, 3]), make_shard(tmp_path, "b", [4, 5, 6])]
+    (tmp_path / "a" / segment_name(1)).unlink()
+    with open(tmp_path / "a" / segment_name(2), "ab") as f:
+        f.write(b"!")
+    (tmp_path / "b" / segment_name(4)).write_bytes(b"video of page X")
+    with pytest.raises(ShardError) as error:
+        validate_shards(shards)
+    message = str(error.value)
+    assert f"{segment_name(1)}: missing" in message
+    assert f"{segment_name(2)}: size" in message
+    assert f"{segment_name(4)}: checksum mismatch" in message
+
+
+def test_validate_without_verify_skips_checksums(tmp_path):
+    shards = [make_shard(tmp_path, "a", [1, 2, 3, 4, 5, 6])]
+    (tmp_path / "a" / segment_name(4)).write_bytes(b"video of page X")
+    assert len(validate_shards(shards, verify=False)) == 6
+
+
+def test_load_shard_without_manifest_is_incomplete(tmp_path):
+    (tmp_path / "rendering").mkdir()
+    with pytest.raises(ShardError, match="still rendering"):
+        load_shard(tmp_path / "rendering")
+
+
+def test_validate_needs_shards():
+    with pytest.raises(ShardError):
+        validate_shards([])
+
+
+def test_split_and_format_pages():
+    assert split_pages(7, 3) == ["1-3", "4-5", "6-7"]
+    assert split_pages(2, 5) == ["1-1", "2-2"]
+    assert format_pages([1, 2, 3, 7, 9, 10]) == "1-3,7,9-10"
+
+
+@pytest.mark.parametrize("script", [
+    [f"text {page}" for page in range(1, 8)],
+    [f"text {page}" for page in range(1, 6)],
+    [f"text {page}" for page in range(1, 10)],
+])
+def test_shards_narrate_like_a_local_render(tmp_path, script):
+    from pptx_to_video import PPTXToVideoConverter, parse_pages
+
+    def narration(pages=None):
+        converter = PPTXToVideoConverter(tmp_path, tmp_path / "output", tmp_path / "temp",
+                                         tts_backend=object(), pages=pages)
+        numbers = pages or range(1, 8)
+        return converter.slide_texts_for(list(script), [Path(f"slide-{n}.png") for n in numbers], 7)
+
+    merged = [text for pages in split_pages(7, 3) for text in narration(parse_pages(pages))]
+    assert merged == narration()
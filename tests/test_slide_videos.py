@@ -0,0 +1,29 @@
+"""Per-slide videos listed for the draft previews."""
+
+from build_manifest import BuildManifest
+from pptx_to_video import slide_videos
+
+
+def test_repeated_slides_map_to_the_shared_video(tmp_path):
+    videos = tmp_path / "slide_videos"
+    videos.mkdir()
+    for page in (1, 2, 10):
+        (videos / f"slide-{page:02d}.mp4").write_bytes(b"mp4")
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    manifest.record("segment:slide-01", {}, files=[videos / "slide-01.mp4"])
+    manifest.record("segment:slide-02", {}, files=[videos / "slide-02.mp4"])
+    manifest.record("shared:slide-03", {}, files=[videos / "slide-02.mp4"])
+    manifest.record("segment:slide-10", {}, files=[videos / "slide-10.mp4"])
+    manifest.record("raster", {}, files=[])
+    manifest.save()
+
+    assert [(page, video.name) for page, video in slide_videos(tmp_path)] == [
+        (1, "slide-01.mp4"), (2, "slide-02.mp4"), (3, "slide-02.mp4"), (10, "slide-10.mp4")]
+
+
+def test_missing_videos_are_left_out(tmp_path):
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    manifest.record("segment:slide-1", {}, files=[tmp_path / "slide-1.mp4"])
+    manifest.save()
+    assert slide_videos(tmp_path) == []
+    assert slide_videos(tmp_path / "never-rendered") == []
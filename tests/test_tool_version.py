@@ -0,0 +1,26 @@
+"""Tool version probes recorded in the profile."""
+
+import subprocess
+
+import pptx_to_video
+from pptx_to_video import tool_version
+
+
+def test_only_successful_probes_are_cached(monkeypatch):
+    calls = []
+    installed = False
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        if not installed:
+            raise FileNotFoundError(cmd[0])
+        return subprocess.CompletedProcess(cmd, 0, stdout="faketool 1.2\nbuilt today\n", stderr="")
+
+    monkeypatch.setattr(pptx_to_video, "_tool_versions", {})
+    monkeypatch.setattr(pptx_to_video.subprocess, "run", run)
+    assert tool_version("faketool", "-v") is None
+    assert tool_version("faketool", "-v") is None
+    installed = True
+    assert tool_version("faketool", "-v") == "faketool 1.2"
+    assert tool_version("faketool", "-v") == "faketool 1.2"
+    assert len(calls) == 3
@@ -0,0 +1,251 @@
+"""TTSScheduler, TokenBucket and CircuitBreaker with a fake clock (no real waiting)."""
+
+import threading
+import time
+
+import pytest
+
+from tts_engine import (
+    CircuitBreaker, CircuitOpenError, FakeTTSBackend, TTSCancelled, TTSRequest, TTSScheduler,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    """clock() and sleep() for code that takes them as arguments; sleeping advances time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+class FlakyBackend(FakeTTSBackend):
+    """Fails the first `failures` calls, then behaves like FakeTTSBackend."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def synthesize(self, text, language, out_path):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.failures
+        if fail:
+            raise ConnectionError("429 Too Many Requests")
+        return super().synthesize(text, language, out_path)
+
+
+class SlowFirstBackend(FakeTTSBackend):
+    """Earlier requests take longer, so they finish last."""
+
+    def synthesize(self, text, language, out_path):
+        time.sleep(0.01 * (10 - int(text.split()[-1])))
+        return super().synthesize(text, language, out_path)
+
+
+def make_requests(tmp_path, count):
+    return [TTSRequest(i, f"slide {i}", "id", tmp_path / f"slide-{i}.wav") for i in range(1, count + 1)]
+
+
+def make_scheduler(backend, clock, workers=1, max_attempts=5, breaker=None, **kwargs):
+    return TTSScheduler(backend, workers=workers, rate=1000, burst=1000, max_attempts=max_attempts,
+                        breaker=breaker or CircuitBreaker(failure_threshold=100, clock=clock),
+                        sleep=clock.sleep, clock=clock, log=lambda message: None, **kwargs)
+
+
+# --- TokenBucket -----------------------------------------------------------
+
+def test_token_bucket_allows_burst_then_waits_for_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 100
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+# --- CircuitBreaker --------------------------------------------------------
+
+def test_breaker_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.retry_after() == pytest.approx(10)
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_allows_one_trial_and_closes_on_success():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.retry_after() == 0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert 0 < breaker.retry_after() <= CircuitBreaker.TRIAL_POLL
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_breaker_half_open_failure_opens_again():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 15
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+    assert breaker.retry_after() == pytest.approx(10)
+
+
+# --- TTSScheduler ----------------------------------------------------------
+
+def test_scheduler_retries_with_backoff_until_success(tmp_path):
+    clock = FakeClock()
+    scheduler = make_scheduler(FlakyBackend(failures=2), clock, base_delay=1.0, max_delay=30.0)
+    [result] = scheduler.run(make_requests(tmp_path, 1))
+    assert result.ok
+    assert result.attempts == 3
+    assert result.retries == 2
+    assert result.path.exists()
+    # Full jitter: retry n waits in [0, base_delay * 2**(n-1)]
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1.0
+    assert 0 <= clock.sleeps[1] <= 2.0
+
+
+def test_scheduler_gives_up_after_max_attempts(tmp_path):
+    clock = FakeClock()
+    backend = FakeTTSBackend(error_rate=1.0)
+    scheduler = make_scheduler(backend, clock, max_attempts=4)
+    [result] = scheduler.run(make_requests(tmp_path, 1))
+    assert not result.ok
+    assert isinstance(result.error, ConnectionError)
+    assert result.attempts == backend.calls == 4
+    assert len(clock.sleeps) == 3
+    assert not result.path.exists()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_backoff_delay_is_capped():
+    scheduler = make_scheduler(FakeTTSBackend(), FakeClock(), base_delay=1.0, max_delay=5.0)
+    assert all(0 <= scheduler.backoff_delay(10) <= 5.0 for _ in range(50))
+
+
+def test_scheduler_returns_results_in_request_order(tmp_path):
+    clock = FakeClock()
+    finished = []
+    scheduler = make_scheduler(SlowFirstBackend(), clock, workers=4)
+    results = scheduler.run(make_requests(tmp_path, 8), on_result=lambda r: finished.append(r.index))
+    assert [r.index for r in results] == list(range(1, 9))
+    assert all(r.ok and r.attempts == 1 for r in results)
+    assert sorted(finished) == list(range(1, 9))
+    # Requests ran concurrently, so callbacks did not arrive in request order
+    assert finished != list(range(1, 9))
+
+
+def test_open_breaker_waits_for_trial_instead_of_failing(tmp_path):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    scheduler = make_scheduler(FlakyBackend(failures=3), clock, max_attempts=5, breaker=breaker)
+    results = scheduler.run(make_requests(tmp_path, 6))
+    assert all(r.ok for r in results)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.trips == 1
+    assert clock.now >= 30
+
+
+def test_breaker_down_fails_only_after_a_trial(tmp_path):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    backend = FakeTTSBackend(error_rate=1.0)
+    scheduler = make_scheduler(backend, clock, max_attempts=3, breaker=breaker)
+    results = scheduler.run(make_requests(tmp_path, 4))
+    assert not any(r.ok for r in results)
+    # Every request reached the service again after the breaker opened
+    assert all(r.attempts >= 1 for r in results)
+    assert breaker.trips > 1
+    assert backend.calls <= 4 * 3
+
+
+def test_breaker_wait_is_capped_by_deadline(tmp_path):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1000, clock=clock)
+    breaker.record_failure()
+    backend = FakeTTSBackend()
+    scheduler = make_scheduler(backend, clock, breaker=breaker, breaker_wait=60)
+    [result] = scheduler.run(make_requests(tmp_path, 1))
+    assert isinstance(result.error, CircuitOpenError)
+    assert result.attempts == backend.calls == 0
+    assert sum(clock.sleeps) == pytest.approx(60)
+
+
+def test_cancelled_run_skips_remaining_requests(tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    backend = FakeTTSBackend()
+    results = make_scheduler(backend, FakeClock()).run(make_requests(tmp_path, 3), cancel_event=cancel)
+    assert [type(r.error) for r in results] == [TTSCancelled] * 3
+    assert backend.calls == 0
+
+
+def test_cancel_stops_retries(tmp_path):
+    cancel = threading.Event()
+    clock = FakeClock()
+
+    def sleep(seconds):
+        clock.sleep(seconds)
+        cancel.set()
+
+    backend = FakeTTSBackend(error_rate=1.0)
+    scheduler = TTSScheduler(backend, workers=1, rate=1000, burst=1000, max_attempts=5,
+                             breaker=CircuitBreaker(failure_threshold=100, clock=clock),
+                             sleep=sleep, clock=clock, log=lambda message: None)
+    [result] = scheduler.run(make_requests(tmp_path, 1), cancel_event=cancel)
+    assert isinstance(result.error, TTSCancelled)
+    assert result.attempts == backend.calls == 1
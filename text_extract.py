@@ -0,0 +1,164 @@
+"""
+Slide text extraction backends, used when there is no script.txt.
+
+Each extractor turns a PDF into one text per page:
+
+- pdftotext: poppler's pdftotext (installed alongside pdftoppm). Page ranges
+  are extracted by parallel `pdftotext -f/-l` processes; pages come back
+  separated by form feeds.
+- pdfplumber: most accurate layout handling, pure Python, one page at a time.
+- pypdf2: last resort.
+
+`make_text_extractor("auto")` picks the first one that is available, in that
+order. Extractors never exit the process: on failure they return [] and the
+pipeline falls back to default narration.
+"""
+
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from profiling import Profiler
+
+
+def preview(text, width=50):
+    return text[:width].replace("\n", " ") + "..." if len(text) > width else text
+
+
+class TextExtractor:
+    """
+    Base class for text extractors.
+
+    name: short name accepted by --text-extractor and part of the text cache key.
+    """
+
+    name = "base"
+
+    def available(self):
+        return True
+
+    def extract(self, pdf_path, page_ranges=None):
+        """List of stripped texts, one per page. `page_ranges` may split the work."""
+        raise NotImplementedError
+
+
+class PdftotextExtractor(TextExtractor):
+    """poppler pdftotext, one process per page range."""
+
+    name = "pdftotext"
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler or Profiler()
+
+    def available(self):
+        return shutil.which("pdftotext") is not None
+
+    def extract_range(self, pdf_path, first=None, last=None):
+        cmd = ["pdftotext", "-enc", "UTF-8"]
+        if first:
+            cmd += ["-f", str(first), "-l", str(last)]
+        cmd += [str(pdf_path), "-"]
+        label = f"{first}-{last}" if first else None
+        result = self.profiler.run(cmd, "pdftotext", label)
+        # Every page ends with a form feed
+        pages = result.stdout.decode("utf-8", errors="replace").split("\f")
+        if pages and not pages[-1].strip():
+            pages.pop()
+        if first:
+            # Trailing blank pages may lose their separator; keep the page count exact
+            count = last - first + 1
+            pages = (pages + [""] * count)[:count]
+        return [page.strip() for page in pages]
+
+    def extract(self, pdf_path, page_ranges=None):
+        print("   [Metode] Menggunakan pdftotext untuk ekstraksi teks...")
+        ranges = page_ranges or [(None, None)]
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                shards = list(executor.map(lambda r: self.extract_range(pdf_path, *r), ranges))
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            print(f"Error extracting text with pdftotext: {e}")
+            return []
+        texts = [text for shard in shards for text in shard]
+        workers = f" with {len(ranges)} workers" if len(ranges) > 1 else ""
+        print(f"    - {len(texts)} pages extracted{workers}, "
+              f"{sum(1 for t in texts if t)} with text")
+        return texts
+
+
+class PdfplumberExtractor(TextExtractor):
+    name = "pdfplumber"
+
+    def available(self):
+        try:
+            import pdfplumber  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def extract(self, pdf_path, page_ranges=None):
+        import pdfplumber
+        print("   [Metode] Menggunakan pdfplumber untuk ekstraksi teks...")
+        texts = []
+        try:
+            with pdfplumber.open(str(pdf_path)) as pdf:
+                for i, page in enumerate(pdf.pages):
+                    # Bersihkan text dari spasi berlebih
+                    text = (page.extract_text() or "").strip()
+                    print(f"    - Slide {i+1}: {len(text)} karakter ditemukan. ('{preview(text)}')")
+                    texts.append(text)
+        except Exception as e:
+            print(f"Error extracting text: {e}")
+            return []
+        return texts
+
+
+class PyPDF2Extractor(TextExtractor):
+    name = "pypdf2"
+
+    def available(self):
+        try:
+            import PyPDF2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def extract(self, pdf_path, page_ranges=None):
+        from PyPDF2 import PdfReader
+        print("   [Metode] Menggunakan PyPDF2 untuk ekstraksi teks...")
+        texts = []
+        try:
+            reader = PdfReader(str(pdf_path))
+            for i, page in enumerate(reader.pages):
+                text = (page.extract_text() or "").strip()
+                print(f"    - Slide {i+1} (PyPDF2): {len(text)} chars found.")
+                texts.append(text)
+        except Exception as e:
+            print(f"Error extracting text: {e}")
+            return []
+        return texts
+
+
+TEXT_EXTRACTORS = {
+    "pdftotext": PdftotextExtractor,
+    "pdfplumber": PdfplumberExtractor,
+    "pypdf2": PyPDF2Extractor,
+}
+
+
+def make_text_extractor(name="auto", profiler=None):
+    """
+    Create the extractor `name` (see TEXT_EXTRACTORS), or with "auto" the first
+    available one. Returns None if none is available.
+    """
+    if name != "auto" and name not in TEXT_EXTRACTORS:
+        raise ValueError(f"Unknown text extractor {name!r}, choose from auto, {', '.join(TEXT_EXTRACTORS)}")
+    names = list(TEXT_EXTRACTORS) if name == "auto" else [name]
+    for candidate in names:
+        cls = TEXT_EXTRACTORS[candidate]
+        extractor = cls(profiler) if cls is PdftotextExtractor else cls()
+        if extractor.available():
+            return extractor
+        if name != "auto":
+            print(f"Warning: text extractor {candidate} is not installed.")
+    return None
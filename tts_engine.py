@@ -0,0 +1,687 @@
+"""
+TTS scheduling for the PPTX/PDF to Video pipeline.
+
+Runs text-to-speech requests concurrently behind a token-bucket rate limiter,
+retrying failures with exponential backoff + jitter up to a fixed number of
+attempts. A circuit breaker stops hammering the TTS service when it is down:
+requests wait for the breaker to let a trial call through and only give up
+when that trial fails too (or the wait exceeds a deadline).
+
+Backends implement the TTSBackend interface: `synthesize(text, language, out_path)`
+returns an AudioInfo (duration and sample format), `cache_id` names the
+voice/settings for the audio cache, and `extension` is the file type written.
+Local engines can also set `supports_batch` and synthesize many clips in one
+process via `synthesize_batch`. FakeTTSBackend lets the scheduler run offline.
+"""
+
+import json
+import os
+import random
+import re
+import shutil
+import struct
+import threading
+import textwrap
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from profiling import Profiler
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker refuses a call because the backend keeps failing."""
+
+
+class TTSCancelled(Exception):
+    """Error of a TTSResult whose request was dropped because the run was cancelled."""
+
+
+# Slide of the request the current scheduler thread is synthesizing (for Profiler records)
+_current = threading.local()
+
+
+def part_path_for(path):
+    """
+    Temporary file to write `path` through. Unique per thread, so two workers
+    producing the same clip never write into each other's file.
+    """
+    path = Path(path)
+    return path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.part")
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    rate: tokens added per second. burst: bucket capacity (max back-to-back calls).
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                wait = (1.0 - self.tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and every
+    call is refused for `reset_timeout` seconds. Then a single trial call is let
+    through: success closes the circuit, failure opens it again. `trips` counts
+    how often the circuit has opened.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+    # How long callers wait for a running trial call before checking again
+    TRIAL_POLL = 0.5
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not be attempted."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("TTS circuit is open after repeated failures")
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    raise CircuitOpenError("TTS circuit is half-open, trial call in progress")
+                self._trial_running = True
+
+    def retry_after(self):
+        """Seconds until before_call() may let a call through again (0 if it would now)."""
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = self._clock() - self._opened_at
+                if elapsed >= self.reset_timeout:
+                    return 0.0
+                # Same test as before_call(), and never so short that waiting gets nowhere
+                return max(self.reset_timeout - elapsed, 0.01)
+            if self.state == self.HALF_OPEN and self._trial_running:
+                return min(self.TRIAL_POLL, self.reset_timeout)
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+@dataclass
+class AudioInfo:
+    """Duration and sample format of a synthesized clip."""
+    duration: float
+    sample_rate: int
+    channels: int
+    codec: str
+
+
+@dataclass
+class TTSRequest:
+    """One piece of text to synthesize into `path`."""
+    index: int
+    text: str
+    language: str
+    path: Path
+
+
+@dataclass
+class TTSResult:
+    """Outcome of a TTSRequest: attempts made, wall-clock latency and final error (if any)."""
+    index: int
+    path: Path
+    attempts: int = 0
+    latency: float = 0.0
+    error: Optional[Exception] = None
+    info: Optional[AudioInfo] = None
+    chunks: int = 1
+    # time.monotonic() when synthesis started (for profiling timelines)
+    started: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - self.chunks)
+
+
+# MPEG audio Layer III bitrates (kbps) for MPEG-1 and MPEG-2/2.5, by header index
+MP3_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates by version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def mp3_info(path):
+    """Read duration/format of an MP3 by walking its Layer III frame headers (no ffprobe)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # ID3v2 size is a 28-bit "syncsafe" integer
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+    samples = 0
+    sample_rate = channels = None
+    while pos + 4 <= len(data):
+        header = int.from_bytes(data[pos:pos + 4], "big")
+        version = (header >> 19) & 3
+        layer = (header >> 17) & 3
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 3
+        if ((header >> 21) & 0x7FF != 0x7FF or version == 1 or layer != 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            pos += 1  # not a Layer III frame header, resync
+            continue
+        mpeg1 = version == 3
+        bitrate = MP3_BITRATES[mpeg1][bitrate_index] * 1000
+        sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+        channels = 1 if (header >> 6) & 3 == 3 else 2
+        samples += 1152 if mpeg1 else 576
+        pos += (144 if mpeg1 else 72) * bitrate // sample_rate + ((header >> 9) & 1)
+    if not samples:
+        return None
+    return AudioInfo(samples / sample_rate, sample_rate, channels, "mp3")
+
+
+def wav_info(path):
+    with wave.open(str(path), "rb") as w:
+        return AudioInfo(w.getnframes() / w.getframerate(), w.getframerate(),
+                         w.getnchannels(), f"pcm_s{w.getsampwidth() * 8}le")
+
+
+def audio_info(path):
+    """AudioInfo for an MP3 or WAV file from its headers, or None if the format is unknown."""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(12)
+        if magic[:4] == b"RIFF" and magic[8:12] == b"WAVE":
+            return wav_info(path)
+        return mp3_info(path)
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+class TTSBackend:
+    """
+    Interface for TTS engines.
+
+    name: short engine name shown in logs and accepted by --tts-engine.
+    extension: file suffix of the audio written by synthesize().
+    supports_batch: True if synthesize_batch() does real batching (one process for all clips).
+    profiler: profiling.Profiler that records the engine's processes (the
+    converter sets its own when this is None).
+    """
+
+    name = "base"
+    extension = ".mp3"
+    supports_batch = False
+    profiler = None
+
+    def run(self, cmd, input=None):
+        """Run an engine process through the profiler (per slide when called from a scheduler)."""
+        return (self.profiler or Profiler()).run(cmd, self.name, getattr(_current, "slide", None),
+                                                 input=input)
+
+    @property
+    def cache_id(self):
+        """Everything that changes the produced audio for the same text and language."""
+        return self.name
+
+    def synthesize(self, text, language, out_path):
+        """Write speech for `text` to `out_path` and return its AudioInfo (or None if unknown)."""
+        raise NotImplementedError
+
+    def synthesize_batch(self, items):
+        """Synthesize [(text, language, out_path), ...]; returns a list of AudioInfo."""
+        return [self.synthesize(text, language, out_path) for text, language, out_path in items]
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS via the gTTS package (remote, rate limited)."""
+
+    name = "gtts"
+    extension = ".mp3"
+
+    def __init__(self, slow=False):
+        self.slow = slow
+
+    @property
+    def cache_id(self):
+        return f"gtts:slow={self.slow}"
+
+    def synthesize(self, text, language, out_path):
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=language, slow=self.slow)
+        tts.save(str(out_path))
+        return mp3_info(out_path)
+
+
+class EspeakBackend(TTSBackend):
+    """Offline TTS with the espeak-ng command; `voice` defaults to the language code."""
+
+    name = "espeak"
+    extension = ".wav"
+
+    def __init__(self, voice=None, speed=160, command="espeak-ng", profiler=None):
+        self.voice = voice
+        self.speed = speed
+        self.command = command
+        self.profiler = profiler
+
+    @property
+    def cache_id(self):
+        return f"espeak-ng:voice={self.voice}:speed={self.speed}"
+
+    def synthesize(self, text, language, out_path):
+        cmd = [self.command, "-v", self.voice or language, "-s", str(self.speed),
+               "-w", str(out_path), "--stdin"]
+        self.run(cmd, input=text.encode("utf-8"))
+        return wav_info(out_path)
+
+
+class PiperBackend(TTSBackend):
+    """
+    Offline neural TTS with the piper command and an .onnx voice model.
+
+    Batches run a single piper process: the model is loaded once and every
+    clip is requested as one JSON line on stdin (--json-input).
+    The voice model decides the language; `language` is only part of the cache key.
+    """
+
+    name = "piper"
+    extension = ".wav"
+    supports_batch = True
+
+    def __init__(self, voice, command="piper", profiler=None):
+        if not voice:
+            raise ValueError("piper needs a voice model (--tts-voice path/to/voice.onnx)")
+        self.voice = voice
+        self.command = command
+        self.profiler = profiler
+
+    @property
+    def cache_id(self):
+        return f"piper:{os.path.basename(self.voice)}"
+
+    def synthesize(self, text, language, out_path):
+        return self.synthesize_batch([(text, language, out_path)])[0]
+
+    def synthesize_batch(self, items):
+        lines = "".join(
+            json.dumps({"text": text, "output_file": str(out_path)}, ensure_ascii=False) + "\n"
+            for text, _, out_path in items
+        )
+        cmd = [self.command, "--model", str(self.voice), "--json-input"]
+        self.run(cmd, input=lines.encode("utf-8"))
+        return [wav_info(out_path) for _, _, out_path in items]
+
+
+TTS_BACKENDS = {
+    "gtts": GTTSBackend,
+    "espeak": EspeakBackend,
+    "piper": PiperBackend,
+}
+
+
+def make_tts_backend(engine="gtts", voice=None):
+    """Create the backend named `engine` (see TTS_BACKENDS) with an optional voice."""
+    if engine not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS engine {engine!r}, choose from {', '.join(TTS_BACKENDS)}")
+    backend = GTTSBackend() if engine == "gtts" else TTS_BACKENDS[engine](voice)
+    command = getattr(backend, "command", None)
+    if command and shutil.which(command) is None:
+        raise ValueError(f"{command} is not installed or not in PATH")
+    return backend
+
+
+def write_silent_wav(path, duration, sample_rate=24000):
+    """Write `duration` seconds of 16-bit mono silence as a WAV file."""
+    frames = int(duration * sample_rate)
+    data_size = frames * 2
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16))
+        f.write(b"data" + struct.pack("<I", data_size))
+        f.write(b"\0" * data_size)
+
+
+class FakeTTSBackend(TTSBackend):
+    """
+    Offline stand-in for a TTS service.
+
+    Sleeps `latency` seconds per call, fails with probability `error_rate`
+    and writes a silent WAV whose length follows the word count
+    (`words_per_second`), so downstream FFmpeg stages still get real audio.
+    """
+
+    name = "fake"
+    extension = ".wav"
+
+    def __init__(self, latency=0.0, error_rate=0.0, words_per_second=2.5, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.words_per_second = words_per_second
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, language, out_path):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("fake TTS backend: injected failure")
+        duration = max(0.5, len(text.split()) / self.words_per_second)
+        write_silent_wav(out_path, duration)
+        return AudioInfo(int(duration * 24000) / 24000, 24000, 1, "pcm_s16le")
+
+
+class TTSScheduler:
+    """
+    Runs TTSRequests on a thread pool.
+
+    Every attempt first takes a token from the rate limiter and checks the
+    circuit breaker. Failed attempts are retried with exponential backoff and
+    full jitter (random wait in [0, min(max_delay, base_delay * 2**n)]) until
+    `max_attempts` is reached. Setting the `cancel_event` passed to run() stops
+    every request before its next attempt and cuts waits short.
+
+    While the breaker is open, requests sleep until it lets a trial call
+    through. A request fails on an open breaker only once a trial made after it
+    started waiting has failed too, or after waiting `breaker_wait` seconds.
+    """
+
+    def __init__(self, backend, workers=4, rate=2.0, burst=2, max_attempts=5,
+                 base_delay=1.0, max_delay=30.0, breaker=None, breaker_wait=120.0,
+                 sleep=time.sleep, clock=time.monotonic, log=print):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.limiter = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.breaker_wait = breaker_wait
+        self._sleep = sleep
+        self._announced_trip = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.log = log
+
+    def backoff_delay(self, attempt):
+        """Jittered wait before retry number `attempt` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._random.uniform(0, cap)
+
+    def pause(self, delay, cancel_event=None):
+        """Sleep `delay` seconds, returning early once `cancel_event` is set."""
+        if cancel_event is not None and self._sleep is time.sleep:
+            cancel_event.wait(delay)
+        else:
+            self._sleep(delay)
+
+    def run_one(self, request, cancel_event=None):
+        start = time.monotonic()
+        result = TTSResult(index=request.index, path=request.path, started=start)
+        # Write to a side file so an interrupted save never looks like finished audio
+        part_path = part_path_for(request.path)
+        _current.slide = request.index
+        waited = 0.0
+        trips = None
+        while result.attempts < self.max_attempts:
+            if cancel_event is not None and cancel_event.is_set():
+                result.error = TTSCancelled("Cancelled")
+                break
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                result.error = e
+                if trips is None:
+                    trips = self.breaker.trips
+                elif self.breaker.trips > trips:
+                    # The circuit was tried again while we waited and failed
+                    break
+                delay = min(self.breaker.retry_after(), self.breaker_wait - waited)
+                if delay <= 0 and waited >= self.breaker_wait:
+                    break
+                self.announce_open(delay)
+                self.pause(delay, cancel_event)
+                waited += delay
+                continue
+            trips = None
+            self.limiter.acquire()
+            result.attempts += 1
+            try:
+                info = self.backend.synthesize(request.text, request.language, part_path)
+                os.replace(part_path, request.path)
+                result.info = info or audio_info(request.path)
+                self.breaker.record_success()
+                result.error = None
+                break
+            except Exception as e:
+                self.breaker.record_failure()
+                result.error = e
+                self.log(f"     [!] Slide {request.index}: gagal generate audio "
+                         f"(percobaan {result.attempts}/{self.max_attempts}): {e}")
+                if result.attempts < self.max_attempts:
+                    self.pause(self.backoff_delay(result.attempts), cancel_event)
+        if result.error is not None and part_path.exists():
+            part_path.unlink()
+        result.latency = time.monotonic() - start
+        return result
+
+    def announce_open(self, delay):
+        """Log once per trip that requests are waiting for the breaker."""
+        with self._lock:
+            if self._announced_trip == self.breaker.trips:
+                return
+            self._announced_trip = self.breaker.trips
+        self.log(f"     [!] TTS gagal berturut-turut, circuit terbuka: "
+                 f"menunggu {delay:.0f}s sebelum mencoba lagi...")
+
+    def run_batch(self, requests, cancel_event=None):
+        """
+        One synthesize_batch() call for every request (local engines).
+        If the batch fails, fall back to per-request synthesis with retries.
+        """
+        start = time.monotonic()
+        parts = [part_path_for(r.path) for r in requests]
+        try:
+            infos = self.backend.synthesize_batch(
+                [(r.text, r.language, part) for r, part in zip(requests, parts)]
+            )
+        except Exception as e:
+            self.log(f"     [!] Batch TTS gagal ({e}), mencoba per slide...")
+            for part in parts:
+                if part.exists():
+                    part.unlink()
+            return [self.run_one(r, cancel_event) for r in requests]
+        latency = time.monotonic() - start
+        results = []
+        for request, part, info in zip(requests, parts, infos):
+            os.replace(part, request.path)
+            results.append(TTSResult(index=request.index, path=request.path, attempts=1,
+                                     latency=latency, started=start,
+                                     info=info or audio_info(request.path)))
+        return results
+
+    def run(self, requests, on_result=None, cancel_event=None):
+        """
+        Synthesize all requests (concurrently, or as one batch). Results come back
+        in request order; on_result(result) is also called as each one finishes.
+        Once `cancel_event` is set, unfinished requests fail with TTSCancelled.
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            return [TTSResult(index=r.index, path=r.path, error=TTSCancelled("Cancelled"))
+                    for r in requests]
+        if getattr(self.backend, "supports_batch", False) and len(requests) > 1:
+            results = self.run_batch(requests, cancel_event)
+            if on_result:
+                for result in results:
+                    on_result(result)
+            return results
+
+        def run_one(request):
+            result = self.run_one(request, cancel_event)
+            if on_result:
+                on_result(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(run_one, requests))
+
+
+# Sentence ends (also line breaks in script.txt) and clause separators
+SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|\s*\n+\s*")
+CLAUSE_BREAK = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_text(text, max_chars):
+    """
+    Split narration into chunks of at most `max_chars` characters, breaking at
+    sentence ends first, then at clauses, then between words. Adjacent short
+    pieces are merged back together so chunks stay close to `max_chars`.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    for sentence in SENTENCE_BREAK.split(text):
+        sentence = sentence.strip()
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in CLAUSE_BREAK.split(sentence):
+            if len(clause) <= max_chars:
+                pieces.append(clause)
+            else:
+                pieces.extend(textwrap.wrap(clause, max_chars, break_long_words=False))
+    chunks = []
+    for piece in pieces:
+        if not piece:
+            continue
+        if chunks and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] += " " + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def stitch_clips(paths, out_path, gap=0.25, profiler=None, slide=None):
+    """
+    Join audio clips into `out_path` with `gap` seconds of silence between them.
+    WAV clips with identical parameters are joined in-process; anything else
+    goes through FFmpeg (apad + concat filter), recorded by `profiler` for
+    `slide`. Returns the AudioInfo of the result.
+    """
+    out_path = Path(out_path)
+    part = part_path_for(out_path)
+    infos = [audio_info(p) for p in paths]
+    formats = {(i.codec, i.sample_rate, i.channels) if i else None for i in infos}
+    if len(formats) == 1 and infos[0] and infos[0].codec.startswith("pcm"):
+        with wave.open(str(paths[0]), "rb") as first:
+            params = first.getparams()
+        silence = b"\0" * int(gap * params.framerate) * params.sampwidth * params.nchannels
+        with wave.open(str(part), "wb") as out:
+            out.setparams(params)
+            for n, path in enumerate(paths):
+                if n:
+                    out.writeframes(silence)
+                with wave.open(str(path), "rb") as clip:
+                    out.writeframes(clip.readframes(clip.getnframes()))
+    else:
+        sample_rate = infos[0].sample_rate if infos[0] else 24000
+        channels = infos[0].channels if infos[0] else 1
+        cmd = ["ffmpeg"]
+        graph = []
+        for n, path in enumerate(paths):
+            cmd += ["-i", str(path)]
+            pad = f",apad=pad_dur={gap}" if n < len(paths) - 1 else ""
+            graph.append(f"[{n}:a]aformat=sample_rates={sample_rate}:channel_layouts="
+                         f"{'mono' if channels == 1 else 'stereo'}{pad}[a{n}]")
+        inputs = "".join(f"[a{n}]" for n in range(len(paths)))
+        graph.append(f"{inputs}concat=n={len(paths)}:v=0:a=1[out]")
+        if out_path.suffix == ".wav":
+            codec = ["-c:a", "pcm_s16le", "-f", "wav"]
+        else:
+            codec = ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"]
+        cmd += ["-filter_complex", ";".join(graph), "-map", "[out]"] + codec + ["-y", str(part)]
+        (profiler or Profiler()).run(cmd, "stitch", slide)
+    os.replace(part, out_path)
+    return audio_info(out_path)
+
+
+def format_report(results):
+    """Per-slide latency/retry lines for the pipeline log."""
+    lines = []
+    for r in results:
+        status = "ok" if r.ok else f"FAILED ({r.error})"
+        chunks = f", {r.chunks} chunk" if r.chunks > 1 else ""
+        lines.append(f"    - Slide {r.index}: {r.latency:.2f}s{chunks}, "
+                     f"{r.attempts} percobaan, {r.retries} retry, {status}")
+    if results:
+        total_retries = sum(r.retries for r in results)
+        slowest = max(results, key=lambda r: r.latency)
+        lines.append(f"    Total: {len(results)} audio, {total_retries} retry, "
+                     f"terlama slide {slowest.index} ({slowest.latency:.2f}s)")
+    return lines